@@ -1,5 +1,14 @@
 """Specsync CLI package."""
 
-__all__ = ["__version__"]
+__all__ = ["Syncer", "__version__"]
 
 __version__ = "0.1.0"
+
+
+def __getattr__(name: str):
+    # Imported on first use, so the CLI does not pay for the library API at startup.
+    if name == "Syncer":
+        from .api import Syncer
+
+        return Syncer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
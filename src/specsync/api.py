@@ -0,0 +1,99 @@
+"""In-process API for tools that sync specs without shelling out to the CLI."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from .cache import SyncCaches, use_caches
+from .config import Config, load_config, validate_paths
+from .exceptions import ConfigError, SpecsyncError
+from .models import ExecutionStats, SyncDirection, SyncPlan
+from .status import StatusEntry, tree_status
+from .sync import (
+    PlanSummary,
+    build_pull_plan,
+    build_push_plan,
+    execute_plan,
+    summarize_plan,
+)
+
+# Settings accepted by Syncer.from_settings, named like the CLI options.
+_SETTINGS = frozenset(
+    {
+        "repo_specs_dir",
+        "project_name",
+        "force",
+        "on_conflict",
+        "git_index",
+        "prune",
+        "detect_moves",
+        "resume",
+        "atomic",
+        "attachments",
+        "jobs",
+        "digest",
+        "transforms",
+        "paths",
+        "since",
+        "lock_timeout",
+    }
+)
+
+
+class Syncer:
+    """Plans and applies syncs for one repository, keeping caches warm between calls.
+
+    Directory listings, digests and parsed documents are kept in bounded
+    in-memory caches and revalidated by stat on every use, so repeated plans
+    only re-read what changed. Conflicts are never prompted for: apply a plan
+    containing conflicts only with ``force=True`` or an ``on_conflict`` policy.
+    """
+
+    def __init__(self, config: Config, *, caches: SyncCaches | None = None) -> None:
+        self.config = config
+        self.caches = caches if caches is not None else SyncCaches()
+
+    @classmethod
+    def from_settings(cls, repo_root: Path | str, workspace_root: Path | str, **settings: Any) -> Syncer:
+        """Resolve configuration like the CLI does, from explicit values instead of argv and cwd.
+
+        ``repo_root`` may be any directory inside the repository; its
+        ``pyproject.toml`` still supplies the ``[tool.specsync]`` defaults.
+        """
+        unknown = set(settings) - _SETTINGS
+        if unknown:
+            raise ConfigError(f"Unknown settings: {', '.join(sorted(unknown))}")
+        args = SimpleNamespace(workspace_root=str(workspace_root), **settings)
+        return cls(load_config(args, command="api", cwd=Path(repo_root)))
+
+    def plan_pull(self) -> SyncPlan:
+        return self._plan("pull")
+
+    def plan_push(self) -> SyncPlan:
+        return self._plan("push")
+
+    def apply(self, plan: SyncPlan) -> ExecutionStats:
+        unresolved = not self.config.force and self.config.on_conflict is None
+        if unresolved and any(entry.state == "conflict" for entry in plan.entries):
+            raise SpecsyncError("Plan contains conflicts; create the Syncer with force=True or an on_conflict policy")
+        with use_caches(self.caches):
+            return execute_plan(plan, self.config)
+
+    def status(self, direction: SyncDirection = "pull") -> PlanSummary:
+        """Counts of what a sync in ``direction`` would do, without writing anything."""
+        return summarize_plan(self._plan(direction))
+
+    def tree_status(self) -> list[StatusEntry]:
+        """Every selected spec path classified as workspace-only, repo-only, identical or differs."""
+        with use_caches(self.caches):
+            return tree_status(self.config)[0]
+
+    def _plan(self, direction: SyncDirection) -> SyncPlan:
+        validate_paths(self.config, command=direction)
+        with use_caches(self.caches):
+            if direction == "pull":
+                return build_pull_plan(self.config)
+            return build_push_plan(self.config)
+
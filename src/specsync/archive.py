@@ -0,0 +1,153 @@
+"""Export the selected spec set as one archive stream, and unpack archives for import."""
+
+from __future__ import annotations
+
+import io
+import os
+import shutil
+import tarfile
+import time
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO
+
+from .attachments import find_attachments
+from .config import Config
+from .exceptions import ConfigError, SecurityError
+from .fs import ensure_dir
+from .models import ARCHIVE_FORMATS
+from .progress import current as current_progress
+from .selector import collect_workspace_documents, sync_ignore_rules
+from .transforms import NoteIndex, transform_text
+
+
+def export_archive(config: Config, stream: BinaryIO, archive_format: str) -> tuple[int, list[str]]:
+    """Write the workspace specs a pull would select to ``stream`` as a tar or zip archive.
+
+    Members are named relative to the specs directory and written one after
+    another straight from the source files, so nothing is staged on disk and
+    ``stream`` may be a pipe. Returns the number of members and the warnings
+    raised while selecting.
+    """
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ConfigError(f"Unknown archive format {archive_format!r} (choose from {', '.join(ARCHIVE_FORMATS)})")
+    documents, warnings = collect_workspace_documents(config)
+    members: list[tuple[str, Path, bytes | None]] = []
+    notes = NoteIndex(doc.relative_path for doc in documents)
+    for doc in documents:
+        text = None
+        if config.transforms:
+            text = transform_text(doc.raw_text, config.transforms, config.digest, relative=doc.relative_path, notes=notes)
+        members.append((doc.relative_path.as_posix(), doc.workspace_path, None if text is None else text.encode("utf-8")))
+    if config.attachments:
+        for relative in find_attachments(documents, config.workspace_specs_dir, warnings, sync_ignore_rules(config)):
+            members.append((relative.as_posix(), config.workspace_specs_dir / relative, None))
+
+    progress = current_progress()
+    progress.start("export", total=len(members))
+    try:
+        if archive_format == "tar":
+            # "w|" writes sequentially without seeking back to patch headers.
+            with tarfile.open(fileobj=stream, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+                for name, path, data in members:
+                    progress.advance(nbytes=_add_tar_member(tar, name, path, data))
+        else:
+            with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for name, path, data in members:
+                    progress.advance(nbytes=_add_zip_member(archive, name, path, data))
+    finally:
+        progress.finish()
+    return len(members), warnings
+
+
+def extract_archive(source: BinaryIO, destination: Path) -> int:
+    """Unpack a tar or zip archive of specs below ``destination``; returns the number of files.
+
+    Tar archives are read as a stream, so ``source`` may be a pipe. Members
+    that are not regular files or that would land outside ``destination``
+    are rejected. Extracted files keep the modification time recorded in
+    the archive.
+    """
+    ensure_dir(destination)
+    if source.seekable():
+        is_zip = zipfile.is_zipfile(source)
+        source.seek(0)
+        if is_zip:
+            with zipfile.ZipFile(source) as archive:
+                return _extract_zip(archive, destination)
+    with _open_tar_stream(source) as tar:
+        return _extract_tar(tar, destination)
+
+
+def _add_tar_member(tar: tarfile.TarFile, name: str, path: Path, data: bytes | None) -> int:
+    stat = path.stat()
+    info = tarfile.TarInfo(name)
+    info.mode = 0o644
+    info.mtime = int(stat.st_mtime)
+    if data is not None:
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+        return info.size
+    info.size = stat.st_size
+    with path.open("rb") as handle:
+        tar.addfile(info, handle)
+    return info.size
+
+
+def _add_zip_member(archive: zipfile.ZipFile, name: str, path: Path, data: bytes | None) -> int:
+    stat = path.stat()
+    info = zipfile.ZipInfo(name, time.localtime(stat.st_mtime)[:6])
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = 0o644 << 16
+    if data is not None:
+        archive.writestr(info, data)
+        return len(data)
+    with path.open("rb") as handle, archive.open(info, "w") as target:
+        shutil.copyfileobj(handle, target)
+    return stat.st_size
+
+
+def _open_tar_stream(source: BinaryIO) -> tarfile.TarFile:
+    try:
+        return tarfile.open(fileobj=source, mode="r|*")
+    except tarfile.TarError as exc:
+        raise ConfigError(f"Not a tar or zip archive: {exc}") from exc
+
+
+def _extract_tar(tar: tarfile.TarFile, destination: Path) -> int:
+    count = 0
+    for member in tar:
+        if member.isdir():
+            continue
+        if not member.isfile():
+            raise SecurityError(f"Refusing archive member that is not a regular file: {member.name}")
+        target = _member_target(member.name, destination)
+        ensure_dir(target.parent)
+        with tar.extractfile(member) as handle, target.open("wb") as out:
+            shutil.copyfileobj(handle, out)
+        # Keep the recorded mtime so --on-conflict newer judges the archived file, not the extraction.
+        os.utime(target, (member.mtime, member.mtime))
+        count += 1
+    return count
+
+
+def _extract_zip(archive: zipfile.ZipFile, destination: Path) -> int:
+    count = 0
+    for member in archive.infolist():
+        if member.is_dir():
+            continue
+        target = _member_target(member.filename, destination)
+        ensure_dir(target.parent)
+        with archive.open(member) as handle, target.open("wb") as out:
+            shutil.copyfileobj(handle, out)
+        mtime = time.mktime(member.date_time + (0, 0, -1))
+        os.utime(target, (mtime, mtime))
+        count += 1
+    return count
+
+
+def _member_target(name: str, destination: Path) -> Path:
+    relative = PurePosixPath(name)
+    if relative.is_absolute() or ".." in relative.parts or not relative.parts:
+        raise SecurityError(f"Refusing archive member outside the specs directory: {name}")
+    return destination.joinpath(*relative.parts)
@@ -0,0 +1,105 @@
+"""Local assets linked from spec bodies."""
+
+from __future__ import annotations
+
+import os
+import posixpath
+import re
+from pathlib import Path, PurePosixPath
+from stat import S_ISREG
+from typing import Iterable
+from urllib.parse import unquote
+
+from .ignore import CombinedIgnoreRules, IgnoreRules
+from .models import SpecDocument
+
+_MARKDOWN_LINK = re.compile(r"\[[^\]]*\]\(\s*<?([^)\s>]+)>?(?:\s+[^)]*)?\)")
+_WIKI_EMBED = re.compile(r"!\[\[([^\]|#]+)[^\]]*\]\]")
+_HTML_SOURCE = re.compile(r"<(?:img|source|a)\b[^>]*?\b(?:src|href)=[\"']([^\"']+)[\"']", re.IGNORECASE)
+_SCHEME = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*:")
+
+
+def extract_links(body: str) -> tuple[set[str], set[str]]:
+    """Return ``(links, embeds)``: markdown/HTML link targets and ``![[...]]`` embed names."""
+    links = set(_MARKDOWN_LINK.findall(body)) | set(_HTML_SOURCE.findall(body))
+    embeds = {name.strip() for name in _WIKI_EMBED.findall(body)}
+    return links, embeds
+
+
+def link_targets(relative_path: PurePosixPath, body: str) -> set[str]:
+    """Every local path, relative to the specs root, that ``body`` may link to.
+
+    Unlike :func:`find_attachments` nothing is checked on disk, so embeds
+    yield both the path next to the note and the one from the specs root.
+    """
+    base = relative_path.parent.as_posix()
+    links, embeds = extract_links(body)
+    targets = {_normalize(base, link) for link in links}
+    for name in embeds:
+        targets |= {_normalize(base, name), _normalize("", name)}
+    targets.discard(None)
+    return targets
+
+
+def find_attachments(
+    documents: Iterable[SpecDocument],
+    source_root: Path,
+    warnings: list[str],
+    ignore: IgnoreRules | CombinedIgnoreRules | None = None,
+) -> list[Path]:
+    """Collect the non-markdown files below ``source_root`` that the documents link to.
+
+    Links come from the bodies already in memory, and each distinct target is
+    checked on disk once however many specs reference it. Links leaving the
+    specs directory, hidden or ignored paths and symlinks are not synced.
+    ``ignore`` defaults to the rules of ``source_root`` alone.
+    """
+    if ignore is None:
+        ignore = IgnoreRules(source_root)
+    is_file: dict[str, bool] = {}
+    seen: set[str] = set()
+    found: list[Path] = []
+
+    def exists(relative: str) -> bool:
+        if relative not in is_file:
+            try:
+                is_file[relative] = S_ISREG(os.lstat(source_root / relative).st_mode)
+            except OSError:
+                is_file[relative] = False
+        return is_file[relative]
+
+    for doc in documents:
+        base = doc.relative_path.parent.as_posix()
+        links, embeds = extract_links(doc.body)
+        candidates = [_normalize(base, link) for link in sorted(links)]
+        # Embeds resolve next to the note first, then from the specs root.
+        for name in sorted(embeds):
+            nearby = _normalize(base, name)
+            candidates.append(nearby if nearby is not None and exists(nearby) else _normalize("", name))
+
+        for relative in candidates:
+            if relative is None or relative in seen:
+                continue
+            seen.add(relative)
+            if relative == ".." or relative.startswith("../"):
+                warnings.append(f"Skipping attachment outside specs dir: {relative} (linked from {doc.relative_path})")
+            elif relative.endswith(".md") or any(part.startswith(".") for part in relative.split("/")):
+                continue
+            elif ignore.ignored_path(relative):
+                continue
+            elif not exists(relative):
+                warnings.append(f"Attachment not found: {relative} (linked from {doc.relative_path})")
+            else:
+                found.append(Path(relative))
+    return found
+
+
+def _normalize(base: str, link: str) -> str | None:
+    """Turn a link into a normalized posix path relative to the specs root, or None if it is not local."""
+    link = link.strip()
+    if not link or link.startswith(("#", "/")) or _SCHEME.match(link):
+        return None
+    link = unquote(link.split("#", 1)[0].split("?", 1)[0])
+    if not link:
+        return None
+    return posixpath.normpath(posixpath.join(base, link))
@@ -0,0 +1,106 @@
+"""Bounded in-memory caches reused across runs in one process."""
+
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Generic, Hashable, Iterator, TypeVar
+
+V = TypeVar("V")
+
+# A stat taken within this window of the file's mtime may miss a later write
+# in the same timestamp tick, so such results are not cached.
+_RACY_WINDOW_NS = 2_000_000_000
+
+Stamp = tuple[int, int, int, int]
+
+
+class LRUCache(Generic[V]):
+    """Least-recently-used mapping evicting once the total weight exceeds ``max_weight``.
+
+    Each value weighs 1 unless ``weigh`` is given, e.g. ``len`` to bound a
+    cache of file contents by characters rather than entries.
+    """
+
+    def __init__(self, max_weight: int, *, weigh: Callable[[V], int] | None = None) -> None:
+        self.max_weight = max_weight
+        self.weigh = weigh
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[V, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> V | None:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def put(self, key: Hashable, value: V) -> None:
+        weight = self.weigh(value) if self.weigh is not None else 1
+        if weight > self.max_weight:
+            return
+        old = self._data.pop(key, None)
+        if old is not None:
+            self.weight -= old[1]
+        self._data[key] = (value, weight)
+        self.weight += weight
+        while self.weight > self.max_weight:
+            _, (_, evicted) = self._data.popitem(last=False)
+            self.weight -= evicted
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.weight = 0
+
+
+@dataclass
+class SyncCaches:
+    """Directory listings, file digests and parsed documents, each validated by stat."""
+
+    scan: LRUCache[Any] = field(default_factory=lambda: LRUCache(10_000))
+    digest: LRUCache[Any] = field(default_factory=lambda: LRUCache(50_000))
+    # Bounded by the characters of cached document text.
+    document: LRUCache[Any] = field(default_factory=lambda: LRUCache(64 << 20, weigh=lambda item: len(item[1].raw_text)))
+    # Transformed text and its wikilink resolutions, keyed by transform config, note path and input digest.
+    transform: LRUCache[Any] = field(default_factory=lambda: LRUCache(64 << 20, weigh=lambda item: len(item[0])))
+
+    def clear(self) -> None:
+        self.scan.clear()
+        self.digest.clear()
+        self.document.clear()
+        self.transform.clear()
+
+
+_active: ContextVar[SyncCaches | None] = ContextVar("specsync_caches", default=None)
+
+
+def active_caches() -> SyncCaches | None:
+    return _active.get()
+
+
+@contextmanager
+def use_caches(caches: SyncCaches) -> Iterator[SyncCaches]:
+    """Make ``caches`` visible to scanning, hashing and parsing inside the block."""
+    token = _active.set(caches)
+    try:
+        yield caches
+    finally:
+        _active.reset(token)
+
+
+def stamp(stat: os.stat_result) -> Stamp | None:
+    """Key identifying a file version, or None while a same-tick rewrite could go unnoticed."""
+    if time.time_ns() - stat.st_mtime_ns < _RACY_WINDOW_NS:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
@@ -0,0 +1,130 @@
+"""Fast drift check of staged repo specs against the workspace."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+from .config import Config
+from .exceptions import ConfigError, FrontmatterError
+from .gitindex import (
+    GitIndex,
+    StagedChange,
+    git_blob_id,
+    git_blob_id_of,
+    read_blob,
+    staged_changes,
+)
+from .ignore import CombinedIgnoreRules
+from .models import SpecDocument
+from .selector import (
+    filter_reason,
+    is_conflict_copy,
+    parse_document,
+    read_document,
+    sync_ignore_rules,
+)
+from .sync import compare_documents
+from .transforms import NoteIndex, transform_text
+
+
+@dataclass(frozen=True)
+class CheckIssue:
+    path: Path
+    reason: str
+
+
+def check_staged(config: Config) -> tuple[int, list[CheckIssue]]:
+    """Compare only the staged files under ``repo_specs_dir`` with their workspace copies.
+
+    Returns the number of staged specs checked and the ones that a pull would
+    change. Staged content is compared by blob ID, so neither tree is walked
+    and the repo worktree is never read. Transformed wikilinks are resolved
+    against the specs tracked in the repo, the last pulled set.
+    """
+    changes = staged_changes(config.repo_root, config.repo_specs_dir)
+    if changes is None:
+        raise ConfigError("Unable to list staged files; specsync check must run inside a git repository.")
+
+    checked = 0
+    issues: list[CheckIssue] = []
+    ignore = sync_ignore_rules(config)
+    notes = _tracked_notes(config) if config.transforms and changes else None
+    for change in changes:
+        relative = change.path.relative_to(config.repo_specs_dir)
+        if not _selected_path(relative, config, ignore):
+            continue
+        checked += 1
+        reason = _drift_reason(change, config.workspace_specs_dir / relative, relative, config, notes)
+        if reason is not None:
+            issues.append(CheckIssue(path=change.path.relative_to(config.repo_root), reason=reason))
+    return checked, issues
+
+
+def _tracked_notes(config: Config) -> NoteIndex:
+    index = GitIndex.load(config.repo_root, config.repo_specs_dir)
+    if index is None:
+        return NoteIndex()
+    return NoteIndex(path.relative_to(config.repo_specs_dir) for path in index.entries)
+
+
+def _selected_path(relative: Path, config: Config, ignore: CombinedIgnoreRules) -> bool:
+    """Apply the same path rules as a full scan, without listing any directory."""
+    if relative.suffix != ".md":
+        return False
+    spec_filter = config.spec_filter
+    parents = relative.parts[:-1]
+    for depth, name in enumerate(parents, start=1):
+        if name.startswith(".") or spec_filter.skip_dir("/".join(parents[:depth])):
+            return False
+    posix = relative.as_posix()
+    if ignore.ignored_path(posix) or is_conflict_copy(posix):
+        return False
+    return spec_filter.match_path(posix)
+
+
+def _drift_reason(
+    change: StagedChange, workspace_path: Path, relative: Path, config: Config, notes: NoteIndex | None
+) -> str | None:
+    if not workspace_path.is_file():
+        return None if change.oid is None else "missing in workspace"
+
+    doc = None
+    if workspace_path.is_symlink():
+        not_selected = "symlink"
+    elif config.spec_filter.too_large(workspace_path):
+        not_selected = "larger than max_file_size"
+    else:
+        doc = read_document(workspace_path, relative, workspace_path=workspace_path, repo_path=change.path)
+        not_selected = filter_reason(doc, config)
+    if change.oid is None:
+        return None if not_selected else "deleted in repo but present in workspace"
+    if not_selected:
+        return f"not selected in workspace ({not_selected})"
+    if not _pull_would_skip(doc, change.oid, relative, config, notes):
+        return "differs from workspace"
+    return None
+
+
+def _pull_would_skip(doc: SpecDocument, oid: str, relative: Path, config: Config, notes: NoteIndex | None) -> bool:
+    """Compare like the pull planner: transformed output first, then normalized body and metadata.
+
+    Byte-identical blobs are settled by blob ID alone; only a mismatch reads
+    the staged blob back from git.
+    """
+    if config.transforms:
+        output = transform_text(doc.raw_text, config.transforms, config.digest, relative=relative, notes=notes)
+        return git_blob_id_of(output.encode("utf-8")) == oid
+    if git_blob_id(doc.workspace_path) == oid:
+        return True
+    staged = read_blob(config.repo_root, oid)
+    if staged is None:
+        return False
+    try:
+        other = parse_document(
+            staged.decode("utf-8"), doc.repo_path, relative, workspace_path=doc.workspace_path, repo_path=doc.repo_path
+        )
+    except (UnicodeDecodeError, FrontmatterError):
+        return False
+    equivalent = compare_documents(doc, other, config.digest)
+    return equivalent is not None and equivalent[0] == "skip"
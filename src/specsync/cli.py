@@ -4,12 +4,18 @@ from __future__ import annotations
 
 import argparse
 import sys
+import tempfile
 from pathlib import Path
 
+from .check import check_staged
 from .config import load_config, validate_paths
 from .exceptions import ConfigError, FrontmatterError, InteractiveError, SpecsyncError
 from .fs import append_gitignore, ensure_dir, find_repo_root
-from .logging import error, info
+from .logging import configure as configure_logging
+from .logging import error, flush, info, log_format, warn, warn_all
+from .models import ARCHIVE_FORMATS, CONFLICT_POLICIES, ExecutionStats
+from .progress import Progress
+from .progress import configure as configure_progress
 from .prompt import PromptEngine
 from .sync import (
     build_pull_plan,
@@ -28,15 +34,50 @@ def build_parser() -> argparse.ArgumentParser:
     common.add_argument("--repo-specs-dir", dest="repo_specs_dir")
     common.add_argument("--project-name", dest="project_name")
     common.add_argument("--quiet", action="store_true", dest="quiet")
-
-    op_parent = argparse.ArgumentParser(add_help=False, parents=[common])
-    op_parent.add_argument("--dry-run", action="store_true", dest="dry_run")
-    op_parent.add_argument("--force", action="store_true", dest="force")
+    common.add_argument("--verbose", "-v", action="store_true", dest="verbose")
+    common.add_argument("--log-format", choices=["text", "json"], default="text", dest="log_format")
+
+    op_options = argparse.ArgumentParser(add_help=False, parents=[common])
+    op_options.add_argument("--dry-run", action="store_true", dest="dry_run")
+    op_options.add_argument("--force", action="store_true", dest="force")
+    op_options.add_argument("--on-conflict", choices=CONFLICT_POLICIES, dest="on_conflict")
+    op_options.add_argument("--git-index", action="store_true", dest="git_index")
+    op_options.add_argument("--prune", action="store_true", dest="prune")
+    op_options.add_argument("--detect-moves", action="store_true", dest="detect_moves")
+    op_options.add_argument("--resume", action="store_true", dest="resume")
+    op_options.add_argument("--atomic", action="store_true", dest="atomic")
+    op_options.add_argument("--attachments", action="store_true", dest="attachments")
+    op_options.add_argument("--jobs", "-j", type=int, dest="jobs")
+    op_options.add_argument("--lock-timeout", type=float, dest="lock_timeout", metavar="SECONDS")
+    op_options.add_argument("--digest", dest="digest")
+    op_options.add_argument("--transform", action="append", dest="transforms", metavar="NAME")
+    op_options.add_argument("--no-progress", action="store_false", dest="progress")
+
+    # Positional paths come last, so subcommands can add their own positionals first.
+    op_parent = argparse.ArgumentParser(add_help=False, parents=[op_options])
+    op_parent.add_argument("paths", nargs="*", metavar="PATH", help="Limit the run to these paths or globs")
 
     subparsers = parser.add_subparsers(dest="command")
 
     subparsers.add_parser("pull", parents=[op_parent], help="Pull specs from workspace to repo")
-    subparsers.add_parser("push", parents=[op_parent], help="Push specs from repo to workspace")
+    push_parser = subparsers.add_parser("push", parents=[op_parent], help="Push specs from repo to workspace")
+    push_parser.add_argument("--since", dest="since", metavar="REF", help="Only push specs changed since this git ref")
+    import_parser = subparsers.add_parser(
+        "import", parents=[op_options], help="Pull specs from an archive, directory or WebDAV collection"
+    )
+    import_parser.add_argument(
+        "archive", help="Archive written by specsync export, a WebDAV URL, or - for a tar stream on stdin"
+    )
+    import_parser.add_argument("paths", nargs="*", metavar="PATH", help="Limit the import to these paths or globs")
+    export_parser = subparsers.add_parser("export", parents=[common], help="Write the selected workspace specs to an archive")
+    export_parser.add_argument("--format", choices=ARCHIVE_FORMATS, default="tar", dest="archive_format")
+    export_parser.add_argument("--output", "-o", default="-", dest="output", help="Archive path, or - for stdout")
+    export_parser.add_argument("--attachments", action="store_true", dest="attachments")
+    export_parser.add_argument("--transform", action="append", dest="transforms", metavar="NAME")
+    export_parser.add_argument("paths", nargs="*", metavar="PATH", help="Limit the export to these paths or globs")
+    status_parser = subparsers.add_parser("status", parents=[common], help="Show what differs between workspace and repo")
+    status_parser.add_argument("paths", nargs="*", metavar="PATH", help="Limit the comparison to these paths or globs")
+    subparsers.add_parser("check", parents=[common], help="Check staged repo specs against the workspace")
     subparsers.add_parser("info", parents=[common], help="Show resolved configuration")
     init_parser = subparsers.add_parser("init", parents=[common], help="Initialize specsync in this repo")
     init_parser.add_argument("--include-sample", action="store_true", dest="include_sample")
@@ -54,11 +95,22 @@ def main(argv: list[str] | None = None) -> int:
         parser.print_help()
         return 0
 
+    configure_logging(verbose=args.verbose, log_format=args.log_format)
+    if getattr(args, "progress", False) and not args.quiet:
+        configure_progress(Progress(json_lines=args.log_format == "json"))
     try:
         if args.command == "pull":
             return _cmd_pull(args)
         if args.command == "push":
             return _cmd_push(args)
+        if args.command == "import":
+            return _cmd_import(args)
+        if args.command == "export":
+            return _cmd_export(args)
+        if args.command == "status":
+            return _cmd_status(args)
+        if args.command == "check":
+            return _cmd_check(args)
         if args.command == "info":
             return _cmd_info(args)
         if args.command == "init":
@@ -79,25 +131,29 @@ def main(argv: list[str] | None = None) -> int:
     except Exception as err:  # pragma: no cover - catch-all safeguard
         error(f"Unexpected failure: {err}")
         return 3
+    finally:
+        configure_progress(None)
+        flush()
     return 0
 
 
 def _cmd_pull(args) -> int:
     config = load_config(args, command="pull")
     validate_paths(config, command="pull")
+    return _run_pull(config, command="pull")
 
+
+def _run_pull(config, *, command: str) -> int:
     plan = build_pull_plan(config)
     log_plan(plan, config)
     if config.dry_run:
         display_plan(plan)
         return 0
 
-    prompt_engine = None if config.force else PromptEngine(quiet=config.quiet)
+    prompt_engine = None if config.force or config.on_conflict else PromptEngine(quiet=config.quiet)
     stats = execute_plan(plan, config, prompt_engine=prompt_engine)
-    info(
-        f"Created: {stats.created}, Updated: {stats.updated}, Skipped: {stats.skipped}",
-        quiet=config.quiet,
-    )
+    _report_stats(stats, config)
+    _run_hooks(config, command, stats)
     return 0
 
 
@@ -111,16 +167,122 @@ def _cmd_push(args) -> int:
         display_plan(plan)
         return 0
 
-    prompt_engine = None if config.force else PromptEngine(quiet=config.quiet)
+    prompt_engine = None if config.force or config.on_conflict else PromptEngine(quiet=config.quiet)
     ensure_dir(config.workspace_specs_dir)
     stats = execute_plan(plan, config, prompt_engine=prompt_engine)
+    _report_stats(stats, config)
+    _run_hooks(config, "push", stats)
+    return 0
+
+
+def _run_hooks(config, command: str, stats: ExecutionStats) -> None:
+    from .hooks import run_post_sync
+
+    changes = stats.changes
+    ran = run_post_sync(config.post_sync, command, changes, cwd=config.repo_root)
+    if ran:
+        changed = len(changes.created) + len(changes.updated) + len(changes.deleted)
+        info(f"Ran {ran} post_sync hook(s) on {changed} changed files", quiet=config.quiet)
+
+
+def _cmd_import(args) -> int:
+    # Archive and storage support is imported per command, keeping startup short for check.
+    from .archive import extract_archive
+    from .storage import fetch_specs, is_backend_location, open_backend
+
+    # The archive is unpacked into a scratch workspace and pulled from there,
+    # so import shares pull's planning, filters and conflict handling.
+    with tempfile.TemporaryDirectory(prefix="specsync-import-") as scratch:
+        args.workspace_root = scratch
+        config = load_config(args, command="import")
+        if args.archive == "-":
+            count = extract_archive(sys.stdin.buffer, config.workspace_specs_dir)
+        elif is_backend_location(args.archive):
+            # Zip archives, directories and WebDAV collections are listed first, so only selected specs are fetched.
+            backend = open_backend(args.archive)
+            try:
+                count = fetch_specs(backend, config.workspace_specs_dir, config)
+            finally:
+                backend.close()
+        else:
+            try:
+                with open(args.archive, "rb") as source:
+                    count = extract_archive(source, config.workspace_specs_dir)
+            except OSError as exc:
+                raise ConfigError(f"Unable to read archive {args.archive}: {exc.strerror}") from exc
+        info(f"Read {count} files from {args.archive}", quiet=config.quiet)
+        validate_paths(config, command="pull")
+        return _run_pull(config, command="import")
+
+
+def _cmd_export(args) -> int:
+    from .archive import export_archive
+
+    config = load_config(args, command="export")
+    if args.output == "-":
+        count, warnings = export_archive(config, sys.stdout.buffer, args.archive_format)
+        sys.stdout.buffer.flush()
+    else:
+        with open(args.output, "wb") as stream:
+            count, warnings = export_archive(config, stream, args.archive_format)
+    warn_all(warnings)
+    # Info goes to stdout, which carries the archive itself when writing there.
+    info(f"Exported {count} files as {args.archive_format}", quiet=config.quiet or args.output == "-")
+    return 0
+
+
+def _report_stats(stats: ExecutionStats, config) -> None:
+    info(
+        f"Created: {stats.created}, Updated: {stats.updated}, Skipped: {stats.skipped}, "
+        f"Moved: {stats.moved}, Deleted: {stats.deleted}",
+        quiet=config.quiet,
+    )
+    if stats.conflicts:
+        outcomes = ", ".join(f"{outcome}: {count}" for outcome, count in sorted(stats.conflicts.items()))
+        info(f"Conflicts ({config.on_conflict}): {outcomes}", quiet=config.quiet)
+
+
+def _cmd_status(args) -> int:
+    from .status import STATUS_CODES, tree_status
+
+    config = load_config(args, command="status")
+    entries, warnings = tree_status(config)
+    warn_all(warnings)
+
+    changed = [entry for entry in entries if entry.state != "identical"]
+    if log_format() == "json":
+        for entry in changed:
+            rel = entry.path.as_posix()
+            info(f"{entry.state} {rel}", state=entry.state, path=rel)
+    else:
+        flush()
+        for entry in changed:
+            print(f"{STATUS_CODES[entry.state]} {entry.path.as_posix()}")
+
+    counts = {state: 0 for state in STATUS_CODES}
+    for entry in entries:
+        counts[entry.state] += 1
     info(
-        f"Created: {stats.created}, Updated: {stats.updated}, Skipped: {stats.skipped}",
+        f"{counts['identical']} identical, {counts['differs']} differ, "
+        f"{counts['workspace-only']} workspace-only, {counts['repo-only']} repo-only",
         quiet=config.quiet,
     )
     return 0
 
 
+def _cmd_check(args) -> int:
+    config = load_config(args, command="check")
+    checked, issues = check_staged(config)
+    if not issues:
+        info(f"Checked {checked} staged specs: in sync with workspace", quiet=config.quiet)
+        return 0
+
+    for issue in issues:
+        warn(f"{issue.path.as_posix()}: {issue.reason}", path=issue.path.as_posix(), reason=issue.reason)
+    error(f"{len(issues)} of {checked} staged specs out of sync with workspace; run specsync pull")
+    return 1
+
+
 def _cmd_info(args) -> int:
     config = load_config(args, command="info")
     info(f"Repo root: {config.repo_root}")
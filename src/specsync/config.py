@@ -4,14 +4,17 @@ from __future__ import annotations
 
 import os
 import subprocess
-from dataclasses import dataclass
+import tomllib
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
-import tomllib
-
 from .exceptions import ConfigError
-from .fs import find_repo_root
+from .filters import PathScope, SpecFilter
+from .fs import find_repo_root, get_digest_factory
+from .hooks import Hook, parse_hooks
+from .models import CONFLICT_POLICIES, ConflictPolicy
+from .transforms import get_transformer
 
 
 @dataclass
@@ -27,16 +30,43 @@ class Config:
     dry_run: bool
     force: bool
     quiet: bool
+    git_index: bool = False
+    prune: bool = False
+    detect_moves: bool = False
+    resume: bool = False
+    atomic: bool = False
+    attachments: bool = False
+    jobs: int = 1
+    transforms: tuple[str, ...] = ()
+    on_conflict: ConflictPolicy | None = None
+    scope: PathScope | None = None
+    # Push only repo specs changed between this git ref and the worktree.
+    since: str | None = None
+    # Seconds to wait for directories locked by another run before giving up.
+    lock_timeout: float = 30.0
+    post_sync: tuple[Hook, ...] = ()
+    spec_filter: SpecFilter = field(default_factory=SpecFilter)
+    digest: str = "sha256"
 
     @property
     def filter_summary(self) -> str:
         project = "enabled" if self.match_project else "disabled"
         expose = "required" if self.require_expose else "optional"
-        return f"expose={expose}, project={project}"
+        summary = f"expose={expose}, project={project}"
+        rules = ", ".join(part for part in (self.spec_filter.summary, self.scope and self.scope.summary, self.since and f"since={self.since}") if part)
+        return f"{summary}, {rules}" if rules else summary
+
+    @property
+    def state_dir(self) -> Path:
+        """Directory for run state such as journals, kept out of the worktree when possible."""
+        git_dir = self.repo_root / ".git"
+        if git_dir.is_dir():
+            return git_dir / "specsync"
+        return self.repo_root / ".specsync"
 
 
-def load_config(args: Any, *, command: str) -> Config:
-    repo_root = find_repo_root(Path.cwd())
+def load_config(args: Any, *, command: str, cwd: Path | None = None) -> Config:
+    repo_root = find_repo_root(cwd or Path.cwd())
     if repo_root is None:
         raise ConfigError("Unable to locate git repository root. Run specsync inside a git repo.")
 
@@ -58,6 +88,7 @@ def load_config(args: Any, *, command: str) -> Config:
     match_project = bool(filter_config.get("match_project", True))
 
     project_name = _resolve_project_name(args, pyproject_data, tool_config, repo_root)
+    git_index = bool(getattr(args, "git_index", False) or tool_config.get("git_index", False))
 
     return Config(
         repo_root=repo_root,
@@ -71,6 +102,21 @@ def load_config(args: Any, *, command: str) -> Config:
         dry_run=bool(getattr(args, "dry_run", False)),
         force=bool(getattr(args, "force", False)),
         quiet=bool(getattr(args, "quiet", False)),
+        git_index=git_index,
+        prune=bool(getattr(args, "prune", False)),
+        resume=bool(getattr(args, "resume", False)),
+        atomic=bool(getattr(args, "atomic", False) or tool_config.get("atomic", False)),
+        detect_moves=bool(getattr(args, "detect_moves", False) or tool_config.get("detect_moves", False)),
+        attachments=bool(getattr(args, "attachments", False) or tool_config.get("attachments", False)),
+        jobs=_resolve_jobs(args, tool_config),
+        transforms=_resolve_transforms(args, tool_config),
+        on_conflict=_resolve_on_conflict(args, tool_config),
+        scope=_resolve_scope(args, (workspace_specs_dir, repo_specs_dir)),
+        since=getattr(args, "since", None) or None,
+        lock_timeout=_resolve_lock_timeout(args, tool_config),
+        post_sync=parse_hooks(tool_config.get("post_sync")),
+        spec_filter=SpecFilter.from_config(filter_config),
+        digest=_resolve_digest(args, tool_config),
     )
 
 
@@ -105,6 +151,91 @@ def _resolve_workspace_root(args: Any, tool_config: dict[str, Any]) -> Path:
     return Path(candidate).expanduser().resolve()
 
 
+def _resolve_jobs(args: Any, tool_config: dict[str, Any]) -> int:
+    candidate = getattr(args, "jobs", None)
+    if candidate is None:
+        candidate = tool_config.get("jobs", 1)
+    try:
+        jobs = int(candidate)
+    except (TypeError, ValueError) as exc:
+        raise ConfigError(f"Invalid jobs value: {candidate!r}") from exc
+    if jobs < 0:
+        raise ConfigError(f"Invalid jobs value: {candidate!r}")
+    # 0 means one worker per CPU.
+    return jobs or os.cpu_count() or 1
+
+
+def _resolve_transforms(args: Any, tool_config: dict[str, Any]) -> tuple[str, ...]:
+    names = getattr(args, "transforms", None)
+    if names is None:
+        names = tool_config.get("transforms", [])
+    if isinstance(names, str):
+        names = [names]
+    if not isinstance(names, (list, tuple)) or not all(isinstance(name, str) for name in names):
+        raise ConfigError("transforms must be a list of transform names")
+    get_transformer(tuple(names))  # Raises ConfigError for unknown transforms.
+    return tuple(names)
+
+
+def _resolve_lock_timeout(args: Any, tool_config: dict[str, Any]) -> float:
+    candidate = getattr(args, "lock_timeout", None)
+    if candidate is None:
+        candidate = tool_config.get("lock_timeout", 30)
+    try:
+        timeout = float(candidate)
+    except (TypeError, ValueError) as exc:
+        raise ConfigError(f"Invalid lock_timeout value: {candidate!r}") from exc
+    if timeout < 0:
+        raise ConfigError(f"Invalid lock_timeout value: {candidate!r}")
+    return timeout
+
+
+def _resolve_on_conflict(args: Any, tool_config: dict[str, Any]) -> ConflictPolicy | None:
+    policy = getattr(args, "on_conflict", None) or tool_config.get("on_conflict")
+    if policy is None:
+        return None
+    if policy not in CONFLICT_POLICIES:
+        raise ConfigError(f"Invalid on_conflict value {policy!r} (choose from {', '.join(CONFLICT_POLICIES)})")
+    return policy
+
+
+def _resolve_scope(args: Any, roots: tuple[Path, ...]) -> PathScope | None:
+    patterns = []
+    for argument in getattr(args, "paths", None) or []:
+        pattern = _scope_pattern(str(argument), roots)
+        if not pattern:
+            return None  # A specs root itself selects the whole tree.
+        patterns.append(pattern)
+    return PathScope(tuple(patterns)) if patterns else None
+
+
+def _scope_pattern(argument: str, roots: tuple[Path, ...]) -> str:
+    """Express a path argument relative to the specs directory.
+
+    Existing files and directories inside either specs tree (as an editor
+    passes them) are made relative to it; anything else is taken as a path
+    or glob relative to the specs directory.
+    """
+    candidate = Path(argument).expanduser()
+    if candidate.is_absolute() or candidate.exists():
+        resolved = candidate.resolve()
+        for root in roots:
+            if resolved == root:
+                return ""
+            if root in resolved.parents:
+                return resolved.relative_to(root).as_posix()
+        if candidate.is_absolute():
+            raise ConfigError(f"Path {argument} is outside the workspace and repo specs directories")
+    pattern = argument.removeprefix("./").strip("/")
+    return "" if pattern == "." else pattern
+
+
+def _resolve_digest(args: Any, tool_config: dict[str, Any]) -> str:
+    algorithm = str(getattr(args, "digest", None) or tool_config.get("digest", "sha256"))
+    get_digest_factory(algorithm)  # Raises ConfigError for unknown or uninstalled algorithms.
+    return algorithm
+
+
 def _resolve_project_name(
     args: Any,
     pyproject_data: dict[str, Any],
@@ -18,6 +18,22 @@ class InteractiveError(SpecsyncError):
     """Raised when interactive input is required but unavailable."""
 
 
+class ConflictError(SpecsyncError):
+    """Raised when conflicts exist and the conflict policy is ``fail``."""
+
+
+class LockError(SpecsyncError):
+    """Raised when another run holds a needed lock past the lock timeout."""
+
+
+class StorageError(SpecsyncError):
+    """Raised when a storage backend cannot list, read or write a path."""
+
+
+class HookError(SpecsyncError):
+    """Raised when a post_sync hook exits with a non-zero status."""
+
+
 class SecurityError(SpecsyncError):
     """Raised when a security violation is detected."""
 
@@ -30,6 +46,10 @@ class FrontmatterError(SpecsyncError):
     message: str
     line: int | None = None
 
+    def __reduce__(self):
+        # Keep the error picklable so it survives the trip back from worker processes.
+        return (type(self), (self.path, self.message, self.line))
+
     def __str__(self) -> str:  # pragma: no cover - trivial
         location = f"{self.path}"
         if self.line is not None:
@@ -0,0 +1,185 @@
+"""Compiled include/exclude rules from ``[tool.specsync.filter]``."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .exceptions import ConfigError
+
+
+@dataclass
+class SpecFilter:
+    """Path, size and frontmatter rules, compiled once per run.
+
+    Directory excludes are checked while walking so whole subtrees are never
+    listed. Path globs and the size limit are checked before a file is opened;
+    frontmatter predicates run after parsing, next to ``require_expose`` and
+    ``match_project``.
+    """
+
+    include: re.Pattern[str] | None = None
+    exclude: re.Pattern[str] | None = None
+    exclude_dirs: re.Pattern[str] | None = None
+    max_file_size: int | None = None
+    frontmatter: dict[str, tuple[Any, ...]] = field(default_factory=dict)
+
+    @classmethod
+    def from_config(cls, table: dict[str, Any]) -> SpecFilter:
+        max_file_size = table.get("max_file_size")
+        if max_file_size is not None and (not isinstance(max_file_size, int) or max_file_size < 0):
+            raise ConfigError(f"filter.max_file_size must be a non-negative integer, got {max_file_size!r}")
+
+        predicates = table.get("frontmatter", {})
+        if not isinstance(predicates, dict):
+            raise ConfigError("filter.frontmatter must be a table of key = value(s)")
+        frontmatter = {
+            str(key): tuple(value) if isinstance(value, list) else (value,) for key, value in predicates.items()
+        }
+
+        return cls(
+            include=_compile_globs(table, "include"),
+            exclude=_compile_globs(table, "exclude"),
+            exclude_dirs=_compile_globs(table, "exclude_dirs", dirs=True),
+            max_file_size=max_file_size,
+            frontmatter=frontmatter,
+        )
+
+    def skip_dir(self, relative: str) -> bool:
+        """Whether a directory (posix path relative to the specs root) is pruned."""
+        return self.exclude_dirs is not None and self.exclude_dirs.fullmatch(relative) is not None
+
+    def match_path(self, relative: str) -> bool:
+        if self.include is not None and self.include.fullmatch(relative) is None:
+            return False
+        return self.exclude is None or self.exclude.fullmatch(relative) is None
+
+    def too_large(self, path: Path) -> bool:
+        return self.max_file_size is not None and path.stat().st_size > self.max_file_size
+
+    def frontmatter_reason(self, frontmatter: dict[str, Any]) -> str | None:
+        for key, allowed in self.frontmatter.items():
+            if frontmatter.get(key) not in allowed:
+                return f"{key} not in filter"
+        return None
+
+    @property
+    def summary(self) -> str:
+        rules = []
+        for name in ("include", "exclude", "exclude_dirs"):
+            if getattr(self, name) is not None:
+                rules.append(name)
+        if self.max_file_size is not None:
+            rules.append(f"max_file_size={self.max_file_size}")
+        rules.extend(f"{key}={'|'.join(map(str, values))}" for key, values in self.frontmatter.items())
+        return ", ".join(rules)
+
+
+class PathScope:
+    """Positional path or glob arguments limiting a run to parts of the specs tree.
+
+    Patterns are relative to the specs directory. A pattern that names a
+    directory selects everything below it. Directories that cannot contain a
+    match are pruned before they are listed, segment by segment.
+    """
+
+    def __init__(self, patterns: tuple[str, ...]) -> None:
+        self.patterns = patterns
+        # The pattern itself, or anything below it when it names a directory.
+        try:
+            self._match = re.compile("|".join(f"(?:{glob_to_regex('/' + p)}(?:/.*)?)" for p in patterns))
+        except re.error as exc:
+            raise ConfigError(f"Invalid path pattern: {exc}") from exc
+        self._segments = [
+            [None if segment == "**" else re.compile(glob_to_regex("/" + segment)) for segment in p.split("/")]
+            for p in patterns
+        ]
+
+    def match_path(self, relative: str) -> bool:
+        return self._match.fullmatch(relative) is not None
+
+    def enter_dir(self, relative: str) -> bool:
+        """Whether a directory may hold matches: it is on the way to a pattern or below one."""
+        parts = relative.split("/")
+        for segments in self._segments:
+            for index, part in enumerate(parts):
+                if index >= len(segments) or segments[index] is None:
+                    return True
+                if segments[index].fullmatch(part) is None:
+                    break
+            else:
+                return True
+        return False
+
+    @property
+    def summary(self) -> str:
+        return f"paths={' '.join(self.patterns)}"
+
+
+def glob_escape(path: str) -> str:
+    """Quote glob metacharacters so ``path`` matches only itself."""
+    return re.sub(r"([*?[])", r"[\1]", path)
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Translate a path glob into a regex matching posix relative paths.
+
+    ``*`` and ``?`` stay within one path segment and ``**`` spans segments.
+    A pattern without a slash matches a name at any depth.
+    """
+    pattern = pattern.strip().rstrip("/")
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    parts: list[str] = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith("**/", index):
+            parts.append("(?:.*/)?")
+            index += 3
+            continue
+        if pattern.startswith("**", index):
+            parts.append(".*")
+            index += 2
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", index + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[index + 1 : end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                body = body.replace("\\", "\\\\").replace("[", "\\[")
+                parts.append(f"[{body}]")
+                index = end
+        else:
+            parts.append(re.escape(char))
+        index += 1
+    regex = "".join(parts)
+    return regex if anchored else f"(?:.*/)?{regex}"
+
+
+def _compile_globs(table: dict[str, Any], key: str, *, dirs: bool = False) -> re.Pattern[str] | None:
+    patterns = table.get(key)
+    if patterns is None:
+        return None
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    if not isinstance(patterns, list) or not all(isinstance(p, str) for p in patterns):
+        raise ConfigError(f"filter.{key} must be a list of glob patterns")
+    if not patterns:
+        return None
+    if dirs:
+        # "archive/**" names the same subtree as "archive" once we prune it.
+        patterns = [p.removesuffix("/**") for p in patterns]
+    try:
+        return re.compile("|".join(f"(?:{glob_to_regex(p)})" for p in patterns))
+    except re.error as exc:
+        raise ConfigError(f"Invalid glob in filter.{key}: {exc}") from exc
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import json
 import re
 from dataclasses import dataclass
 from pathlib import Path
@@ -14,6 +15,8 @@ from .exceptions import FrontmatterError
 _FRONTMATTER_START = "---\n"
 # Pattern to match the closing --- delimiter at the start of a line
 _FRONTMATTER_PATTERN = re.compile(r"^---\s*$", re.MULTILINE)
+# Keys push writes into workspace notes for routing; they carry no content.
+MANAGED_KEYS = frozenset({"expose", "project"})
 
 
 @dataclass
@@ -64,3 +67,14 @@ def parse_frontmatter(text: str, *, path: Path) -> FrontmatterResult:
 def render_frontmatter(data: dict[str, Any]) -> str:
     yaml_text = yaml.safe_dump(data, sort_keys=False).strip()
     return f"---\n{yaml_text}\n---\n"
+
+
+def normalize_body(body: str) -> str:
+    """Body text with line endings and surrounding blank lines made canonical."""
+    return _normalize(body).strip("\n") + "\n"
+
+
+def normalize_metadata(data: dict[str, Any] | None) -> str:
+    """Frontmatter as canonical JSON, ignoring key order, YAML layout and managed keys."""
+    content = {key: value for key, value in (data or {}).items() if key not in MANAGED_KEYS}
+    return json.dumps(content, sort_keys=True, default=str)
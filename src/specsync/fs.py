@@ -3,36 +3,116 @@
 from __future__ import annotations
 
 import hashlib
+import mmap
+import os
 import shutil
+import tempfile
 from pathlib import Path
-from typing import Iterable
+from typing import IO, Any, Callable, Iterable
 
-from .exceptions import SecurityError
+from .cache import active_caches, stamp
+from .exceptions import ConfigError, SecurityError
+
+try:  # Optional non-cryptographic fast hash.
+    import xxhash
+except ImportError:  # pragma: no cover - depends on environment
+    xxhash = None
+
+DIGEST_ALGORITHMS: dict[str, Callable[..., Any]] = {
+    "sha256": hashlib.sha256,
+    "blake2b": hashlib.blake2b,
+}
+if xxhash is not None:  # pragma: no cover - depends on environment
+    DIGEST_ALGORITHMS["xxh3"] = xxhash.xxh3_128
+
+# Read once at import; os.umask can only be queried by setting it.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Files at least this large are hashed straight from a read-only memory map.
+MMAP_THRESHOLD = 1 << 20
 
 
 def ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
-def write_file_atomic(path: Path, content: str) -> None:
-    ensure_dir(path.parent)
-    temp_path = path.with_suffix(path.suffix + ".tmp")
-    temp_path.write_text(content, encoding="utf-8")
-    temp_path.replace(path)
+def write_file_atomic(path: Path, content: str, *, make_parents: bool = True) -> None:
+    if make_parents:
+        ensure_dir(path.parent)
+    _replace_atomic(path, lambda handle: handle.write(content), "w", encoding="utf-8")
+
+
+def stream_file_atomic(path: Path, fill: Callable[[IO[bytes]], object], *, make_parents: bool = True) -> None:
+    """Write ``path`` from ``fill``, which writes the content to the binary handle it is given."""
+    if make_parents:
+        ensure_dir(path.parent)
+    _replace_atomic(path, fill, "wb")
+
+
+def _replace_atomic(path: Path, fill: Callable[[IO], object], mode: str, encoding: str | None = None) -> None:
+    # A unique temp name, so concurrent writers never share or clobber one.
+    descriptor, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # mkstemp creates 0600; give the file the mode a plain write would.
+        os.fchmod(descriptor, 0o666 & ~_UMASK)
+        with os.fdopen(descriptor, mode, encoding=encoding) as handle:
+            fill(handle)
+        os.replace(temp_name, path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
 
 
 def read_text(path: Path) -> str:
     return path.read_text(encoding="utf-8")
 
 
-def hash_file(path: Path) -> str:
-    digest = hashlib.sha256()
+def hash_file(path: Path, algorithm: str = "sha256") -> str:
+    factory = get_digest_factory(algorithm)
     with path.open("rb") as handle:
-        for chunk in iter(lambda: handle.read(65536), b""):
-            digest.update(chunk)
+        if os.fstat(handle.fileno()).st_size >= MMAP_THRESHOLD:
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest = factory(mapped)
+        else:
+            digest = hashlib.file_digest(handle, factory)
     return digest.hexdigest()
 
 
+def digest_file(path: Path, algorithm: str = "sha256") -> str:
+    """Return the file digest tagged with its algorithm, e.g. ``sha256:9f86...``.
+
+    Tagged values never compare equal across algorithms, so they are safe to
+    persist and reload after the configured digest changes.
+    """
+    caches = active_caches()
+    if caches is None:
+        return f"{algorithm}:{hash_file(path, algorithm)}"
+
+    key = (os.fspath(path), algorithm)
+    version = stamp(os.stat(path))
+    cached = caches.digest.get(key)
+    if cached is not None and version is not None and cached[0] == version:
+        return cached[1]
+    value = f"{algorithm}:{hash_file(path, algorithm)}"
+    if version is not None:
+        caches.digest.put(key, (version, value))
+    return value
+
+
+def digest_text(text: str, algorithm: str = "sha256") -> str:
+    """Tagged digest of ``text`` as it would be written to disk (UTF-8)."""
+    return f"{algorithm}:{get_digest_factory(algorithm)(text.encode('utf-8')).hexdigest()}"
+
+
+def get_digest_factory(algorithm: str) -> Callable[..., Any]:
+    try:
+        return DIGEST_ALGORITHMS[algorithm]
+    except KeyError:
+        available = ", ".join(sorted(DIGEST_ALGORITHMS))
+        raise ConfigError(f"Unsupported digest algorithm {algorithm!r} (available: {available})") from None
+
+
 def is_within(base: Path, target: Path) -> bool:
     """Check if target path is within base directory."""
     try:
@@ -72,8 +152,9 @@ def validate_path_security(path: Path, root: Path, follow_symlinks: bool = False
         raise SecurityError(f"Path {path} is outside allowed root {root}")
 
 
-def copy_file(source: Path, target: Path) -> None:
-    ensure_dir(target.parent)
+def copy_file(source: Path, target: Path, *, make_parents: bool = True) -> None:
+    if make_parents:
+        ensure_dir(target.parent)
     shutil.copy2(source, target)
 
 
@@ -113,14 +194,81 @@ def append_gitignore(repo_root: Path, entry: str, comment: str = "Added by specs
         handle.write(f"{entry}\n")
 
 
-def iter_markdown_files(root: Path) -> Iterable[Path]:
-    """Iterate over markdown files in directory, skipping hidden directories."""
-    for path in root.rglob("*.md"):
-        # Skip files in hidden directories
-        if any(part.startswith(".") for part in path.relative_to(root).parts[:-1]):
-            continue
-        if path.is_file():
-            yield path
+def iter_markdown_files(root: Path, *, skip_dir: Callable[[str], bool] | None = None) -> Iterable[Path]:
+    """Iterate over markdown files in directory, skipping hidden directories.
+
+    Entries are visited depth-first in name order, so paths come out sorted by
+    their relative ``parts``. Sync plans rely on this to merge-join two trees.
+    ``skip_dir`` receives each directory's posix path relative to ``root`` and
+    prunes the subtree before it is listed.
+    """
+    yield from _walk_markdown(root, "", skip_dir)
+
+
+def _walk_markdown(directory: Path, prefix: str, skip_dir: Callable[[str], bool] | None) -> Iterable[Path]:
+    try:
+        entries = _list_directory(directory)
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    for name, is_dir in entries:
+        if is_dir:
+            relative = prefix + name
+            if skip_dir is not None and skip_dir(relative):
+                continue
+            yield from _walk_markdown(directory / name, relative + "/", skip_dir)
+        else:
+            yield directory / name
+
+
+def _list_directory(directory: Path) -> list[tuple[str, bool]]:
+    """Sorted ``(name, is_dir)`` pairs for visible subdirectories and markdown files.
+
+    With active caches, a listing is reused while the directory's own stat is
+    unchanged, since adding, removing or renaming an entry updates its mtime.
+    """
+    caches = active_caches()
+    version = None
+    if caches is not None:
+        version = stamp(os.stat(directory))
+        cached = caches.scan.get(os.fspath(directory))
+        if cached is not None and version is not None and cached[0] == version:
+            return cached[1]
+
+    entries: list[tuple[str, bool]] = []
+    with os.scandir(directory) as scan:
+        for entry in sorted(scan, key=lambda entry: entry.name):
+            if entry.is_dir(follow_symlinks=False):
+                if not entry.name.startswith("."):
+                    entries.append((entry.name, True))
+            elif entry.name.endswith(".md") and entry.is_file():
+                entries.append((entry.name, False))
+    if version is not None:
+        caches.scan.put(os.fspath(directory), (version, entries))
+    return entries
+
+
+def remove_file(path: Path, *, stop_at: Path) -> None:
+    """Delete a file and any parent directories it leaves empty below ``stop_at``."""
+    path.unlink()
+    prune_empty_parents(path, stop_at)
+
+
+def move_file(source: Path, target: Path, *, stop_at: Path) -> None:
+    """Rename a file and remove parent directories it leaves empty below ``stop_at``."""
+    ensure_dir(target.parent)
+    source.replace(target)
+    prune_empty_parents(source, stop_at)
+
+
+def prune_empty_parents(path: Path, stop_at: Path) -> None:
+    """Remove the now-empty parent directories of ``path`` below ``stop_at``."""
+    parent = path.parent
+    while parent != stop_at and is_within(stop_at, parent):
+        try:
+            parent.rmdir()
+        except OSError:
+            break
+        parent = parent.parent
 
 
 def find_repo_root(start: Path) -> Path | None:
@@ -0,0 +1,220 @@
+"""Git index fast path for comparing repo-side files."""
+
+from __future__ import annotations
+
+import hashlib
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+
+_CHUNK_SIZE = 65536
+_NULL_OID = "0" * 40
+# Number of "--debug" detail lines git prints after every index entry.
+_DEBUG_LINES = 5
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    oid: str
+    mtime_ns: int
+    size: int
+
+
+@dataclass(frozen=True)
+class StagedChange:
+    path: Path
+    # Blob ID of the staged content, or None when the path is staged for deletion.
+    oid: str | None
+
+
+def git_blob_id(path: Path) -> str:
+    """Compute the git blob ID (``git hash-object``) of a file."""
+    with path.open("rb") as handle:
+        size = handle.seek(0, 2)
+        handle.seek(0)
+        digest = hashlib.sha1(f"blob {size}\0".encode("ascii"))
+        while chunk := handle.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def git_blob_id_of(data: bytes) -> str:
+    """Compute the git blob ID that ``data`` would be stored under."""
+    return hashlib.sha1(f"blob {len(data)}\0".encode("ascii") + data).hexdigest()
+
+
+def read_blob(repo_root: Path, oid: str) -> bytes | None:
+    """Read a blob from the object database, or None when git cannot provide it."""
+    try:
+        completed = subprocess.run(
+            ["git", "cat-file", "blob", oid],
+            cwd=repo_root,
+            check=False,
+            capture_output=True,
+        )
+    except FileNotFoundError:  # pragma: no cover - git missing
+        return None
+    if completed.returncode != 0:
+        return None
+    return completed.stdout
+
+
+class GitIndex:
+    """Blob IDs and stat data of the files git tracks below a directory.
+
+    The index is read once with ``git ls-files -s --debug``. A tracked file
+    whose current mtime and size still match the index is trusted to hold
+    the recorded blob, so its content is never read. Everything else is
+    hashed on demand.
+    """
+
+    def __init__(self, entries: dict[Path, IndexEntry], index_mtime_ns: int) -> None:
+        self.entries = entries
+        self.index_mtime_ns = index_mtime_ns
+        self.cache_hits = 0
+
+    @classmethod
+    def load(cls, repo_root: Path, directory: Path) -> GitIndex | None:
+        try:
+            pathspec = directory.relative_to(repo_root).as_posix() or "."
+        except ValueError:
+            return None
+        try:
+            completed = subprocess.run(
+                ["git", "ls-files", "-s", "--debug", "-z", "--", pathspec],
+                cwd=repo_root,
+                check=False,
+                capture_output=True,
+            )
+        except FileNotFoundError:  # pragma: no cover - git missing
+            return None
+        if completed.returncode != 0:
+            return None
+
+        try:
+            index_mtime_ns = (repo_root / ".git" / "index").stat().st_mtime_ns
+        except OSError:
+            index_mtime_ns = 0
+
+        output = completed.stdout.decode("utf-8", errors="surrogateescape")
+        return cls(_parse_ls_files(output, repo_root), index_mtime_ns)
+
+    def blob_id(self, path: Path) -> str:
+        entry = self.entries.get(path)
+        if entry is not None and self._stat_matches(path, entry):
+            self.cache_hits += 1
+            return entry.oid
+        return git_blob_id(path)
+
+    def _stat_matches(self, path: Path, entry: IndexEntry) -> bool:
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        if stat.st_size != entry.size or stat.st_mtime_ns != entry.mtime_ns:
+            return False
+        # Racily clean: modified in the same tick the index was written.
+        return entry.mtime_ns < self.index_mtime_ns
+
+
+def staged_changes(repo_root: Path, directory: Path) -> list[StagedChange] | None:
+    """List the files below ``directory`` that differ between HEAD and the index.
+
+    One ``git diff --cached --raw`` call reports each staged path with the
+    blob ID it will be committed with, so nothing in the worktree is read.
+    Returns None when git cannot be queried.
+    """
+    try:
+        pathspec = directory.relative_to(repo_root).as_posix() or "."
+    except ValueError:
+        return None
+    try:
+        completed = subprocess.run(
+            ["git", "diff", "--cached", "--raw", "-z", "--no-renames", "--no-abbrev", "--no-ext-diff", "--", pathspec],
+            cwd=repo_root,
+            check=False,
+            capture_output=True,
+        )
+    except FileNotFoundError:  # pragma: no cover - git missing
+        return None
+    if completed.returncode != 0:
+        return None
+
+    # Records are ":<mode> <mode> <oid> <oid> <status>" NUL "<path>" NUL.
+    fields = completed.stdout.decode("utf-8", errors="surrogateescape").split("\0")
+    changes: list[StagedChange] = []
+    for meta, rel in zip(fields[0::2], fields[1::2]):
+        parts = meta.split()
+        # Unmerged paths have no single staged blob to compare.
+        if len(parts) != 5 or parts[4] == "U":
+            continue
+        oid = None if parts[4] == "D" or parts[3] == _NULL_OID else parts[3]
+        changes.append(StagedChange(path=repo_root / rel, oid=oid))
+    return changes
+
+
+def changed_since(repo_root: Path, directory: Path, ref: str) -> list[Path] | None:
+    """Paths below ``directory`` added, modified or deleted between ``ref`` and the worktree.
+
+    Uses a single ``git diff --name-status`` call. Renames are reported as a
+    deletion plus an addition. Returns None when git cannot resolve ``ref``.
+    """
+    try:
+        pathspec = directory.relative_to(repo_root).as_posix() or "."
+    except ValueError:
+        return None
+    try:
+        completed = subprocess.run(
+            ["git", "diff", "--name-status", "-z", "--no-renames", "--no-ext-diff", ref, "--", pathspec],
+            cwd=repo_root,
+            check=False,
+            capture_output=True,
+        )
+    except FileNotFoundError:  # pragma: no cover - git missing
+        return None
+    if completed.returncode != 0:
+        return None
+
+    # Records are "<status>" NUL "<path>" NUL.
+    fields = completed.stdout.decode("utf-8", errors="surrogateescape").split("\0")
+    return [repo_root / rel for status, rel in zip(fields[0::2], fields[1::2]) if status]
+
+
+def _parse_ls_files(output: str, repo_root: Path) -> dict[Path, IndexEntry]:
+    # With -z each "<mode> <oid> <stage>\t<path>" header ends in NUL and is
+    # followed by newline-terminated debug lines, so every NUL-separated chunk
+    # after the first holds the previous entry's details and the next header.
+    entries: dict[Path, IndexEntry] = {}
+    chunks = output.split("\0")
+    header = chunks[0]
+    for chunk in chunks[1:]:
+        lines = chunk.split("\n", _DEBUG_LINES)
+        _add_entry(entries, repo_root, header, lines[:_DEBUG_LINES])
+        header = lines[_DEBUG_LINES] if len(lines) > _DEBUG_LINES else ""
+    return entries
+
+
+def _add_entry(entries: dict[Path, IndexEntry], repo_root: Path, header: str, lines: list[str]) -> None:
+    meta, _, rel = header.partition("\t")
+    parts = meta.split()
+    # Skip unmerged entries; only stage 0 describes the worktree file.
+    if len(parts) != 3 or parts[2] != "0":
+        return
+    detail = _parse_debug(lines)
+    if detail is None:
+        return
+    mtime_ns, size = detail
+    entries[repo_root / rel] = IndexEntry(oid=parts[1], mtime_ns=mtime_ns, size=size)
+
+
+def _parse_debug(lines: list[str]) -> tuple[int, int] | None:
+    values: dict[str, str] = {}
+    for line in lines:
+        for field in line.strip().split("\t"):
+            key, _, value = field.partition(": ")
+            values[key] = value
+    try:
+        seconds, nanos = values["mtime"].split(":")
+        return int(seconds) * 1_000_000_000 + int(nanos), int(values["size"])
+    except (KeyError, ValueError):
+        return None
@@ -0,0 +1,118 @@
+"""Commands run once after a sync, given the files it changed."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Literal
+
+from .exceptions import ConfigError, HookError
+from .logging import warn
+from .models import ChangeManifest
+
+HookInput = Literal["file", "stdin", "env"]
+HOOK_INPUTS: tuple[HookInput, ...] = ("file", "stdin", "env")
+HOOK_COMMANDS = ("pull", "push", "import")
+# Most bytes of paths passed in environment variables. Far below the kernel's
+# limits on one variable (128 KiB on Linux) and on argv plus environ together.
+_MAX_ENV_BYTES = 32 * 1024
+
+
+@dataclass(frozen=True)
+class Hook:
+    command: str
+    # How the manifest reaches the command.
+    input: HookInput = "file"
+    # Commands after which the hook runs.
+    on: tuple[str, ...] = HOOK_COMMANDS
+
+
+def parse_hooks(value: Any) -> tuple[Hook, ...]:
+    """Hooks from ``post_sync``: a list of command strings or ``{command, input, on}`` tables."""
+    if value is None:
+        return ()
+    if not isinstance(value, list):
+        raise ConfigError("post_sync must be a list of commands or tables")
+    hooks = []
+    for item in value:
+        if isinstance(item, str):
+            item = {"command": item}
+        if not isinstance(item, dict) or not isinstance(item.get("command"), str) or not item["command"].strip():
+            raise ConfigError(f"Invalid post_sync hook {item!r}: a command string is required")
+        unknown = set(item) - {"command", "input", "on"}
+        if unknown:
+            raise ConfigError(f"Unknown post_sync hook keys: {', '.join(sorted(unknown))}")
+        hook_input = item.get("input", "file")
+        if hook_input not in HOOK_INPUTS:
+            raise ConfigError(f"Invalid post_sync input {hook_input!r} (choose from {', '.join(HOOK_INPUTS)})")
+        on = item.get("on", list(HOOK_COMMANDS))
+        if isinstance(on, str):
+            on = [on]
+        if not isinstance(on, list) or any(command not in HOOK_COMMANDS for command in on):
+            raise ConfigError(f"Invalid post_sync on {on!r} (choose from {', '.join(HOOK_COMMANDS)})")
+        hooks.append(Hook(command=item["command"], input=hook_input, on=tuple(on)))
+    return tuple(hooks)
+
+
+def manifest_payload(command: str, changes: ChangeManifest) -> dict[str, Any]:
+    return {
+        "command": command,
+        "created": [str(path) for path in changes.created],
+        "updated": [str(path) for path in changes.updated],
+        "deleted": [str(path) for path in changes.deleted],
+    }
+
+
+def run_post_sync(hooks: tuple[Hook, ...], command: str, changes: ChangeManifest, *, cwd: Path) -> int:
+    """Run the hooks for ``command`` once each, in order; returns how many ran.
+
+    Nothing runs when the sync changed no files. Each hook gets
+    ``SPECSYNC_COMMAND`` and, depending on its ``input``, the JSON manifest
+    in a file named by ``SPECSYNC_MANIFEST``, the manifest on stdin, or
+    newline-separated paths in ``SPECSYNC_CREATED``, ``SPECSYNC_UPDATED`` and
+    ``SPECSYNC_DELETED``. Path lists too long for the environment are left
+    out and an ``env`` hook gets ``SPECSYNC_MANIFEST`` instead. A hook that
+    fails or cannot be started raises :class:`HookError` and stops the rest.
+    """
+    selected = [hook for hook in hooks if command in hook.on]
+    if not selected or not changes:
+        return 0
+    payload = json.dumps(manifest_payload(command, changes), indent=2)
+    lists = {
+        "SPECSYNC_CREATED": "\n".join(map(str, changes.created)),
+        "SPECSYNC_UPDATED": "\n".join(map(str, changes.updated)),
+        "SPECSYNC_DELETED": "\n".join(map(str, changes.deleted)),
+    }
+    count = len(changes.created) + len(changes.updated) + len(changes.deleted)
+    env_fits = sum(len(os.fsencode(value)) for value in lists.values()) <= _MAX_ENV_BYTES
+    with tempfile.TemporaryDirectory(prefix="specsync-hook-") as scratch:
+        manifest_path = Path(scratch) / "manifest.json"
+        manifest_path.write_text(payload, encoding="utf-8")
+        for hook in selected:
+            env = {**os.environ, "SPECSYNC_COMMAND": command}
+            stdin = None
+            if hook.input == "stdin":
+                stdin = payload
+            elif hook.input == "env" and env_fits:
+                env.update(lists)
+            else:
+                if hook.input == "env":
+                    warn(
+                        f"post_sync hook {hook.command!r}: {count} changed paths are too long for the "
+                        "environment; passing them in the file named by SPECSYNC_MANIFEST"
+                    )
+                env["SPECSYNC_MANIFEST"] = str(manifest_path)
+            try:
+                # Hooks come from the project's own pyproject.toml, like any build script.
+                completed = subprocess.run(
+                    hook.command, shell=True, cwd=cwd, env=env, input=stdin, text=True, check=False
+                )
+            except OSError as exc:
+                raise HookError(f"post_sync hook {hook.command!r} could not be started: {exc}") from exc
+            if completed.returncode != 0:
+                raise HookError(f"post_sync hook {hook.command!r} failed with exit code {completed.returncode}")
+    return len(selected)
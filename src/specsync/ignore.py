@@ -0,0 +1,111 @@
+"""``.specsyncignore`` files with gitignore pattern semantics."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from .filters import glob_to_regex
+
+IGNORE_FILE = ".specsyncignore"
+
+
+@dataclass(frozen=True)
+class IgnoreRule:
+    pattern: re.Pattern[str]
+    # Posix path of the directory holding the ignore file, "" or ending in "/".
+    base: str
+    negate: bool = False
+    dir_only: bool = False
+
+    def matches(self, relative: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        if not relative.startswith(self.base):
+            return False
+        return self.pattern.fullmatch(relative[len(self.base) :]) is not None
+
+
+def parse_ignore(text: str, base: str = "") -> tuple[IgnoreRule, ...]:
+    """Compile the lines of an ignore file found in directory ``base``.
+
+    Follows gitignore: ``#`` comments, ``!`` re-includes, a trailing ``/``
+    matches directories only, and a pattern with a slash elsewhere is anchored
+    to the ignore file's directory.
+    """
+    rules: list[IgnoreRule] = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate or line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        if not line.strip("/"):
+            continue
+        rules.append(IgnoreRule(re.compile(glob_to_regex(line)), base, negate=negate, dir_only=dir_only))
+    return tuple(rules)
+
+
+class IgnoreRules:
+    """The ignore rules of one tree, read lazily and cached per directory.
+
+    Each directory's rule set is its parent's rules followed by its own
+    ``.specsyncignore``, so deeper files take precedence, and every file is
+    read and compiled at most once per walk. As in git, a file inside an
+    ignored directory cannot be re-included because the walk never enters it.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._rules: dict[str, tuple[IgnoreRule, ...]] = {}
+
+    def ignored(self, relative: str, *, is_dir: bool) -> bool:
+        parent, _, _ = relative.rpartition("/")
+        for rule in reversed(self.rules_for(parent)):
+            if rule.matches(relative, is_dir):
+                return not rule.negate
+        return False
+
+    def ignored_path(self, relative: str) -> bool:
+        """Whether a file or any directory above it is ignored, without walking the tree."""
+        parts = relative.split("/")
+        for depth in range(1, len(parts)):
+            if self.ignored("/".join(parts[:depth]), is_dir=True):
+                return True
+        return self.ignored(relative, is_dir=False)
+
+    def rules_for(self, directory: str) -> tuple[IgnoreRule, ...]:
+        rules = self._rules.get(directory)
+        if rules is None:
+            inherited = self.rules_for(directory.rpartition("/")[0]) if directory else ()
+            base = f"{directory}/" if directory else ""
+            rules = self._rules[directory] = inherited + parse_ignore(_read_ignore(self.root / directory), base)
+        return rules
+
+
+class CombinedIgnoreRules:
+    """The ignore rules of several trees; a path ignored in any of them is ignored.
+
+    Sync walks apply the rules of both specs trees, so a pattern that exists
+    on one side only still hides the file on the other side instead of
+    leaving it behind as an orphan to prune.
+    """
+
+    def __init__(self, *roots: Path) -> None:
+        self.trees = tuple(IgnoreRules(root) for root in roots)
+
+    def ignored(self, relative: str, *, is_dir: bool) -> bool:
+        return any(tree.ignored(relative, is_dir=is_dir) for tree in self.trees)
+
+    def ignored_path(self, relative: str) -> bool:
+        return any(tree.ignored_path(relative) for tree in self.trees)
+
+
+def _read_ignore(directory: Path) -> str:
+    try:
+        return (directory / IGNORE_FILE).read_text(encoding="utf-8")
+    except (FileNotFoundError, NotADirectoryError):
+        return ""
@@ -0,0 +1,118 @@
+"""Append-only journal of completed plan entries for resuming interrupted runs."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TextIO
+
+from .fs import ensure_dir
+from .models import PlanEntry, SyncDirection
+
+JOURNAL_VERSION = 1
+
+
+@dataclass(frozen=True)
+class JournalRecord:
+    path: str
+    state: str
+    source_size: int | None = None
+    source_mtime_ns: int | None = None
+    target_size: int | None = None
+    target_mtime_ns: int | None = None
+
+    def matches(self, source: Path, target: Path) -> bool:
+        """Whether both files still have the stat data recorded after the write."""
+        if self.target_size is None:
+            return False
+        try:
+            source_stat = source.stat()
+            target_stat = target.stat()
+        except OSError:
+            return False
+        return (
+            source_stat.st_size == self.source_size
+            and source_stat.st_mtime_ns == self.source_mtime_ns
+            and target_stat.st_size == self.target_size
+            and target_stat.st_mtime_ns == self.target_mtime_ns
+        )
+
+
+class Journal:
+    """Writes one JSON line per completed plan entry.
+
+    Lines are flushed as they are written, so an interrupted run leaves every
+    finished entry on disk. A run that completes removes its journal.
+    """
+
+    def __init__(self, path: Path, handle: TextIO) -> None:
+        self.path = path
+        self.handle = handle
+
+    @classmethod
+    def start(cls, path: Path, *, direction: SyncDirection, resume: bool) -> Journal:
+        ensure_dir(path.parent)
+        if resume and load_journal(path, direction):
+            handle = path.open("a", encoding="utf-8")
+        else:
+            handle = path.open("w", encoding="utf-8")
+            handle.write(json.dumps({"version": JOURNAL_VERSION, "direction": direction}) + "\n")
+            handle.flush()
+        return cls(path, handle)
+
+    def record(self, entry: PlanEntry) -> None:
+        rel = entry.document.relative_path.as_posix()
+        if entry.state == "delete":
+            record = JournalRecord(path=rel, state=entry.state)
+        else:
+            source_stat = entry.source_path.stat()
+            target_stat = entry.target_path.stat()
+            record = JournalRecord(
+                path=rel,
+                state=entry.state,
+                source_size=source_stat.st_size,
+                source_mtime_ns=source_stat.st_mtime_ns,
+                target_size=target_stat.st_size,
+                target_mtime_ns=target_stat.st_mtime_ns,
+            )
+        self.handle.write(json.dumps(asdict(record)) + "\n")
+        self.handle.flush()
+
+    def close(self, *, completed: bool) -> None:
+        self.handle.close()
+        if completed:
+            self.path.unlink(missing_ok=True)
+
+
+def journal_path(state_dir: Path, direction: SyncDirection) -> Path:
+    return state_dir / f"{direction}.journal"
+
+
+def load_journal(path: Path, direction: SyncDirection) -> dict[str, JournalRecord]:
+    """Read the records of an interrupted run, keyed by relative path.
+
+    A journal for another direction or format version is ignored, as is a
+    final line cut short by the interruption.
+    """
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return {}
+    if not lines:
+        return {}
+    try:
+        header = json.loads(lines[0])
+    except json.JSONDecodeError:
+        return {}
+    if header != {"version": JOURNAL_VERSION, "direction": direction}:
+        return {}
+
+    records: dict[str, JournalRecord] = {}
+    for line in lines[1:]:
+        try:
+            record = JournalRecord(**json.loads(line))
+        except (json.JSONDecodeError, TypeError):
+            continue
+        records[record.path] = record
+    return records
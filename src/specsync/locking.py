@@ -0,0 +1,123 @@
+"""Advisory locks that let concurrent runs share a target tree safely."""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Iterable
+
+from .exceptions import LockError
+from .fs import ensure_dir
+from .logging import flush, warn
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no flock
+    fcntl = None
+
+# Directories are hashed onto this many lock files, bounding open descriptors per run.
+LOCK_SHARDS = 256
+_MAX_POLL_INTERVAL = 0.5
+
+
+def lock_shard(directory: str) -> int:
+    """Lock shard of a directory given as a posix path relative to the target root."""
+    return zlib.crc32(directory.encode("utf-8")) % LOCK_SHARDS
+
+
+class DirectoryLocks:
+    """Exclusive ``flock`` locks on the shards of the directories a run writes to.
+
+    Runs writing to disjoint directories proceed in parallel; a run that
+    needs a shard held by another process polls until ``timeout`` seconds
+    pass, then raises :class:`LockError` naming the holder. Shards are taken
+    in ascending order, so two runs never wait on each other in a cycle.
+    Without ``fcntl`` the locks are no-ops.
+    """
+
+    def __init__(
+        self,
+        lock_dir: Path,
+        directories: Iterable[str],
+        *,
+        timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.lock_dir = lock_dir
+        self.timeout = timeout
+        self.clock = clock
+        self.sleep = sleep
+        self.waited = 0.0
+        self.shards: dict[int, list[str]] = {}
+        for directory in sorted(set(directories)):
+            self.shards.setdefault(lock_shard(directory), []).append(directory)
+        self._held: list[int] = []
+
+    def __enter__(self) -> DirectoryLocks:
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.release()
+
+    def acquire(self) -> None:
+        if fcntl is None or not self.shards:
+            return
+        ensure_dir(self.lock_dir)
+        start = self.clock()
+        deadline = start + self.timeout
+        try:
+            for shard in sorted(self.shards):
+                self._acquire_shard(shard, deadline)
+        except BaseException:
+            self.release()
+            raise
+        self.waited = self.clock() - start
+
+    def release(self) -> None:
+        while self._held:
+            descriptor = self._held.pop()
+            try:
+                fcntl.flock(descriptor, fcntl.LOCK_UN)
+            finally:
+                os.close(descriptor)
+
+    def _acquire_shard(self, shard: int, deadline: float) -> None:
+        path = self.lock_dir / f"{shard:02x}.lock"
+        descriptor = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        interval = 0.01
+        reported = False
+        while True:
+            try:
+                fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                holder = _read_holder(descriptor)
+                directories = ", ".join(self.shards[shard][:3]) or "."
+                if self.clock() >= deadline:
+                    os.close(descriptor)
+                    raise LockError(
+                        f"Timed out after {self.timeout:g}s waiting for lock on {directories} (held by {holder})"
+                    ) from None
+                if not reported:
+                    warn(f"Waiting for lock on {directories} (held by {holder})", lock=path.name, holder=holder)
+                    flush()  # Shown while waiting, not after.
+                    reported = True
+                self.sleep(min(interval, max(deadline - self.clock(), 0)))
+                interval = min(interval * 2, _MAX_POLL_INTERVAL)
+        self._held.append(descriptor)
+        # Record the holder so waiting runs can say who they are waiting for.
+        os.ftruncate(descriptor, 0)
+        os.pwrite(descriptor, f"pid {os.getpid()}: {' '.join(sys.argv[:2])}".encode("utf-8"), 0)
+
+
+def _read_holder(descriptor: int) -> str:
+    try:
+        holder = os.pread(descriptor, 256, 0).decode("utf-8", errors="replace").strip()
+    except OSError:  # pragma: no cover - best effort
+        holder = ""
+    return holder or "another process"
@@ -2,31 +2,148 @@
 
 from __future__ import annotations
 
+import atexit
+import json
 import sys
-from typing import Final
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Final, Iterable, Literal
 
+LogFormat = Literal["text", "json"]
 
 _LEVELS: Final = {
-    "info": ("[INFO]", sys.stdout),
-    "warn": ("[WARN]", sys.stderr),
-    "error": ("[ERROR]", sys.stderr),
+    "info": ("[INFO]", "stdout"),
+    "warn": ("[WARN]", "stderr"),
+    "error": ("[ERROR]", "stderr"),
 }
+# Pending output is written once this many characters have accumulated,
+# or once it is this many seconds old, so a run killed by a CI timeout
+# loses at most that much.
+_FLUSH_THRESHOLD: Final = 65536
+_FLUSH_INTERVAL: Final = 0.5
+_MAX_EXAMPLES: Final = 3
 
 
-def log(level: str, message: str, *, quiet: bool = False) -> None:
-    tag, stream = _LEVELS[level]
+@dataclass
+class _LogState:
+    verbose: bool = False
+    log_format: LogFormat = "text"
+    pending: dict[str, list[str]] = field(default_factory=lambda: {"stdout": [], "stderr": []})
+    pending_size: int = 0
+    timer: threading.Timer | None = None
+
+
+_state = _LogState()
+# Held while pending output changes; the flush timer runs on its own thread.
+_lock = threading.RLock()
+
+
+@dataclass
+class WarningGroup:
+    category: str
+    count: int = 0
+    examples: list[str] = field(default_factory=list)
+
+
+def configure(*, verbose: bool = False, log_format: LogFormat = "text") -> None:
+    _state.verbose = verbose
+    _state.log_format = log_format
+
+
+def is_verbose() -> bool:
+    return _state.verbose
+
+
+def log_format() -> LogFormat:
+    return _state.log_format
+
+
+def log(level: str, message: str, *, quiet: bool = False, **fields: Any) -> None:
+    """Buffer an info line; warnings and errors are written at once."""
     if quiet and level == "info":
         return
-    stream.write(f"{tag} {message}\n")
+    _emit(level, message, fields)
+    if level != "info":
+        flush()
 
 
-def info(message: str, *, quiet: bool = False) -> None:
-    log("info", message, quiet=quiet)
+def info(message: str, *, quiet: bool = False, **fields: Any) -> None:
+    log("info", message, quiet=quiet, **fields)
+
+
+def warn(message: str, **fields: Any) -> None:
+    log("warn", message, **fields)
+
+
+def error(message: str, **fields: Any) -> None:
+    log("error", message, **fields)
+
+
+def flush() -> None:
+    """Write all pending output; call before reading input, printing directly or starting a phase."""
+    with _lock:
+        if _state.timer is not None:
+            _state.timer.cancel()
+            _state.timer = None
+        for name, lines in _state.pending.items():
+            if lines:
+                stream = getattr(sys, name)
+                stream.write("".join(lines))
+                stream.flush()
+                lines.clear()
+        _state.pending_size = 0
+
+
+def aggregate_warnings(warnings: Iterable[str]) -> list[WarningGroup]:
+    """Group ``"<category>: <detail>"`` warnings, keeping a count and a few examples."""
+    groups: dict[str, WarningGroup] = {}
+    for warning in warnings:
+        category, _, detail = warning.partition(": ")
+        group = groups.get(category)
+        if group is None:
+            group = groups[category] = WarningGroup(category=category)
+        group.count += 1
+        if detail and len(group.examples) < _MAX_EXAMPLES:
+            group.examples.append(detail)
+    return list(groups.values())
+
+
+def warn_all(warnings: Iterable[str]) -> None:
+    """Log warnings one per line when verbose, otherwise one summary per category."""
+    # Written as one batch, so verbose runs do not flush once per line.
+    if _state.verbose:
+        for warning in warnings:
+            _emit("warn", warning, {})
+    else:
+        for group in aggregate_warnings(warnings):
+            if group.count == 1:
+                message = f"{group.category}: {group.examples[0]}" if group.examples else group.category
+            else:
+                examples = ", ".join(group.examples)
+                message = f"{group.category}: {group.count} files (e.g. {examples}; use --verbose for all)"
+            _emit("warn", message, {"category": group.category, "count": group.count, "examples": group.examples})
+    flush()
+
+
+def _emit(level: str, message: str, fields: dict[str, Any]) -> None:
+    tag, stream = _LEVELS[level]
+    if _state.log_format == "json":
+        line = json.dumps({"level": level, "message": message, **fields}, default=str)
+    else:
+        line = f"{tag} {message}"
+    _write(stream, line + "\n")
 
 
-def warn(message: str) -> None:
-    log("warn", message)
+def _write(stream: str, text: str) -> None:
+    with _lock:
+        _state.pending[stream].append(text)
+        _state.pending_size += len(text)
+        if _state.pending_size >= _FLUSH_THRESHOLD:
+            flush()
+        elif _state.timer is None:
+            _state.timer = threading.Timer(_FLUSH_INTERVAL, flush)
+            _state.timer.daemon = True
+            _state.timer.start()
 
 
-def error(message: str) -> None:
-    log("error", message)
+atexit.register(flush)
@@ -2,14 +2,18 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Literal
 
+from .transforms import NoteIndex
 
 MetadataStatus = Literal["valid", "invalid", "missing", "metadata_injected"]
-PlanState = Literal["create", "update", "conflict", "skip"]
+PlanState = Literal["create", "update", "conflict", "skip", "delete", "move"]
 SyncDirection = Literal["pull", "push"]
+ConflictPolicy = Literal["newer", "source", "target", "keep-both", "fail"]
+CONFLICT_POLICIES: tuple[ConflictPolicy, ...] = ("newer", "source", "target", "keep-both", "fail")
+ARCHIVE_FORMATS = ("tar", "zip")
 
 
 @dataclass
@@ -30,6 +34,16 @@ class PlanEntry:
     target_path: Path
     state: PlanState
     reason: str | None = None
+    moved_from: Path | None = None
+    # Free path for the incoming version when --on-conflict keep-both settles a conflict.
+    conflict_copy: Path | None = None
+    # Linked asset copied byte for byte, never parsed or rewritten.
+    attachment: bool = False
+    # Size of the source text, for progress reporting.
+    nbytes: int = 0
+    # Stat data of the target-tree files this entry changes, taken before they
+    # were compared; () for a path that did not exist. Checked again under the lock.
+    stamps: dict[Path, tuple[int, ...]] = field(default_factory=dict)
 
 
 @dataclass
@@ -37,6 +51,20 @@ class SyncPlan:
     direction: SyncDirection
     entries: list[PlanEntry]
     warnings: list[str]
+    # Planned notes that transformed wikilinks resolve against.
+    notes: NoteIndex | None = None
+
+
+@dataclass
+class ChangeManifest:
+    """Target files an executed plan created, updated or deleted; a move is a delete plus a create."""
+
+    created: list[Path] = field(default_factory=list)
+    updated: list[Path] = field(default_factory=list)
+    deleted: list[Path] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.created or self.updated or self.deleted)
 
 
 @dataclass
@@ -44,12 +72,35 @@ class ExecutionStats:
     created: int = 0
     updated: int = 0
     skipped: int = 0
+    deleted: int = 0
+    moved: int = 0
+    # Conflicts settled by --on-conflict, counted per outcome ("source", "target", "keep-both").
+    conflicts: dict[str, int] = field(default_factory=dict)
+    changes: ChangeManifest = field(default_factory=ChangeManifest)
 
-    def add_created(self) -> None:
+    def add_created(self, path: Path | None = None) -> None:
         self.created += 1
+        if path is not None:
+            self.changes.created.append(path)
 
-    def add_updated(self) -> None:
+    def add_updated(self, path: Path | None = None) -> None:
         self.updated += 1
+        if path is not None:
+            self.changes.updated.append(path)
 
     def add_skipped(self) -> None:
         self.skipped += 1
+
+    def add_deleted(self, path: Path | None = None) -> None:
+        self.deleted += 1
+        if path is not None:
+            self.changes.deleted.append(path)
+
+    def add_moved(self, source: Path | None = None, target: Path | None = None) -> None:
+        self.moved += 1
+        if source is not None and target is not None:
+            self.changes.deleted.append(source)
+            self.changes.created.append(target)
+
+    def add_conflict(self, outcome: str) -> None:
+        self.conflicts[outcome] = self.conflicts.get(outcome, 0) + 1
@@ -0,0 +1,157 @@
+"""Rate-limited progress reporting for long runs."""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Final, TextIO
+
+from .logging import flush as flush_log
+
+# Minimum seconds between redraws of the live line on a TTY.
+_TTY_INTERVAL: Final = 0.1
+# Seconds between heartbeat lines when stderr is not a TTY.
+_HEARTBEAT_INTERVAL: Final = 10.0
+
+
+@dataclass
+class _Phase:
+    name: str
+    total: int | None
+    started: float
+    files: int = 0
+    nbytes: int = 0
+
+
+class Progress:
+    """Tracks files and bytes per phase (scan, plan, execute) and reports them.
+
+    On a TTY a single status line is redrawn at most every 0.1 s. Otherwise a
+    heartbeat line is written every 10 s, so CI logs show the run is alive
+    without one line per file.
+    """
+
+    def __init__(
+        self,
+        *,
+        stream: TextIO | None = None,
+        live: bool | None = None,
+        json_lines: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.stream = stream if stream is not None else sys.stderr
+        self.json_lines = json_lines
+        if json_lines:
+            live = False
+        self.live = self.stream.isatty() if live is None else live
+        self.clock = clock
+        self.interval = _TTY_INTERVAL if self.live else _HEARTBEAT_INTERVAL
+        self._phase: _Phase | None = None
+        self._last_report = 0.0
+        self._line_shown = False
+
+    def start(self, name: str, total: int | None = None) -> None:
+        # Log lines from the previous phase are written before this one reports.
+        flush_log()
+        self.clear()
+        now = self.clock()
+        self._phase = _Phase(name=name, total=total, started=now)
+        self._last_report = now
+
+    def advance(self, files: int = 1, nbytes: int = 0) -> None:
+        phase = self._phase
+        if phase is None:
+            return
+        phase.files += files
+        phase.nbytes += nbytes
+        now = self.clock()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self._report(phase, now)
+
+    def clear(self) -> None:
+        """Erase the live line, e.g. before a prompt or when a phase ends."""
+        if self._line_shown:
+            self.stream.write("\r\033[K")
+            self.stream.flush()
+            self._line_shown = False
+
+    def finish(self) -> None:
+        self.clear()
+        self._phase = None
+
+    def _report(self, phase: _Phase, now: float) -> None:
+        flush_log()
+        elapsed = max(now - phase.started, 1e-9)
+        files_per_s = phase.files / elapsed
+        mb_per_s = phase.nbytes / elapsed / 1_000_000
+        eta = None
+        if phase.total is not None and files_per_s > 0:
+            eta = max(phase.total - phase.files, 0) / files_per_s
+
+        if self.json_lines:
+            record = {
+                "level": "info",
+                "message": "progress",
+                "phase": phase.name,
+                "files": phase.files,
+                "total": phase.total,
+                "files_per_s": round(files_per_s, 1),
+                "mb_per_s": round(mb_per_s, 2),
+                "eta_s": None if eta is None else round(eta),
+            }
+            self.stream.write(json.dumps(record) + "\n")
+            self.stream.flush()
+            return
+
+        count = f"{phase.files}/{phase.total}" if phase.total is not None else str(phase.files)
+        text = f"{phase.name}: {count} files, {files_per_s:.1f} files/s, {mb_per_s:.2f} MB/s"
+        if eta is not None:
+            text += f", ETA {_format_duration(eta)}"
+        if self.live:
+            self.stream.write(f"\r\033[K{text}")
+            self._line_shown = True
+        else:
+            self.stream.write(f"[INFO] {text}\n")
+        self.stream.flush()
+
+
+class _NullProgress(Progress):
+    def __init__(self) -> None:
+        pass
+
+    def start(self, name: str, total: int | None = None) -> None:
+        pass
+
+    def advance(self, files: int = 1, nbytes: int = 0) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+
+_current: Progress = _NullProgress()
+
+
+def configure(progress: Progress | None) -> None:
+    """Install the reporter used by scan, plan and execute; None disables reporting."""
+    global _current
+    _current = progress if progress is not None else _NullProgress()
+
+
+def current() -> Progress:
+    return _current
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
@@ -9,7 +9,8 @@ from pathlib import Path
 from typing import Literal
 
 from .exceptions import InteractiveError
-from .logging import info
+from .logging import flush, info
+from .progress import current as current_progress
 
 PromptChoice = Literal["overwrite", "skip", "diff", "quit"]
 
@@ -43,6 +44,7 @@ class PromptEngine:
         if not sys.stdin.isatty():
             raise InteractiveError("Interactive confirmation required; rerun with --force to proceed")
 
+        current_progress().clear()
         # Show file information with modification times
         self._show_file_info(source_path, target_path)
 
@@ -50,6 +52,7 @@ class PromptEngine:
         while True:
             info(f"File differs: {target_path}", quiet=self.quiet)
             info(options, quiet=self.quiet)
+            flush()
             try:
                 choice = input().strip()
             except EOFError as exc:
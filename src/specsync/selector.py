@@ -2,106 +2,188 @@
 
 from __future__ import annotations
 
+import os
+import re
+import zlib
+from dataclasses import replace
 from pathlib import Path
+from typing import Iterable, Iterator
 
+from .cache import active_caches, stamp
 from .exceptions import FrontmatterError
 from .frontmatter import FrontmatterResult, parse_frontmatter
 from .fs import is_within, iter_markdown_files, read_text
+from .ignore import CombinedIgnoreRules
 from .models import SpecDocument
+from .progress import current as current_progress
 
+# Copies left by --on-conflict keep-both, e.g. notes.conflict-workspace.md or notes.conflict-repo-2.md.
+_CONFLICT_COPY = re.compile(r"\.conflict-(?:workspace|repo)(?:-\d+)?\.md$")
 
-def collect_workspace_documents(config) -> tuple[list[SpecDocument], list[str]]:
+
+def collect_workspace_documents(
+    config, *, paths: Iterable[tuple[Path, Path]] | None = None
+) -> tuple[list[SpecDocument], list[str]]:
+    """Read the selected workspace specs; ``paths`` replaces the walk with a listing made earlier."""
     base = config.workspace_specs_dir
     documents: list[SpecDocument] = []
     warnings: list[str] = []
+    progress = current_progress()
 
-    for path in iter_markdown_files(base):
+    for path, relative in iter_candidate_paths(base, config) if paths is None else paths:
         if path.is_symlink():
             warnings.append(f"Skipping symlink in workspace: {path}")
             continue
         if not is_within(base, path):
             warnings.append(f"Skipping out-of-tree file in workspace: {path}")
             continue
+        if config.spec_filter.too_large(path):
+            warnings.append(f"Filtered out (larger than max_file_size): {path}")
+            continue
 
-        text = read_text(path)
-        result = _parse(path, text)
-        frontmatter = result.frontmatter or {}
-        metadata_status = "valid"
-        if not result.had_frontmatter:
-            metadata_status = "missing"
-        elif not isinstance(frontmatter.get("expose"), bool):
-            metadata_status = "invalid"
-
-        if config.require_expose:
-            expose = frontmatter.get("expose")
-            if expose is not True:
-                warnings.append(f"Filtered out (expose!=true): {path}")
-                continue
-        if config.match_project:
-            project_val = frontmatter.get("project")
-            if project_val and project_val != config.project_name:
-                warnings.append(f"Filtered out (project mismatch): {path}")
-                continue
+        doc = read_document(path, relative, workspace_path=path, repo_path=config.repo_specs_dir / relative)
+        progress.advance(nbytes=len(doc.raw_text))
 
-        relative = path.relative_to(base)
-        workspace_path = path
-        repo_path = (config.repo_specs_dir / relative).resolve()
-
-        documents.append(
-            SpecDocument(
-                relative_path=relative,
-                workspace_path=workspace_path,
-                repo_path=repo_path,
-                frontmatter=frontmatter if result.had_frontmatter else None,
-                body=result.body,
-                metadata_status=metadata_status,
-                raw_text=text,
-            )
-        )
+        reason = filter_reason(doc, config)
+        if reason is not None:
+            warnings.append(f"Filtered out ({reason}): {path}")
+            continue
+
+        doc.repo_path = doc.repo_path.resolve()
+        documents.append(doc)
 
     return documents, warnings
 
 
-def collect_repo_documents(config) -> tuple[list[SpecDocument], list[str]]:
+def collect_repo_documents(
+    config, *, paths: Iterable[tuple[Path, Path]] | None = None
+) -> tuple[list[SpecDocument], list[str]]:
+    """Read the repo specs; ``paths`` replaces the walk with a listing made earlier."""
     base = config.repo_specs_dir
     documents: list[SpecDocument] = []
     warnings: list[str] = []
+    progress = current_progress()
 
-    for path in iter_markdown_files(base):
+    for path, relative in iter_candidate_paths(base, config) if paths is None else paths:
         if path.is_symlink():
             warnings.append(f"Skipping symlink in repo: {path}")
             continue
         if not is_within(base, path):
             warnings.append(f"Skipping out-of-tree file in repo: {path}")
             continue
+        if config.spec_filter.too_large(path):
+            warnings.append(f"Filtered out (larger than max_file_size): {path}")
+            continue
 
-        text = read_text(path)
-        result = _parse(path, text)
-        frontmatter = result.frontmatter or {}
-        metadata_status = "valid"
-        if not result.had_frontmatter:
-            metadata_status = "missing"
-        elif not isinstance(frontmatter.get("expose"), bool):
-            metadata_status = "invalid"
-
-        relative = path.relative_to(base)
-        workspace_path = (config.workspace_specs_dir / relative).resolve()
-
-        documents.append(
-            SpecDocument(
-                relative_path=relative,
-                workspace_path=workspace_path,
-                repo_path=path,
-                frontmatter=frontmatter if result.had_frontmatter else None,
-                body=result.body,
-                metadata_status=metadata_status,
-                raw_text=text,
-            )
-        )
+        doc = read_document(path, relative, workspace_path=(config.workspace_specs_dir / relative).resolve(), repo_path=path)
+        progress.advance(nbytes=len(doc.raw_text))
+        documents.append(doc)
 
     return documents, warnings
 
 
+def iter_candidate_paths(base: Path, config) -> Iterator[tuple[Path, Path]]:
+    """Yield ``(path, relative)`` for files that pass the path rules, without opening them.
+
+    Directories outside the positional path scope, excluded by the filter or
+    by ``.specsyncignore`` are pruned before they are listed. The ignore files
+    of both specs trees apply to every walk. Conflict copies are never
+    candidates, so they are neither synced nor pruned.
+    """
+    spec_filter = config.spec_filter
+    scope = config.scope
+    ignore = sync_ignore_rules(config)
+
+    def skip_dir(relative: str) -> bool:
+        if scope is not None and not scope.enter_dir(relative):
+            return True
+        return spec_filter.skip_dir(relative) or ignore.ignored(relative, is_dir=True)
+
+    for path in iter_markdown_files(base, skip_dir=skip_dir):
+        relative = path.relative_to(base)
+        posix = relative.as_posix()
+        if scope is not None and not scope.match_path(posix):
+            continue
+        if not spec_filter.match_path(posix) or ignore.ignored(posix, is_dir=False) or is_conflict_copy(posix):
+            continue
+        yield path, relative
+
+
+def is_conflict_copy(relative: str) -> bool:
+    return _CONFLICT_COPY.search(relative) is not None
+
+
+def sync_ignore_rules(config) -> CombinedIgnoreRules:
+    """The ``.specsyncignore`` rules of the workspace and repo specs trees together."""
+    return CombinedIgnoreRules(config.workspace_specs_dir, config.repo_specs_dir)
+
+
+def read_document(path: Path, relative: Path, *, workspace_path: Path, repo_path: Path) -> SpecDocument:
+    caches = active_caches()
+    if caches is None:
+        return _read_document(path, relative, workspace_path=workspace_path, repo_path=repo_path)
+
+    key = os.fspath(path)
+    version = stamp(os.stat(path))
+    cached = caches.document.get(key)
+    if cached is not None and version is not None and cached[0] == version:
+        return _copy_document(cached[1], relative_path=relative, workspace_path=workspace_path, repo_path=repo_path)
+    doc = _read_document(path, relative, workspace_path=workspace_path, repo_path=repo_path)
+    if version is not None:
+        caches.document.put(key, (version, _copy_document(doc)))
+    return doc
+
+
+def _copy_document(doc: SpecDocument, **changes) -> SpecDocument:
+    # Callers may adjust paths, status and metadata on the documents they get.
+    frontmatter = dict(doc.frontmatter) if doc.frontmatter is not None else None
+    return replace(doc, frontmatter=frontmatter, **changes)
+
+
+def _read_document(path: Path, relative: Path, *, workspace_path: Path, repo_path: Path) -> SpecDocument:
+    return parse_document(read_text(path), path, relative, workspace_path=workspace_path, repo_path=repo_path)
+
+
+def parse_document(text: str, path: Path, relative: Path, *, workspace_path: Path, repo_path: Path) -> SpecDocument:
+    """Build a document from text that did not come from ``path`` on disk, e.g. a staged blob."""
+    result = _parse(path, text)
+    frontmatter = result.frontmatter or {}
+    metadata_status = "valid"
+    if not result.had_frontmatter:
+        metadata_status = "missing"
+    elif not isinstance(frontmatter.get("expose"), bool):
+        metadata_status = "invalid"
+
+    return SpecDocument(
+        relative_path=relative,
+        workspace_path=workspace_path,
+        repo_path=repo_path,
+        frontmatter=frontmatter if result.had_frontmatter else None,
+        body=result.body,
+        metadata_status=metadata_status,
+        raw_text=text,
+    )
+
+
+def filter_reason(doc: SpecDocument, config) -> str | None:
+    """Return why the frontmatter filters reject a document, or None."""
+    frontmatter = doc.frontmatter or {}
+    if config.require_expose:
+        expose = frontmatter.get("expose")
+        if expose is not True:
+            return "expose!=true"
+    if config.match_project:
+        project_val = frontmatter.get("project")
+        if project_val and project_val != config.project_name:
+            return "project mismatch"
+    return config.spec_filter.frontmatter_reason(frontmatter)
+
+
+def shard_index(relative: Path, count: int) -> int:
+    """Assign a relative path to one of ``count`` shards by a hash that is stable across processes."""
+    return zlib.crc32(relative.as_posix().encode("utf-8")) % count
+
+
 def _parse(path: Path, text: str) -> FrontmatterResult:
     try:
         return parse_frontmatter(text, path=path)
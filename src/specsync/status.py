@@ -0,0 +1,127 @@
+"""Read-only comparison of the workspace and repo trees in one pass."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Literal
+
+from .config import Config
+from .frontmatter import normalize_body, normalize_metadata
+from .fs import digest_text, is_within
+from .models import SpecDocument
+from .progress import current as current_progress
+from .selector import filter_reason, iter_candidate_paths, read_document
+from .transforms import NoteIndex, TransformCache
+
+StatusState = Literal["workspace-only", "repo-only", "identical", "differs"]
+# One-letter codes for the short listing, in the spirit of ``git status -s``.
+STATUS_CODES: dict[StatusState, str] = {"workspace-only": "W", "repo-only": "R", "differs": "M", "identical": " "}
+
+
+@dataclass(frozen=True)
+class StatusEntry:
+    path: Path
+    state: StatusState
+
+
+def tree_status(config: Config) -> tuple[list[StatusEntry], list[str]]:
+    """Classify every selected spec path by comparing both trees.
+
+    The two sorted walks are merged, so each directory is listed once per
+    tree and each file is read at most once. Workspace notes rejected by the
+    frontmatter filters count as absent, as they do for pull and push. With
+    transforms configured, the transformed workspace text is compared, as
+    pull does, once every selected note is known for resolving wikilinks;
+    the transform cache is read but never written.
+    """
+    warnings: list[str] = []
+    entries: list[StatusEntry] = []
+    transform_cache = TransformCache.load(config.state_dir / "transform-cache.json") if config.transforms else None
+    progress = current_progress()
+    progress.start("status")
+    workspace = iter_candidate_paths(config.workspace_specs_dir, config)
+    repo = iter_candidate_paths(config.repo_specs_dir, config)
+    pairs: list[tuple[SpecDocument, SpecDocument]] = []
+    for relative, workspace_path, repo_path in _merge(workspace, repo):
+        workspace_doc = repo_doc = None
+        if workspace_path is not None:
+            workspace_doc = _read(workspace_path, relative, config, "workspace", warnings)
+            if workspace_doc is not None:
+                progress.advance(nbytes=len(workspace_doc.raw_text))
+                reason = filter_reason(workspace_doc, config)
+                if reason is not None:
+                    warnings.append(f"Filtered out ({reason}): {workspace_path}")
+                    workspace_doc = None
+        if repo_path is not None:
+            repo_doc = _read(repo_path, relative, config, "repo", warnings)
+            if repo_doc is not None:
+                progress.advance(nbytes=len(repo_doc.raw_text))
+
+        if workspace_doc is None and repo_doc is None:
+            continue
+        if repo_doc is None:
+            state: StatusState = "workspace-only"
+        elif workspace_doc is None:
+            state = "repo-only"
+        elif transform_cache is not None:
+            pairs.append((workspace_doc, repo_doc))
+            continue
+        else:
+            state = "identical" if _equivalent(workspace_doc, repo_doc, config) else "differs"
+        entries.append(StatusEntry(path=relative, state=state))
+
+    if transform_cache is not None:
+        selected = [entry.path for entry in entries if entry.state == "workspace-only"]
+        notes = NoteIndex(selected + [workspace_doc.relative_path for workspace_doc, _ in pairs])
+        for workspace_doc, repo_doc in pairs:
+            output = transform_cache.output_digest(
+                workspace_doc.raw_text, config.transforms, config.digest, relative=workspace_doc.relative_path, notes=notes
+            )
+            state = "identical" if output == digest_text(repo_doc.raw_text, config.digest) else "differs"
+            entries.append(StatusEntry(path=workspace_doc.relative_path, state=state))
+        entries.sort(key=lambda entry: entry.path.parts)
+    progress.finish()
+    return entries, warnings
+
+
+def _merge(
+    workspace: Iterator[tuple[Path, Path]], repo: Iterator[tuple[Path, Path]]
+) -> Iterator[tuple[Path, Path | None, Path | None]]:
+    """Yield ``(relative, workspace_path, repo_path)`` from two walks sorted by path parts."""
+    left = next(workspace, None)
+    right = next(repo, None)
+    while left is not None or right is not None:
+        if right is None or (left is not None and left[1].parts < right[1].parts):
+            yield left[1], left[0], None
+            left = next(workspace, None)
+        elif left is None or right[1].parts < left[1].parts:
+            yield right[1], None, right[0]
+            right = next(repo, None)
+        else:
+            yield left[1], left[0], right[0]
+            left = next(workspace, None)
+            right = next(repo, None)
+
+
+def _read(path: Path, relative: Path, config: Config, label: str, warnings: list[str]) -> SpecDocument | None:
+    base = config.workspace_specs_dir if label == "workspace" else config.repo_specs_dir
+    if path.is_symlink():
+        warnings.append(f"Skipping symlink in {label}: {path}")
+        return None
+    if not is_within(base, path):
+        warnings.append(f"Skipping out-of-tree file in {label}: {path}")
+        return None
+    if config.spec_filter.too_large(path):
+        warnings.append(f"Filtered out (larger than max_file_size): {path}")
+        return None
+    return read_document(path, relative, workspace_path=path, repo_path=path)
+
+
+def _equivalent(workspace_doc: SpecDocument, repo_doc: SpecDocument, config: Config) -> bool:
+    # Same rules as sync planning: formatting-only differences are not drift.
+    if workspace_doc.raw_text == repo_doc.raw_text:
+        return True
+    return normalize_body(workspace_doc.body) == normalize_body(repo_doc.body) and normalize_metadata(
+        workspace_doc.frontmatter
+    ) == normalize_metadata(repo_doc.frontmatter)
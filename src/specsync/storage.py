@@ -0,0 +1,370 @@
+"""Storage backends for spec trees that are not on the local filesystem."""
+
+from __future__ import annotations
+
+import base64
+import email.utils
+import http.client
+import os
+import queue
+import shutil
+import time
+import xml.etree.ElementTree as ElementTree
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Iterator, Protocol
+from urllib.parse import quote, unquote, urlsplit
+
+from .attachments import link_targets
+from .exceptions import StorageError
+from .fs import read_text, stream_file_atomic
+from .ignore import IGNORE_FILE, CombinedIgnoreRules
+
+_CHUNK_SIZE = 65536
+_DAV = "{DAV:}"
+_PROPFIND_BODY = (
+    b'<?xml version="1.0" encoding="utf-8"?>'
+    b'<propfind xmlns="DAV:"><prop><resourcetype/><getcontentlength/><getlastmodified/><getetag/></prop></propfind>'
+)
+
+
+@dataclass(frozen=True)
+class StorageEntry:
+    name: str
+    is_dir: bool
+    size: int = 0
+    mtime_ns: int = 0
+    etag: str | None = None
+
+
+class StorageBackend(Protocol):
+    """A read-only spec tree addressed by posix paths relative to its root ("" is the root)."""
+
+    def list_dir(self, relative: str) -> list[StorageEntry]:
+        """All entries of a directory with their stat data, sorted by name, in one call."""
+
+    def read_range(self, relative: str, start: int = 0, length: int | None = None) -> bytes: ...
+
+    def copy_to(self, relative: str, stream: BinaryIO) -> None:
+        """Write a file's contents to ``stream`` in chunks, never holding it all in memory."""
+
+    def close(self) -> None: ...
+
+
+class LocalBackend:
+    """A directory on the local filesystem."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def list_dir(self, relative: str) -> list[StorageEntry]:
+        entries = []
+        try:
+            scan = os.scandir(self._path(relative))
+        except (FileNotFoundError, NotADirectoryError):
+            return []
+        with scan:
+            for entry in scan:
+                stat = entry.stat(follow_symlinks=False)
+                entries.append(StorageEntry(entry.name, entry.is_dir(follow_symlinks=False), stat.st_size, stat.st_mtime_ns))
+        return sorted(entries, key=lambda entry: entry.name)
+
+    def read_range(self, relative: str, start: int = 0, length: int | None = None) -> bytes:
+        with self._path(relative).open("rb") as handle:
+            handle.seek(start)
+            return handle.read() if length is None else handle.read(length)
+
+    def copy_to(self, relative: str, stream: BinaryIO) -> None:
+        with self._path(relative).open("rb") as handle:
+            shutil.copyfileobj(handle, stream, _CHUNK_SIZE)
+
+    def close(self) -> None:
+        pass
+
+    def _path(self, relative: str) -> Path:
+        return self.root.joinpath(*_parts(relative))
+
+
+class ZipBackend:
+    """Members of a zip archive; the central directory is read once and serves every listing."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            self.archive = zipfile.ZipFile(self.path)
+        except (OSError, zipfile.BadZipFile) as exc:
+            raise StorageError(f"Unable to open zip archive {self.path}: {exc}") from exc
+        self._dirs: dict[str, dict[str, StorageEntry]] = {"": {}}
+        for info in self.archive.infolist():
+            parts = _parts(info.filename)
+            for depth in range(len(parts)):
+                parent = "/".join(parts[:depth])
+                is_dir = depth < len(parts) - 1 or info.is_dir()
+                listing = self._dirs.setdefault(parent, {})
+                if is_dir:
+                    self._dirs.setdefault("/".join(parts[: depth + 1]), {})
+                    listing.setdefault(parts[depth], StorageEntry(parts[depth], True))
+                else:
+                    mtime = int(time.mktime((*info.date_time, 0, 0, -1)))
+                    listing[parts[depth]] = StorageEntry(parts[depth], False, info.file_size, mtime * 1_000_000_000)
+
+    def list_dir(self, relative: str) -> list[StorageEntry]:
+        return sorted(self._dirs.get(_key(relative), {}).values(), key=lambda entry: entry.name)
+
+    def read_range(self, relative: str, start: int = 0, length: int | None = None) -> bytes:
+        with self._open(relative) as handle:
+            handle.seek(start)
+            return handle.read() if length is None else handle.read(length)
+
+    def copy_to(self, relative: str, stream: BinaryIO) -> None:
+        with self._open(relative) as handle:
+            shutil.copyfileobj(handle, stream, _CHUNK_SIZE)
+
+    def _open(self, relative: str):
+        try:
+            return self.archive.open(_key(relative))
+        except KeyError as exc:
+            raise StorageError(f"No such member in {self.path}: {relative}") from exc
+
+    def close(self) -> None:
+        self.archive.close()
+
+
+class WebDAVBackend:
+    """A collection on a WebDAV server, reached over a small pool of keep-alive connections.
+
+    Each directory is listed with one ``PROPFIND`` (Depth: 1), which returns
+    the size, modification time and ETag of every child, so files can be
+    selected without being downloaded. Reads use ranged ``GET``, and
+    :meth:`copy_to` streams the response body in chunks.
+    """
+
+    def __init__(self, url: str, *, pool_size: int = 4, timeout: float = 30.0) -> None:
+        parts = urlsplit(url)
+        if parts.scheme not in {"http", "https"} or not parts.hostname:
+            raise StorageError(f"Not a WebDAV URL: {url}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/") + "/"
+        self.timeout = timeout
+        self.headers: dict[str, str] = {}
+        if parts.username:
+            credentials = f"{unquote(parts.username)}:{unquote(parts.password or '')}".encode("utf-8")
+            self.headers["Authorization"] = "Basic " + base64.b64encode(credentials).decode("ascii")
+        self._pool: queue.LifoQueue[http.client.HTTPConnection] = queue.LifoQueue(maxsize=pool_size)
+
+    def list_dir(self, relative: str) -> list[StorageEntry]:
+        status, body = self._request("PROPFIND", self._url(relative, directory=True), {"Depth": "1"}, _PROPFIND_BODY)
+        if status == 404:
+            return []
+        _check(status, "PROPFIND", relative, {207})
+        own = self._url(relative, directory=True).rstrip("/")
+        entries = []
+        for href, entry in _parse_multistatus(body):
+            if href.rstrip("/") != own:
+                entries.append(entry)
+        return sorted(entries, key=lambda entry: entry.name)
+
+    def read_range(self, relative: str, start: int = 0, length: int | None = None) -> bytes:
+        headers = {}
+        if start or length is not None:
+            end = "" if length is None else str(start + length - 1)
+            headers["Range"] = f"bytes={start}-{end}"
+        status, body = self._request("GET", self._url(relative), headers)
+        _check(status, "GET", relative, {200, 206})
+        if status == 200 and headers:  # Server ignored the range.
+            body = body[start:] if length is None else body[start : start + length]
+        return body
+
+    def copy_to(self, relative: str, stream: BinaryIO) -> None:
+        status, _ = self._request("GET", self._url(relative), {}, sink=stream)
+        _check(status, "GET", relative, {200})
+
+    def close(self) -> None:
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+    def _url(self, relative: str, *, directory: bool = False) -> str:
+        path = self.base_path + quote("/".join(_parts(relative)))
+        return path.rstrip("/") + "/" if directory else path
+
+    def _request(
+        self, method: str, url: str, headers: dict[str, str], body: bytes | None = None, *, sink: BinaryIO | None = None
+    ) -> tuple[int, bytes]:
+        """Send one request; a successful response body goes to ``sink`` in chunks when one is given."""
+        connection = self._connection()
+        try:
+            connection.request(method, url, body=body, headers={**self.headers, **headers})
+            response = connection.getresponse()
+            if sink is not None and response.status == 200:
+                data = b""
+                while chunk := response.read(_CHUNK_SIZE):
+                    sink.write(chunk)
+            else:
+                data = response.read()
+        except (OSError, http.client.HTTPException) as exc:
+            connection.close()
+            raise StorageError(f"{method} {url} failed: {exc}") from exc
+        if response.will_close:
+            connection.close()
+        else:
+            try:
+                self._pool.put_nowait(connection)
+            except queue.Full:
+                connection.close()
+        return response.status, data
+
+    def _connection(self) -> http.client.HTTPConnection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            factory = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            return factory(self.host, self.port, timeout=self.timeout)
+
+
+def is_backend_location(location: str) -> bool:
+    """Whether ``location`` names a WebDAV collection, zip archive or directory rather than a tar stream."""
+    if location.startswith(("http://", "https://", "zip://")) or location.lower().endswith(".zip"):
+        return True
+    return Path(location).expanduser().is_dir()
+
+
+def open_backend(location: str) -> StorageBackend:
+    """Backend for an ``http(s)://`` WebDAV URL, a ``.zip`` archive or a local directory."""
+    if location.startswith(("http://", "https://")):
+        return WebDAVBackend(location)
+    if location.startswith("zip://"):
+        return ZipBackend(Path(location.removeprefix("zip://")).expanduser())
+    path = Path(location).expanduser()
+    if path.suffix.lower() == ".zip":
+        return ZipBackend(path)
+    return LocalBackend(path)
+
+
+def walk_files(backend: StorageBackend, skip_dir=None, relative: str = "") -> Iterator[tuple[str, StorageEntry]]:
+    """Yield ``(relative, entry)`` for files in name order, one listing per directory.
+
+    Hidden directories are never entered and ``skip_dir`` prunes a directory
+    before it is listed, as in :func:`specsync.fs.iter_markdown_files`. A
+    directory's ``.specsyncignore`` is yielded before its other entries, so
+    the caller can load it before the rest of the directory is filtered.
+    """
+    entries = backend.list_dir(relative)
+    for entry in sorted(entries, key=lambda entry: entry.name != IGNORE_FILE):
+        path = f"{relative}/{entry.name}" if relative else entry.name
+        if entry.is_dir:
+            if entry.name.startswith(".") or (skip_dir is not None and skip_dir(path)):
+                continue
+            yield from walk_files(backend, skip_dir, path)
+        else:
+            yield path, entry
+
+
+def fetch_specs(backend: StorageBackend, destination: Path, config) -> int:
+    """Copy the markdown files a pull could select from ``backend`` below ``destination``.
+
+    Path rules, ``.specsyncignore`` and the size limit are applied to the
+    listing, so files that would be filtered out are never downloaded and
+    ignored directories are never listed. Each directory's ignore file is
+    fetched before the rest of it, and the repo's ignore files apply too, as
+    in :func:`specsync.selector.iter_candidate_paths`. With
+    ``config.attachments`` the files the fetched specs link to are fetched as
+    well. Files are streamed to disk and keep the modification time of the
+    listing. Returns the number of files fetched.
+    """
+    spec_filter = config.spec_filter
+    scope = config.scope
+    # Reads each fetched ignore file from ``destination`` the first time its directory is filtered.
+    ignore = CombinedIgnoreRules(destination, config.repo_specs_dir)
+
+    def skip_dir(relative: str) -> bool:
+        if scope is not None and not scope.enter_dir(relative):
+            return True
+        return spec_filter.skip_dir(relative) or ignore.ignored(relative, is_dir=True)
+
+    links: set[str] = set()
+    count = 0
+    for relative, entry in walk_files(backend, skip_dir):
+        name = PurePosixPath(relative).name
+        if name != IGNORE_FILE:
+            if not name.endswith(".md") or not spec_filter.match_path(relative):
+                continue
+            if scope is not None and not scope.match_path(relative):
+                continue
+            if spec_filter.max_file_size is not None and entry.size > spec_filter.max_file_size:
+                continue
+            if ignore.ignored(relative, is_dir=False):
+                continue
+        target = _fetch(backend, relative, entry, destination)
+        if config.attachments and name != IGNORE_FILE:
+            links |= link_targets(PurePosixPath(relative), read_text(target))
+        count += 1
+
+    # Linked files are looked up in their directory's listing, so missing or
+    # markdown targets cost one listing per directory and no download; the
+    # pull then warns about what is missing.
+    listings: dict[str, dict[str, StorageEntry]] = {}
+    for relative in sorted(links):
+        parts = relative.split("/")
+        if parts[0] == ".." or relative.endswith(".md") or any(part.startswith(".") for part in parts):
+            continue
+        if ignore.ignored_path(relative):
+            continue
+        parent = "/".join(parts[:-1])
+        if parent not in listings:
+            listings[parent] = {entry.name: entry for entry in backend.list_dir(parent)}
+        entry = listings[parent].get(parts[-1])
+        if entry is not None and not entry.is_dir:
+            _fetch(backend, relative, entry, destination)
+            count += 1
+    return count
+
+
+def _fetch(backend: StorageBackend, relative: str, entry: StorageEntry, destination: Path) -> Path:
+    target = destination.joinpath(*_parts(relative))
+    # Streamed to a temp file first, so a failed download never leaves a truncated spec behind.
+    stream_file_atomic(target, lambda handle: backend.copy_to(relative, handle))
+    if entry.mtime_ns:
+        os.utime(target, ns=(entry.mtime_ns, entry.mtime_ns))
+    return target
+
+
+def _parts(relative: str) -> tuple[str, ...]:
+    parts = tuple(part for part in relative.split("/") if part and part != ".")
+    if ".." in parts:
+        raise StorageError(f"Path escapes the storage root: {relative}")
+    return parts
+
+
+def _key(relative: str) -> str:
+    return "/".join(_parts(relative))
+
+
+def _check(status: int, method: str, relative: str, expected: set[int]) -> None:
+    if status not in expected:
+        raise StorageError(f"{method} {relative or '/'} failed with HTTP {status}")
+
+
+def _parse_multistatus(body: bytes) -> list[tuple[str, StorageEntry]]:
+    try:
+        root = ElementTree.fromstring(body)
+    except ElementTree.ParseError as exc:
+        raise StorageError(f"Invalid PROPFIND response: {exc}") from exc
+    results = []
+    for response in root.iter(f"{_DAV}response"):
+        href = unquote(urlsplit(response.findtext(f"{_DAV}href", "")).path)
+        prop = response.find(f"{_DAV}propstat/{_DAV}prop")
+        if prop is None:
+            continue
+        is_dir = prop.find(f"{_DAV}resourcetype/{_DAV}collection") is not None
+        size = int(prop.findtext(f"{_DAV}getcontentlength") or 0)
+        modified = prop.findtext(f"{_DAV}getlastmodified")
+        mtime_ns = int(email.utils.parsedate_to_datetime(modified).timestamp()) * 1_000_000_000 if modified else 0
+        name = PurePosixPath(href.rstrip("/")).name
+        results.append((quote(href), StorageEntry(name, is_dir, size, mtime_ns, prop.findtext(f"{_DAV}getetag"))))
+    return results
@@ -3,17 +3,60 @@
 from __future__ import annotations
 
 import difflib
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, replace
 from pathlib import Path
+from stat import S_ISREG
+from typing import Iterator
 
+from .attachments import find_attachments
 from .config import Config
-from .exceptions import ConfigError, SpecsyncError
-from .frontmatter import render_frontmatter
-from .fs import copy_file, hash_file, write_file_atomic
-from .logging import info, warn
-from .models import ExecutionStats, PlanEntry, SyncPlan
+from .exceptions import ConfigError, ConflictError, FrontmatterError, SpecsyncError
+from .filters import PathScope, glob_escape
+from .frontmatter import normalize_body, normalize_metadata, render_frontmatter
+from .fs import (
+    copy_file,
+    digest_file,
+    digest_text,
+    is_within,
+    move_file,
+    remove_file,
+    write_file_atomic,
+)
+from .gitindex import GitIndex, changed_since
+from .journal import Journal, JournalRecord, journal_path, load_journal
+from .locking import DirectoryLocks
+from .logging import flush, info, log_format, warn_all
+from .models import (
+    ConflictPolicy,
+    ExecutionStats,
+    MetadataStatus,
+    PlanEntry,
+    PlanState,
+    SpecDocument,
+    SyncDirection,
+    SyncPlan,
+)
+from .progress import configure as configure_progress
+from .progress import current as current_progress
 from .prompt import PromptEngine
-from .selector import collect_repo_documents, collect_workspace_documents
+from .schedule import create_directories, schedule_entries
+from .selector import (
+    collect_repo_documents,
+    collect_workspace_documents,
+    filter_reason,
+    iter_candidate_paths,
+    read_document,
+    shard_index,
+    sync_ignore_rules,
+)
+from .transaction import Transaction
+from .transforms import CacheEntry, NoteIndex, TransformCache, transform_text
+
+# A target file with no selected source: (path, path relative to the target root).
+Orphan = tuple[Path, Path]
+# A file that passed the path rules: (path, path relative to its tree's root).
+Candidate = tuple[Path, Path]
 
 
 @dataclass
@@ -22,105 +65,843 @@ class PlanSummary:
     update: int
     conflicts: int
     skip: int
+    delete: int = 0
+    move: int = 0
 
 
 def build_pull_plan(config: Config) -> SyncPlan:
-    documents, warnings = collect_workspace_documents(config)
+    return _build_plan(config, "pull")
+
+
+def build_push_plan(config: Config) -> SyncPlan:
+    return _build_plan(config, "push")
+
+
+def _build_plan(config: Config, direction: SyncDirection) -> SyncPlan:
+    if direction == "push" and config.since:
+        config = replace(config, scope=_since_scope(config))
+    transform_cache = _load_transform_cache(config, direction)
+    if config.jobs > 1:
+        entries, orphans, warnings = _plan_parallel(config, direction, transform_cache)
+    else:
+        entries, orphans, warnings = _plan_entries(config, direction, transform_cache=transform_cache)
+    notes = None
+    if transform_cache is not None:
+        transform_cache.save()
+        notes = NoteIndex(entry.document.relative_path for entry in entries if not entry.attachment)
+
+    if config.detect_moves and orphans:
+        orphans = _detect_moves(entries, orphans, config, direction)
+    if config.prune:
+        for target, relative in orphans:
+            _add_delete(entries, warnings, target, relative, config, direction=direction)
+    if config.on_conflict == "keep-both":
+        for entry in entries:
+            if entry.state == "conflict":
+                entry.conflict_copy = _conflict_copy_path(entry.target_path, direction)
+                entry.stamps[entry.conflict_copy] = ()
+    entries.sort(key=lambda entry: entry.document.relative_path.parts)
+    return SyncPlan(direction=direction, entries=entries, warnings=warnings, notes=notes)
+
+
+def _since_scope(config: Config) -> PathScope:
+    """Narrow the scope to repo specs added, modified or deleted since ``config.since``.
+
+    Only the directories leading to those paths are walked, so planning takes
+    time proportional to the diff. Deleted paths stay in scope so ``--prune``
+    removes them from the workspace.
+    """
+    changed = changed_since(config.repo_root, config.repo_specs_dir, config.since)
+    if changed is None:
+        raise ConfigError(f"Unable to diff against {config.since!r}; is it a valid git ref?")
+    patterns = []
+    for path in changed:
+        relative = path.relative_to(config.repo_specs_dir).as_posix()
+        if config.scope is None or config.scope.match_path(relative):
+            patterns.append(glob_escape(relative))
+    return PathScope(tuple(patterns))
+
+
+def _plan_entries(
+    config: Config,
+    direction: SyncDirection,
+    shard: _ShardInput | None = None,
+    transform_cache: TransformCache | None = None,
+) -> tuple[list[PlanEntry], list[Orphan], list[str]]:
+    """Plan creates and comparisons; target files without a source are returned as orphans.
+
+    A ``shard`` carries the paths, git index and note index listed by the
+    parent process, so workers neither walk the trees nor query git. With a
+    ``transform_cache``, sources are compared by the digest of their
+    transformed text; the caller saves the cache.
+    """
+    progress = current_progress()
+    progress.start("scan")
+    sources = shard.sources if shard is not None else None
+    if direction == "pull":
+        documents, warnings = collect_workspace_documents(config, paths=sources)
+        source_root, target_root, target_label = config.workspace_specs_dir, config.repo_specs_dir, "repo"
+    else:
+        documents, warnings = collect_repo_documents(config, paths=sources)
+        source_root, target_root, target_label = config.repo_specs_dir, config.workspace_specs_dir, "workspace"
+    repo_index = shard.repo_index if shard is not None else _load_repo_index(config, warnings)
+    journaled = load_journal(journal_path(config.state_dir, direction), direction) if config.resume else {}
+    notes = None
+    if transform_cache is not None:
+        notes = shard.notes if shard is not None else NoteIndex(doc.relative_path for doc in documents)
     entries: list[PlanEntry] = []
+    orphans: list[Orphan] = []
+
+    progress.start("plan", total=len(documents))
+    targets = shard.targets if shard is not None else None
+    for doc, existing, relative in _merge_join(documents, target_root, config, targets):
+        if doc is None:
+            # A source that exists but was filtered out (size, globs,
+            # frontmatter) is not a deletion; its target stays untouched.
+            if not os.path.lexists(source_root / relative):
+                orphans.append((existing, relative))
+            continue
 
-    for doc in documents:
-        source = doc.workspace_path
-        target = doc.repo_path
-        if not target.exists():
-            state = "create"
-            reason = "missing in repo"
+        progress.advance(nbytes=len(doc.raw_text))
+
+        if direction == "pull":
+            source, target = doc.workspace_path, doc.repo_path
         else:
-            if hash_file(source) == hash_file(target):
-                state = "skip"
-                reason = "unchanged"
-            else:
-                state = "conflict"
-                reason = "differs from repo"
-        entries.append(PlanEntry(document=doc, source_path=source, target_path=target, state=state, reason=reason))
+            source, target = doc.repo_path, doc.workspace_path
+        # Stat before comparing, so a write that lands after the comparison is caught under the lock.
+        stamps = {target: _file_stamp(target) if existing is not None else ()}
+        output_digest = None
+        if transform_cache is not None and existing is not None:
+            output_digest = transform_cache.output_digest(
+                doc.raw_text, config.transforms, config.digest, relative=relative, notes=notes
+            )
+        state, reason = _compare(
+            source, target, existing is not None, relative, target_label, journaled, repo_index, config, output_digest, doc
+        )
+        entries.append(
+            PlanEntry(
+                document=doc,
+                source_path=source,
+                target_path=target,
+                state=state,
+                reason=reason,
+                nbytes=len(doc.raw_text),
+                stamps=stamps,
+            )
+        )
+
+    if config.attachments:
+        for relative in find_attachments(documents, source_root, warnings, sync_ignore_rules(config)):
+            source, target = source_root / relative, target_root / relative
+            stamp = _file_stamp(target)
+            state, reason = _compare(source, target, stamp != (), relative, target_label, journaled, repo_index, config)
+            doc = _attachment_document(relative, direction, source, target)
+            entries.append(
+                PlanEntry(
+                    document=doc,
+                    source_path=source,
+                    target_path=target,
+                    state=state,
+                    reason=reason,
+                    attachment=True,
+                    stamps={target: stamp},
+                )
+            )
+
+    progress.finish()
+    return entries, orphans, warnings
+
+
+def _compare(
+    source: Path,
+    target: Path,
+    exists: bool,
+    relative: Path,
+    target_label: str,
+    journaled: dict[str, JournalRecord],
+    repo_index: GitIndex | None,
+    config: Config,
+    output_digest: str | None = None,
+    document: SpecDocument | None = None,
+) -> tuple[PlanState, str]:
+    """Classify a source against its target.
+
+    ``output_digest`` is the digest of the transformed source. When the bytes
+    differ and the parsed source ``document`` is given, the two sides are
+    compared again by normalized body and metadata.
+    """
+    if not exists:
+        return "create", f"missing in {target_label}"
+    record = journaled.get(relative.as_posix())
+    if record is not None and record.matches(source, target):
+        return "skip", "already applied (resumed)"
+    if output_digest is not None:
+        if digest_file(target, config.digest) == output_digest:
+            return "skip", "unchanged"
+    elif _same_content(source, target, repo_index, config.digest):
+        return "skip", "unchanged"
+    elif document is not None:
+        equivalent = _compare_normalized(document, target, relative, config.digest)
+        if equivalent is not None:
+            return equivalent
+    return "conflict", f"differs from {target_label}"
+
+
+def _compare_normalized(doc: SpecDocument, target: Path, relative: Path, algorithm: str) -> tuple[PlanState, str] | None:
+    """Settle byte differences confined to line endings or frontmatter.
+
+    Equal normalized bodies and metadata (key order, YAML layout, CRLF, or the
+    keys push injects) need no write. Equal bodies with different metadata
+    values are still a conflict, settled by ``--on-conflict`` or a prompt
+    like any other, but labelled so the cause is visible. Returns None when
+    the bodies differ.
+    """
+    try:
+        other = read_document(target, relative, workspace_path=target, repo_path=target)
+    except FrontmatterError:
+        return None
+    return compare_documents(doc, other, algorithm)
+
+
+def compare_documents(doc: SpecDocument, other: SpecDocument, algorithm: str) -> tuple[PlanState, str] | None:
+    """The normalized comparison of :func:`_compare_normalized`, for documents already parsed."""
+    if _body_digest(doc, algorithm) != _body_digest(other, algorithm):
+        return None
+    if normalize_metadata(doc.frontmatter) == normalize_metadata(other.frontmatter):
+        return "skip", "equivalent (formatting only)"
+    return "conflict", "metadata only"
+
+
+def _body_digest(doc: SpecDocument, algorithm: str) -> str:
+    return digest_text(normalize_body(doc.body), algorithm)
+
+
+def _load_transform_cache(config: Config, direction: SyncDirection) -> TransformCache | None:
+    # Transforms rewrite vault syntax for the repo, so they only apply to pulls.
+    if direction != "pull" or not config.transforms:
+        return None
+    return TransformCache.load(config.state_dir / "transform-cache.json")
+
+
+def _attachment_document(relative: Path, direction: SyncDirection, source: Path, target: Path) -> SpecDocument:
+    workspace_path, repo_path = (source, target) if direction == "pull" else (target, source)
+    return SpecDocument(
+        relative_path=relative,
+        workspace_path=workspace_path,
+        repo_path=repo_path,
+        frontmatter=None,
+        body="",
+        metadata_status="valid",
+        raw_text="",
+    )
 
-    return SyncPlan(direction="pull", entries=entries, warnings=warnings)
 
+def _detect_moves(
+    entries: list[PlanEntry], orphans: list[Orphan], config: Config, direction: SyncDirection
+) -> list[Orphan]:
+    """Turn creates whose content already exists at an orphaned target path into moves.
+
+    Orphans are bucketed by size first, so only creates with a same-sized
+    orphan are hashed. Returns the orphans that were not claimed by a move.
+    """
+    by_size: dict[int, list[Orphan]] = {}
+    stamps: dict[Path, tuple[int, ...]] = {}
+    for orphan in orphans:
+        try:
+            stat = orphan[0].lstat()
+        except OSError:
+            continue
+        if S_ISREG(stat.st_mode):
+            by_size.setdefault(stat.st_size, []).append(orphan)
+            stamps[orphan[0]] = _stat_stamp(stat)
+    if not by_size:
+        return orphans
+
+    claimed: set[Path] = set()
+    digests: dict[Path, str] = {}
+    for entry in entries:
+        if entry.state != "create" or filter_reason(entry.document, config) is not None:
+            continue
+        candidates = by_size.get(entry.source_path.stat().st_size)
+        if not candidates:
+            continue
+        source_digest = digest_file(entry.source_path, config.digest)
+        for target, relative in candidates:
+            if target in claimed:
+                continue
+            if target not in digests:
+                digests[target] = digest_file(target, config.digest)
+            if digests[target] == source_digest:
+                claimed.add(target)
+                entry.state = "move"
+                entry.moved_from = target
+                entry.stamps[target] = stamps[target]
+                entry.reason = f"moved from {relative.as_posix()}"
+                break
 
-def build_push_plan(config: Config) -> SyncPlan:
-    documents, warnings = collect_repo_documents(config)
-    entries: list[PlanEntry] = []
+    return [orphan for orphan in orphans if orphan[0] not in claimed]
 
-    for doc in documents:
-        source = doc.repo_path
-        target = doc.workspace_path
-        if not target.exists():
-            state = "create"
-            reason = "missing in workspace"
+
+@dataclass
+class _PlanRecord:
+    """Compact, picklable form of a plan entry returned by shard workers."""
+
+    relative_path: Path
+    workspace_path: Path
+    repo_path: Path
+    source_path: Path
+    target_path: Path
+    state: PlanState
+    reason: str | None
+    frontmatter: dict | None
+    metadata_status: MetadataStatus
+    attachment: bool
+    nbytes: int
+    stamps: dict[Path, tuple[int, ...]]
+
+
+@dataclass
+class _ShardInput:
+    """One worker's slice of both trees, listed once by the parent process."""
+
+    sources: list[Candidate]
+    targets: list[Candidate]
+    repo_index: GitIndex | None
+    notes: NoteIndex | None = None
+
+
+def _plan_parallel(
+    config: Config, direction: SyncDirection, transform_cache: TransformCache | None
+) -> tuple[list[PlanEntry], list[Orphan], list[str]]:
+    """Plan with one worker process per path-hash shard and merge the results.
+
+    The parent walks both trees and loads the git index once, then hands each
+    worker its share of the paths. Workers parse, filter and hash their shard
+    and send back records without document bodies. Only entries that may be
+    written and whose payload is rendered from the document (pushes and
+    transformed pulls) are read again here.
+
+    Wikilinks resolve against every selected note, so with transforms the
+    workers first report which notes they select. Transform cache entries
+    they compute are merged into ``transform_cache`` here, the only writer.
+    """
+    count = config.jobs
+    warnings: list[str] = []
+    progress = current_progress()
+    progress.start("scan")
+    if direction == "pull":
+        source_root, target_root = config.workspace_specs_dir, config.repo_specs_dir
+    else:
+        source_root, target_root = config.repo_specs_dir, config.workspace_specs_dir
+    sources = _partition(iter_candidate_paths(source_root, config), count)
+    targets = _partition(iter_candidate_paths(target_root, config), count)
+    repo_index = _load_repo_index(config, warnings)
+    shards = [_ShardInput(sources[index], targets[index], repo_index) for index in range(count)]
+    progress.finish()
+
+    # Imported here, as multiprocessing is only needed for a parallel plan.
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    flush()  # Forked workers must not inherit pending output.
+    with ProcessPoolExecutor(max_workers=count) as pool:
+        if transform_cache is not None:
+            selected = pool.map(_select_shard, [config] * count, [direction] * count, shards)
+            notes = NoteIndex(relative for shard_selected in selected for relative in shard_selected)
+            shards = [replace(shard, notes=notes) for shard in shards]
+        progress.start("plan", total=sum(len(shard.sources) for shard in shards))
+        futures = {pool.submit(_plan_shard, config, direction, shard): index for index, shard in enumerate(shards)}
+        by_shard = {}
+        for future in as_completed(futures):
+            result = by_shard[futures[future]] = future.result()
+            progress.advance(files=len(result[0]), nbytes=sum(record.nbytes for record in result[0]))
+    progress.finish()
+    results = [by_shard[index] for index in range(count)]
+
+    # Specs in different shards may link the same attachment; keep one entry.
+    records = {record.relative_path: record for shard_records, _, _, _ in results for record in shard_records}
+    orphans = [orphan for _, shard_orphans, _, _ in results for orphan in shard_orphans]
+    warnings += [warning for _, _, shard_warnings, _ in results for warning in shard_warnings]
+    if transform_cache is not None:
+        for _, _, _, added in results:
+            transform_cache.merge(added)
+    return [_hydrate(record, direction, config) for record in records.values()], orphans, warnings
+
+
+def _partition(candidates: Iterator[Candidate], count: int) -> list[list[Candidate]]:
+    shards: list[list[Candidate]] = [[] for _ in range(count)]
+    for path, relative in candidates:
+        shards[shard_index(relative, count)].append((path, relative))
+    return shards
+
+
+def _select_shard(config: Config, direction: SyncDirection, shard: _ShardInput) -> list[Path]:
+    configure_progress(None)
+    collect = collect_workspace_documents if direction == "pull" else collect_repo_documents
+    documents, _ = collect(config, paths=shard.sources)
+    return [doc.relative_path for doc in documents]
+
+
+def _plan_shard(
+    config: Config, direction: SyncDirection, shard: _ShardInput
+) -> tuple[list[_PlanRecord], list[Orphan], list[str], dict[str, CacheEntry]]:
+    configure_progress(None)  # Only the parent process reports progress.
+    # Each worker reads the cache and returns what it added; only the parent saves.
+    transform_cache = _load_transform_cache(config, direction)
+    entries, orphans, warnings = _plan_entries(config, direction, shard, transform_cache)
+    records = [
+        _PlanRecord(
+            relative_path=entry.document.relative_path,
+            workspace_path=entry.document.workspace_path,
+            repo_path=entry.document.repo_path,
+            source_path=entry.source_path,
+            target_path=entry.target_path,
+            state=entry.state,
+            reason=entry.reason,
+            frontmatter=entry.document.frontmatter,
+            metadata_status=entry.document.metadata_status,
+            attachment=entry.attachment,
+            nbytes=entry.nbytes,
+            stamps=entry.stamps,
+        )
+        for entry in entries
+    ]
+    return records, orphans, warnings, transform_cache.added if transform_cache is not None else {}
+
+
+def _hydrate(record: _PlanRecord, direction: SyncDirection, config: Config) -> PlanEntry:
+    rendered = direction == "push" or bool(config.transforms)
+    if rendered and record.state in {"create", "update", "conflict"} and not record.attachment:
+        doc = read_document(
+            record.source_path, record.relative_path, workspace_path=record.workspace_path, repo_path=record.repo_path
+        )
+    else:
+        doc = SpecDocument(
+            relative_path=record.relative_path,
+            workspace_path=record.workspace_path,
+            repo_path=record.repo_path,
+            frontmatter=record.frontmatter,
+            body="",
+            metadata_status=record.metadata_status,
+            raw_text="",
+        )
+    return PlanEntry(
+        document=doc,
+        source_path=record.source_path,
+        target_path=record.target_path,
+        state=record.state,
+        reason=record.reason,
+        attachment=record.attachment,
+        nbytes=record.nbytes,
+        stamps=record.stamps,
+    )
+
+
+def _merge_join(
+    documents: list[SpecDocument], target_root: Path, config: Config, listed: list[Candidate] | None = None
+) -> Iterator[tuple[SpecDocument | None, Path | None, Path]]:
+    """Walk the selected documents and the target tree together in path order.
+
+    Yields ``(document, existing_target, relative_path)`` where either side may
+    be None, so create, compare and delete candidates fall out of one sorted
+    merge instead of an existence check per document. ``listed`` replaces the
+    walk of the target tree with a listing made earlier, in walk order.
+    """
+    docs = iter(sorted(documents, key=lambda d: d.relative_path.parts))
+    targets = iter_candidate_paths(target_root, config) if listed is None else iter(listed)
+    doc = next(docs, None)
+    target, target_rel = next(targets, (None, None))
+
+    while doc is not None or target is not None:
+        if target is None or (doc is not None and doc.relative_path.parts < target_rel.parts):
+            yield doc, None, doc.relative_path
+            doc = next(docs, None)
+            continue
+        if doc is None or target_rel.parts < doc.relative_path.parts:
+            yield None, target, target_rel
         else:
-            if hash_file(source) == hash_file(target):
-                state = "skip"
-                reason = "unchanged"
-            else:
-                state = "conflict"
-                reason = "differs from workspace"
-        entries.append(PlanEntry(document=doc, source_path=source, target_path=target, state=state, reason=reason))
+            yield doc, target, target_rel
+            doc = next(docs, None)
+        target, target_rel = next(targets, (None, None))
+
+
+def _add_delete(
+    entries: list[PlanEntry],
+    warnings: list[str],
+    target: Path,
+    relative: Path,
+    config: Config,
+    *,
+    direction: str,
+) -> None:
+    if target.is_symlink():
+        warnings.append(f"Not pruning symlink: {target}")
+        return
+    stamp = _file_stamp(target)
+    if config.spec_filter.too_large(target):
+        return
 
-    return SyncPlan(direction="push", entries=entries, warnings=warnings)
+    if direction == "pull":
+        source = config.workspace_specs_dir / relative
+        doc = read_document(target, relative, workspace_path=source, repo_path=target)
+        reason = "missing in workspace"
+    else:
+        source = config.repo_specs_dir / relative
+        doc = read_document(target, relative, workspace_path=target, repo_path=source)
+        reason = "missing in repo"
+
+    # Only prune files the filters would select, so notes that belong to
+    # other projects or were never exposed are left alone.
+    if filter_reason(doc, config) is not None:
+        return
+    entries.append(
+        PlanEntry(
+            document=doc,
+            source_path=source,
+            target_path=target,
+            state="delete",
+            reason=reason,
+            stamps={target: stamp},
+        )
+    )
+
+
+def _file_stamp(path: Path) -> tuple[int, ...]:
+    """Inode, size and mtime of ``path``, or ``()`` when it does not exist."""
+    try:
+        return _stat_stamp(os.lstat(path))
+    except FileNotFoundError:
+        return ()
+
+
+def _stat_stamp(stat: os.stat_result) -> tuple[int, ...]:
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _load_repo_index(config: Config, warnings: list[str]) -> GitIndex | None:
+    if not config.git_index:
+        return None
+    index = GitIndex.load(config.repo_root, config.repo_specs_dir)
+    if index is None:
+        warnings.append("Git index unavailable; falling back to content hashing")
+    return index
+
+
+def _same_content(source: Path, target: Path, repo_index: GitIndex | None, algorithm: str) -> bool:
+    if repo_index is None:
+        return digest_file(source, algorithm) == digest_file(target, algorithm)
+    # Both sides are compared as git blob IDs; tracked repo files with an
+    # unchanged stat reuse the ID recorded in the index without being read.
+    return repo_index.blob_id(source) == repo_index.blob_id(target)
 
 
 def summarize_plan(plan: SyncPlan) -> PlanSummary:
     create = sum(1 for e in plan.entries if e.state == "create")
-    update = sum(1 for e in plan.entries if e.state == "conflict")
+    conflicts = sum(1 for e in plan.entries if e.state == "conflict")
+    update = conflicts + sum(1 for e in plan.entries if e.state == "update")
     skip = sum(1 for e in plan.entries if e.state == "skip")
-    conflicts = update
-    return PlanSummary(create=create, update=update, conflicts=conflicts, skip=skip)
+    delete = sum(1 for e in plan.entries if e.state == "delete")
+    move = sum(1 for e in plan.entries if e.state == "move")
+    return PlanSummary(create=create, update=update, conflicts=conflicts, skip=skip, delete=delete, move=move)
 
 
 def execute_plan(plan: SyncPlan, config: Config, *, prompt_engine: PromptEngine | None = None) -> ExecutionStats:
+    if config.on_conflict == "fail":
+        conflicts = [entry.document.relative_path.as_posix() for entry in plan.entries if entry.state == "conflict"]
+        if conflicts:
+            examples = ", ".join(conflicts[:3])
+            raise ConflictError(f"{len(conflicts)} conflicting files (e.g. {examples}); nothing was written")
     stats = ExecutionStats()
+    flush()
+    with _plan_locks(plan, config) as locks:
+        if locks.waited >= 0.1:
+            info(f"Waited {locks.waited:.1f}s for locks held by other specsync runs", quiet=config.quiet)
+        _check_unchanged(plan)
+        _execute_locked(plan, config, stats, prompt_engine)
+    return stats
+
+
+def _check_unchanged(plan: SyncPlan) -> None:
+    """Refuse a plan whose targets changed after they were compared, e.g. by a concurrent run.
+
+    Planning runs without locks, so two runs may plan from the same state.
+    Once the locks are held, every target is checked against the stat data
+    taken at planning time, and nothing is written if any of them moved on.
+    """
+    stale = [
+        entry.document.relative_path.as_posix()
+        for entry in plan.entries
+        if entry.state != "skip" and any(_file_stamp(path) != stamp for path, stamp in entry.stamps.items())
+    ]
+    if stale:
+        examples = ", ".join(stale[:3])
+        raise ConflictError(
+            f"{len(stale)} target files changed since the plan was made (e.g. {examples}); "
+            "nothing was written, run again to re-plan"
+        )
+
+
+def _plan_locks(plan: SyncPlan, config: Config) -> DirectoryLocks:
+    """Locks on the target directories the plan writes to, including move sources."""
+    root = _target_root(plan.direction, config)
+    directories = set()
     for entry in plan.entries:
         if entry.state == "skip":
-            stats.add_skipped()
-            continue
-
-        if entry.state == "create":
-            _copy(entry.source_path, entry.target_path, plan.direction, entry.document, config)
-            stats.add_created()
             continue
-
-        if entry.state == "conflict":
-            action = "overwrite"
-            if not config.force:
-                if prompt_engine is None:
-                    raise SpecsyncError("Prompt engine required for interactive runs")
-                while True:
-                    choice = prompt_engine.confirm(entry.source_path, entry.target_path)
-                    if choice == "diff":
+        for path in (entry.target_path, entry.moved_from):
+            if path is not None and is_within(root, path):
+                directories.add(path.parent.relative_to(root).as_posix())
+    # Repo locks stay in the git dir; workspace locks must live in the shared tree.
+    lock_dir = config.state_dir / "locks" if plan.direction == "pull" else root / ".specsync-locks"
+    return DirectoryLocks(lock_dir, directories, timeout=config.lock_timeout)
+
+
+def _execute_locked(
+    plan: SyncPlan, config: Config, stats: ExecutionStats, prompt_engine: PromptEngine | None
+) -> None:
+    journal = Journal.start(
+        journal_path(config.state_dir, plan.direction),
+        direction=plan.direction,
+        resume=config.resume,
+    )
+    progress = current_progress()
+    progress.start("execute", total=len(plan.entries))
+    schedule = schedule_entries(plan.entries)
+    completed = False
+    try:
+        if config.atomic:
+            _execute_staged(replace(plan, entries=schedule.entries), config, stats, prompt_engine, journal)
+        else:
+            create_directories(schedule.directories)
+            writer = _DirectWriter(plan.direction, config, plan.notes, make_parents=False)
+            for entry in schedule.entries:
+                if _apply_entry(entry, writer, config, stats, prompt_engine):
+                    journal.record(entry)
+                progress.advance(nbytes=entry.nbytes)
+        completed = True
+    finally:
+        progress.finish()
+        journal.close(completed=completed)
+
+
+def _execute_staged(
+    plan: SyncPlan,
+    config: Config,
+    stats: ExecutionStats,
+    prompt_engine: PromptEngine | None,
+    journal: Journal,
+) -> None:
+    """Stage every change first and commit them together, so a failure leaves the target untouched."""
+    progress = current_progress()
+    with Transaction(_target_root(plan.direction, config)) as transaction:
+        writer = _StagedWriter(transaction, plan.direction, config, plan.notes)
+        applied = []
+        for entry in plan.entries:
+            if _apply_entry(entry, writer, config, stats, prompt_engine):
+                applied.append(entry)
+            progress.advance(nbytes=entry.nbytes)
+        transaction.commit()
+    for entry in applied:
+        journal.record(entry)
+
+
+def _apply_entry(
+    entry: PlanEntry,
+    writer: _DirectWriter | _StagedWriter,
+    config: Config,
+    stats: ExecutionStats,
+    prompt_engine: PromptEngine | None,
+) -> bool:
+    """Carry out one plan entry; returns True when the target was changed."""
+    if entry.state == "skip":
+        stats.add_skipped()
+        return False
+
+    if entry.state == "delete":
+        writer.delete(entry)
+        stats.add_deleted(entry.target_path)
+        return True
+
+    if entry.state == "move":
+        writer.move(entry)
+        stats.add_moved(entry.moved_from, entry.target_path)
+        return True
+
+    if entry.state == "create":
+        writer.write(entry)
+        stats.add_created(entry.target_path)
+        return True
+
+    if entry.state == "update":
+        writer.write(entry)
+        stats.add_updated(entry.target_path)
+        return True
+
+    if entry.state == "conflict":
+        action = "overwrite"
+        if config.on_conflict is not None:
+            action = _policy_action(entry, config.on_conflict)
+            stats.add_conflict({"overwrite": "source", "skip": "target"}.get(action, action))
+            if action == "keep-both":
+                writer.write(replace(entry, target_path=entry.conflict_copy))
+                stats.add_created(entry.conflict_copy)
+                return True
+        elif not config.force:
+            if prompt_engine is None:
+                raise SpecsyncError("Prompt engine required for interactive runs")
+            while True:
+                choice = prompt_engine.confirm(entry.source_path, entry.target_path)
+                if choice == "diff":
+                    if entry.attachment:
+                        info(f"Binary attachment, no diff: {entry.target_path}", quiet=config.quiet)
+                    else:
                         _show_diff(entry.source_path, entry.target_path, config)
-                        continue
-                    action = "overwrite" if choice == "overwrite" else "skip"
-                    break
-            if action == "skip":
-                stats.add_skipped()
-                continue
-            _copy(entry.source_path, entry.target_path, plan.direction, entry.document, config)
-            stats.add_updated()
-    return stats
-
-
-def _copy(source: Path, target: Path, direction: str, doc, config: Config) -> None:
+                    continue
+                action = "overwrite" if choice == "overwrite" else "skip"
+                break
+        if action == "skip":
+            stats.add_skipped()
+            return False
+        writer.write(entry)
+        stats.add_updated(entry.target_path)
+        return True
+    return False
+
+
+def _policy_action(entry: PlanEntry, policy: ConflictPolicy) -> str:
+    """Decide a conflict without prompting: "overwrite", "skip" or "keep-both"."""
+    if policy == "source":
+        return "overwrite"
+    if policy == "target":
+        return "skip"
+    if policy == "keep-both":
+        return "keep-both"
+    if policy == "newer":
+        source_mtime = entry.source_path.stat().st_mtime_ns
+        return "overwrite" if source_mtime > entry.target_path.stat().st_mtime_ns else "skip"
+    raise ConflictError(f"Conflict in {entry.target_path}")
+
+
+def _conflict_copy_path(target: Path, direction: str) -> Path:
+    """First free name for the incoming version next to the target.
+
+    notes.md becomes notes.conflict-workspace.md, then
+    notes.conflict-workspace-2.md and so on, so copies left by earlier
+    runs are never overwritten.
+    """
+    label = "workspace" if direction == "pull" else "repo"
+    copy = target.with_name(f"{target.stem}.conflict-{label}{target.suffix}")
+    counter = 1
+    while os.path.lexists(copy):
+        counter += 1
+        copy = target.with_name(f"{target.stem}.conflict-{label}-{counter}{target.suffix}")
+    return copy
+
+
+class _DirectWriter:
+    """Applies each entry to the target tree as soon as it is decided.
+
+    With ``make_parents=False`` the target directories of writes must
+    already exist, as they do after :func:`create_directories`. Moves always
+    create their parents, since an earlier move may have pruned them.
+    """
+
+    def __init__(
+        self, direction: SyncDirection, config: Config, notes: NoteIndex | None = None, *, make_parents: bool = True
+    ) -> None:
+        self.direction = direction
+        self.config = config
+        self.notes = notes
+        self.make_parents = make_parents
+
+    def write(self, entry: PlanEntry) -> None:
+        if entry.attachment:
+            copy_file(entry.source_path, entry.target_path, make_parents=self.make_parents)
+            return
+        _copy(
+            entry.source_path, entry.target_path, self.direction, entry.document, self.config, self.notes, self.make_parents
+        )
+
+    def move(self, entry: PlanEntry) -> None:
+        _move(entry, self.direction, self.config)
+
+    def delete(self, entry: PlanEntry) -> None:
+        remove_file(entry.target_path, stop_at=_target_root(self.direction, self.config))
+
+
+class _StagedWriter:
+    """Stages each entry in a :class:`Transaction` for a later all-or-nothing commit."""
+
+    def __init__(
+        self, transaction: Transaction, direction: SyncDirection, config: Config, notes: NoteIndex | None = None
+    ) -> None:
+        self.transaction = transaction
+        self.direction = direction
+        self.config = config
+        self.notes = notes
+
+    def write(self, entry: PlanEntry) -> None:
+        if entry.attachment or self.direction == "pull" and not self.config.transforms:
+            self.transaction.stage_copy(entry.source_path, entry.target_path)
+        elif self.direction == "pull":
+            doc = entry.document
+            text = transform_text(
+                doc.raw_text, self.config.transforms, self.config.digest, relative=doc.relative_path, notes=self.notes
+            )
+            self.transaction.stage_text(entry.target_path, text)
+        else:
+            self.transaction.stage_text(entry.target_path, _prepare_push_payload(entry.document, self.config))
+
+    def move(self, entry: PlanEntry) -> None:
+        if self.direction == "push":
+            payload = _prepare_push_payload(entry.document, self.config)
+            if payload != entry.document.raw_text:
+                self.transaction.stage_text(entry.target_path, payload)
+                self.transaction.stage_delete(entry.moved_from)
+                return
+        self.transaction.stage_move(entry.moved_from, entry.target_path)
+
+    def delete(self, entry: PlanEntry) -> None:
+        self.transaction.stage_delete(entry.target_path)
+
+
+def _target_root(direction: str, config: Config) -> Path:
+    return config.repo_specs_dir if direction == "pull" else config.workspace_specs_dir
+
+
+def _copy(
+    source: Path,
+    target: Path,
+    direction: str,
+    doc,
+    config: Config,
+    notes: NoteIndex | None = None,
+    make_parents: bool = True,
+) -> None:
     if direction == "pull":
-        copy_file(source, target)
+        if config.transforms:
+            text = transform_text(doc.raw_text, config.transforms, config.digest, relative=doc.relative_path, notes=notes)
+            write_file_atomic(target, text, make_parents=make_parents)
+        else:
+            copy_file(source, target, make_parents=make_parents)
         return
 
     if direction == "push":
         payload = _prepare_push_payload(doc, config)
-        write_file_atomic(target, payload)
+        write_file_atomic(target, payload, make_parents=make_parents)
         return
 
     raise ConfigError(f"Unknown direction: {direction}")
 
 
+def _move(entry: PlanEntry, direction: str, config: Config) -> None:
+    move_file(entry.moved_from, entry.target_path, stop_at=_target_root(direction, config))
+    if direction == "push":
+        # The moved file holds the raw repo text; apply metadata injection if it changes anything.
+        payload = _prepare_push_payload(entry.document, config)
+        if payload != entry.document.raw_text:
+            write_file_atomic(entry.target_path, payload, make_parents=False)
+
+
 def _prepare_push_payload(doc, config: Config) -> str:
     if doc.frontmatter is None or doc.metadata_status in {"missing", "invalid"}:
         metadata = dict(doc.frontmatter or {})
@@ -180,13 +961,22 @@ def _show_diff(source: Path, target: Path, config: Config) -> None:
 def log_plan(plan: SyncPlan, config: Config) -> None:
     summary = summarize_plan(plan)
     info(
-        f"Plan: {summary.create} create, {summary.update} update/conflicts, {summary.skip} skip", quiet=config.quiet
+        f"Plan: {summary.create} create, {summary.update} update/conflicts, {summary.skip} skip, "
+        f"{summary.delete} delete, {summary.move} move",
+        quiet=config.quiet,
     )
-    for warning in plan.warnings:
-        warn(warning)
+    # warn_all flushes, so the summary is out before execution starts.
+    warn_all(plan.warnings)
 
 
 def display_plan(plan: SyncPlan) -> None:
+    if log_format() == "json":
+        for entry in plan.entries:
+            rel = entry.document.relative_path.as_posix()
+            info(f"{entry.state} {rel}", action=entry.state, path=rel, reason=entry.reason)
+        return
+
+    flush()
     print("Action | Path | Reason")
     print("------------------------")
     for entry in plan.entries:
@@ -0,0 +1,121 @@
+"""Staged, all-or-nothing application of file changes."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Literal
+
+from .fs import ensure_dir, prune_empty_parents
+
+STAGE_PREFIX = ".specsync-stage-"
+
+
+@dataclass
+class _Operation:
+    kind: Literal["write", "move", "delete"]
+    target: Path
+    source: Path | None = None
+
+
+class Transaction:
+    """Stage new content next to the target tree, then commit it with renames.
+
+    Staged files live in a hidden directory inside ``root`` so every commit
+    step is a same-filesystem rename. Replaced and deleted files are moved
+    aside rather than removed, which lets a failed commit restore the tree
+    exactly. Use as a context manager; leaving the block without
+    :meth:`commit` discards everything that was staged.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        ensure_dir(root)
+        self.stage_dir = Path(tempfile.mkdtemp(prefix=STAGE_PREFIX, dir=root))
+        self._operations: list[_Operation] = []
+        self._counter = 0
+        self._directories: set[Path] = set()
+
+    def __enter__(self) -> Transaction:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        shutil.rmtree(self.stage_dir, ignore_errors=True)
+
+    def stage_copy(self, source: Path, target: Path) -> None:
+        staged = self._next_path()
+        shutil.copy2(source, staged)
+        self._operations.append(_Operation("write", target, staged))
+
+    def stage_text(self, target: Path, content: str) -> None:
+        staged = self._next_path()
+        staged.write_text(content, encoding="utf-8")
+        self._operations.append(_Operation("write", target, staged))
+
+    def stage_move(self, source: Path, target: Path) -> None:
+        self._operations.append(_Operation("move", target, source))
+
+    def stage_delete(self, target: Path) -> None:
+        self._operations.append(_Operation("delete", target))
+
+    def commit(self) -> None:
+        """Apply all staged operations, undoing the applied ones if any step fails."""
+        undo: list[Callable[[], None]] = []
+        try:
+            for operation in self._operations:
+                self._apply(operation, undo)
+        except BaseException:
+            for action in reversed(undo):
+                try:
+                    action()
+                except OSError:  # pragma: no cover - best effort
+                    pass
+            raise
+
+        for operation in self._operations:
+            if operation.kind == "move":
+                prune_empty_parents(operation.source, self.root)
+            elif operation.kind == "delete":
+                prune_empty_parents(operation.target, self.root)
+
+    def _apply(self, operation: _Operation, undo: list[Callable[[], None]]) -> None:
+        target = operation.target
+        if operation.kind == "move":
+            self._ensure_parent(target)
+            os.replace(operation.source, target)
+            undo.append(lambda: _move_back(target, operation.source, self.root))
+            return
+
+        if target.exists():
+            backup = self._next_path()
+            os.replace(target, backup)
+            undo.append(lambda: os.replace(backup, target))
+        elif operation.kind == "write":
+            undo.append(lambda: _remove_created(target, self.root))
+
+        if operation.kind == "write":
+            self._ensure_parent(target)
+            os.replace(operation.source, target)
+
+    def _ensure_parent(self, target: Path) -> None:
+        # Operations come grouped by directory; create each one once.
+        if target.parent not in self._directories:
+            ensure_dir(target.parent)
+            self._directories.add(target.parent)
+
+    def _next_path(self) -> Path:
+        self._counter += 1
+        return self.stage_dir / str(self._counter)
+
+
+def _move_back(target: Path, source: Path, root: Path) -> None:
+    os.replace(target, source)
+    prune_empty_parents(target, root)
+
+
+def _remove_created(target: Path, root: Path) -> None:
+    target.unlink(missing_ok=True)
+    prune_empty_parents(target, root)
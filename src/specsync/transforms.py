@@ -0,0 +1,279 @@
+"""Rewrite vault-only markdown syntax for GitHub when pulling."""
+
+from __future__ import annotations
+
+import json
+import posixpath
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path, PurePath, PurePosixPath
+from typing import Iterable
+from urllib.parse import quote
+
+from .cache import active_caches
+from .exceptions import ConfigError
+from .fs import digest_text, write_file_atomic
+
+TRANSFORMS = ("wikilinks", "embeds", "callouts")
+# Bump when the output of any transform changes, so cached results are dropped.
+_VERSION = 2
+_MAX_CACHE_ENTRIES = 50_000
+
+# Obsidian callout types mapped onto the five GitHub alert types.
+_CALLOUT_TYPES = {
+    "note": "NOTE",
+    "info": "NOTE",
+    "todo": "NOTE",
+    "abstract": "NOTE",
+    "summary": "NOTE",
+    "tldr": "NOTE",
+    "example": "NOTE",
+    "quote": "NOTE",
+    "cite": "NOTE",
+    "tip": "TIP",
+    "hint": "TIP",
+    "success": "TIP",
+    "check": "TIP",
+    "done": "TIP",
+    "important": "IMPORTANT",
+    "warning": "WARNING",
+    "caution": "CAUTION",
+    "attention": "WARNING",
+    "question": "WARNING",
+    "help": "WARNING",
+    "faq": "WARNING",
+    "danger": "CAUTION",
+    "error": "CAUTION",
+    "bug": "CAUTION",
+    "failure": "CAUTION",
+    "fail": "CAUTION",
+    "missing": "CAUTION",
+}
+
+# Frontmatter and code are matched only to be copied unchanged.
+_VERBATIM = [
+    r"(?P<frontmatter>\A---\n[\s\S]*?^---[ \t]*$)",
+    r"(?P<fence>^(?P<fence_mark>`{3,}|~{3,})[^\n]*\n[\s\S]*?(?:^(?P=fence_mark)[ \t]*$|\Z))",
+    r"(?P<code>`[^`\n]+`)",
+]
+_PATTERNS = {
+    "embeds": r"(?P<embed>!\[\[(?P<embed_target>[^\]|\n]+)(?:\|(?P<embed_alias>[^\]\n]*))?\]\])",
+    "wikilinks": r"(?P<wikilink>\[\[(?P<link_target>[^\]|\n]+)(?:\|(?P<link_alias>[^\]\n]*))?\]\])",
+    "callouts": r"(?P<callout>^(?P<callout_prefix>>[ \t]?)\[!(?P<callout_type>[A-Za-z-]+)\][+-]?[ \t]*(?P<callout_title>[^\n]*))",
+}
+
+
+# Wikilink names and the note each resolved to (None: no single match).
+Resolutions = dict[str, str | None]
+
+
+class NoteIndex:
+    """The notes of a planned spec set by name, for resolving ``[[wikilinks]]``.
+
+    Obsidian resolves a link by note name anywhere in the vault, or by a
+    trailing path such as ``[[api/Errors]]``, ignoring case. A name that
+    matches no note or several notes is left unresolved.
+    """
+
+    def __init__(self, paths: Iterable[PurePath] = ()) -> None:
+        self._by_name: dict[str, list[str]] = {}
+        for path in paths:
+            posix = path.as_posix()
+            if posix.lower().endswith(".md"):
+                self._by_name.setdefault(posix[:-3].rsplit("/", 1)[-1].lower(), []).append(posix)
+
+    def resolve(self, name: str) -> str | None:
+        """Path of the one note ``name`` refers to, relative to the specs root, or None."""
+        name = name.strip("/").lower()
+        if name.endswith(".md"):
+            name = name[:-3]
+        matches = [
+            path
+            for path in self._by_name.get(name.rsplit("/", 1)[-1], ())
+            if "/" not in name or f"/{path[:-3].lower()}".endswith(f"/{name}")
+        ]
+        return matches[0] if len(matches) == 1 else None
+
+    def still_resolves(self, resolutions: Resolutions) -> bool:
+        return all(self.resolve(name) == path for name, path in resolutions.items())
+
+
+class Transformer:
+    """Applies the configured transforms in one regex pass over the text.
+
+    A single alternation covers every transform, plus frontmatter and code
+    spans that must be left alone, so the text is scanned once however many
+    transforms are enabled. Wikilinks become relative links to the note
+    they resolve to in ``notes``; unresolved ones are left as written.
+    """
+
+    def __init__(self, names: tuple[str, ...]) -> None:
+        unknown = [name for name in names if name not in TRANSFORMS]
+        if unknown:
+            raise ConfigError(f"Unknown transform(s): {', '.join(unknown)} (available: {', '.join(TRANSFORMS)})")
+        self.names = names
+        self.key = f"v{_VERSION}:{','.join(sorted(names))}"
+        # Embeds are always matched so a disabled embed is not read as a wikilink.
+        enabled = [_PATTERNS[name] for name in ("embeds", "wikilinks", "callouts") if name in names or name == "embeds"]
+        self._pattern = re.compile("|".join(_VERBATIM + enabled), re.MULTILINE)
+
+    def apply(self, text: str, relative: PurePath = PurePosixPath("note.md"), notes: NoteIndex | None = None) -> str:
+        return self.run(text, relative, notes)[0]
+
+    def run(self, text: str, relative: PurePath, notes: NoteIndex | None) -> tuple[str, Resolutions]:
+        """Transform the note at ``relative``; also returns how its wikilink names resolved."""
+        links = _Links(PurePosixPath(relative.as_posix()).parent.as_posix(), notes or NoteIndex())
+
+        def replace(match: re.Match[str]) -> str:
+            kind = match.lastgroup
+            if kind == "embed" and "embeds" in self.names:
+                output = links.embed(match["embed_target"].strip(), match["embed_alias"])
+            elif kind == "wikilink":
+                output = links.wikilink(match["link_target"].strip(), match["link_alias"])
+            elif kind == "callout":
+                output = _callout(match["callout_prefix"], match["callout_type"], match["callout_title"].strip())
+            else:
+                output = None
+            return match.group(0) if output is None else output
+
+        return self._pattern.sub(replace, text), links.resolutions
+
+
+@lru_cache(maxsize=16)
+def get_transformer(names: tuple[str, ...]) -> Transformer:
+    return Transformer(names)
+
+
+def transform_text(
+    text: str, names: tuple[str, ...], algorithm: str, *, relative: PurePath, notes: NoteIndex | None
+) -> str:
+    """Transformed ``text`` of the note at ``relative``, reused from the in-memory cache when possible."""
+    transformer = get_transformer(names)
+    caches = active_caches()
+    if caches is None:
+        return transformer.apply(text, relative, notes)
+    key = (transformer.key, relative.as_posix(), digest_text(text, algorithm))
+    cached = caches.transform.get(key)
+    if cached is not None and (notes or NoteIndex()).still_resolves(cached[1]):
+        return cached[0]
+    output, resolutions = transformer.run(text, relative, notes)
+    caches.transform.put(key, (output, resolutions))
+    return output
+
+
+# A cached output digest and the wikilink resolutions it was made with.
+CacheEntry = tuple[str, Resolutions]
+
+
+class TransformCache:
+    """Output digests keyed by transform config, note path and input digest, kept between runs.
+
+    Planning only needs the digest of the transformed text to compare with the
+    target, so an unchanged input is never transformed again. Each entry also
+    records how its wikilinks resolved and is only reused while they still
+    resolve the same way. Entries are evicted oldest first beyond
+    ``max_entries``; the ones computed since loading are kept in ``added``.
+    """
+
+    def __init__(
+        self, path: Path, entries: OrderedDict[str, CacheEntry], *, max_entries: int = _MAX_CACHE_ENTRIES
+    ) -> None:
+        self.path = path
+        self.entries = entries
+        self.max_entries = max_entries
+        self.added: dict[str, CacheEntry] = {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: Path) -> TransformCache:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+        entries = OrderedDict(
+            (str(key), (value[0], value[1]))
+            for key, value in data.items()
+            if isinstance(value, list) and len(value) == 2 and isinstance(value[1], dict)
+        )
+        return cls(path, entries)
+
+    def output_digest(
+        self, text: str, names: tuple[str, ...], algorithm: str, *, relative: PurePath, notes: NoteIndex | None
+    ) -> str:
+        key = f"{get_transformer(names).key}:{relative.as_posix()}:{digest_text(text, algorithm)}"
+        entry = self.entries.get(key)
+        if entry is not None and (notes or NoteIndex()).still_resolves(entry[1]):
+            self.entries.move_to_end(key)
+            return entry[0]
+        output, resolutions = get_transformer(names).run(text, relative, notes)
+        self.added[key] = (digest_text(output, algorithm), resolutions)
+        self.merge({key: self.added[key]})
+        return self.added[key][0]
+
+    def merge(self, entries: dict[str, CacheEntry]) -> None:
+        """Add entries computed elsewhere, e.g. by the workers of a parallel plan."""
+        for key, entry in entries.items():
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            self.dirty = True
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def save(self) -> None:
+        if self.dirty:
+            write_file_atomic(self.path, json.dumps(self.entries))
+            self.dirty = False
+
+
+class _Links:
+    """Rewrites the wikilinks and embeds of one note, recording how names resolved."""
+
+    def __init__(self, base: str, notes: NoteIndex) -> None:
+        self.base = base
+        self.notes = notes
+        self.resolutions: Resolutions = {}
+
+    def wikilink(self, target: str, alias: str | None) -> str | None:
+        page, _, heading = target.partition("#")
+        page = page.strip()
+        url = ""
+        if page:
+            if page not in self.resolutions:
+                self.resolutions[page] = self.notes.resolve(page)
+            note = self.resolutions[page]
+            if note is not None:
+                url = quote(posixpath.relpath(note, self.base))
+            elif _file_suffix(page) and not page.lower().endswith(".md"):
+                url = quote(page)
+            else:
+                return None
+        if heading:
+            url += "#" + _slug(heading)
+        return f"[{alias or (target if page else heading)}]({url})"
+
+    def embed(self, target: str, alias: str | None) -> str | None:
+        name = target.partition("#")[0].strip()
+        if not _file_suffix(name) or name.lower().endswith(".md"):
+            # Notes cannot be inlined on GitHub; link to them instead.
+            return self.wikilink(target, alias)
+        # Obsidian uses the alias of media embeds for sizes such as "300" or "300x200".
+        alt = alias if alias and not re.fullmatch(r"\d+(x\d+)?", alias) else Path(name).name
+        return f"![{alt}]({quote(name)})"
+
+
+def _callout(prefix: str, kind: str, title: str) -> str:
+    alert = f"{prefix}[!{_CALLOUT_TYPES.get(kind.lower(), 'NOTE')}]"
+    return f"{alert}\n{prefix}**{title}**" if title else alert
+
+
+def _file_suffix(name: str) -> bool:
+    # "Release v1.2" names a note, "diagram.png" a file.
+    return re.search(r"\.[A-Za-z][A-Za-z0-9]{0,4}$", name) is not None
+
+
+def _slug(heading: str) -> str:
+    # GitHub heading anchors: lowercase, punctuation dropped, spaces to hyphens.
+    return re.sub(r"[^\w\- ]", "", heading.strip().lower()).replace(" ", "-")
@@ -0,0 +1,91 @@
+"""Tests for the in-process Syncer API."""
+
+import os
+
+import pytest
+
+from specsync import Syncer
+from specsync.cache import LRUCache
+from specsync.exceptions import ConfigError, SpecsyncError
+
+from .test_sync import EXPOSED, write
+
+OLD = 1_600_000_000
+
+
+def make_syncer(tmp_path, **settings):
+    (tmp_path / "repo" / ".git").mkdir(parents=True)
+    (tmp_path / "vault" / "specs").mkdir(parents=True)
+    return Syncer.from_settings(tmp_path / "repo", tmp_path / "vault", project_name="demo", **settings)
+
+
+def age(*paths):
+    # Cached entries are only trusted once their mtime is outside the racy window.
+    for path in paths:
+        os.utime(path, (OLD, OLD))
+
+
+def test_plan_apply_and_status(tmp_path):
+    syncer = make_syncer(tmp_path)
+    write(syncer.config.workspace_specs_dir / "a.md")
+    write(syncer.config.workspace_specs_dir / "b.md")
+
+    assert syncer.status().create == 2
+    stats = syncer.apply(syncer.plan_pull())
+
+    assert stats.created == 2
+    assert (syncer.config.repo_specs_dir / "a.md").read_text(encoding="utf-8") == EXPOSED
+    assert syncer.status().skip == 2
+    assert syncer.status("push").skip == 2
+
+
+def test_caches_are_reused_and_revalidated(tmp_path):
+    syncer = make_syncer(tmp_path)
+    specs = syncer.config.workspace_specs_dir
+    doc = write(specs / "a.md")
+    write(syncer.config.repo_specs_dir / "a.md", EXPOSED + "old\n")
+    age(doc, specs, syncer.config.repo_specs_dir / "a.md", syncer.config.repo_specs_dir)
+
+    assert syncer.status().conflicts == 1
+    caches = syncer.caches
+    misses = (caches.scan.misses, caches.digest.misses, caches.document.misses)
+    assert syncer.status().conflicts == 1
+    assert (caches.scan.misses, caches.digest.misses, caches.document.misses) == misses
+    assert caches.document.hits >= 1 and caches.digest.hits >= 2
+
+    doc.write_text(EXPOSED + "old\n", encoding="utf-8")
+    os.utime(doc, (OLD + 10, OLD + 10))
+    assert syncer.status().skip == 1
+
+
+def test_apply_refuses_conflicts_without_force(tmp_path):
+    syncer = make_syncer(tmp_path)
+    write(syncer.config.workspace_specs_dir / "a.md")
+    write(syncer.config.repo_specs_dir / "a.md", EXPOSED + "changed\n")
+
+    with pytest.raises(SpecsyncError):
+        syncer.apply(syncer.plan_pull())
+
+    forced = make_syncer(tmp_path / "forced", force=True)
+    write(forced.config.workspace_specs_dir / "a.md")
+    write(forced.config.repo_specs_dir / "a.md", EXPOSED + "changed\n")
+    assert forced.apply(forced.plan_pull()).updated == 1
+
+
+def test_unknown_setting_is_rejected(tmp_path):
+    with pytest.raises(ConfigError, match="colour"):
+        make_syncer(tmp_path, colour="blue")
+
+
+def test_lru_cache_evicts_by_weight():
+    cache = LRUCache(10, weigh=len)
+    cache.put("a", "xxxx")
+    cache.put("b", "xxxx")
+    assert cache.get("a") == "xxxx"
+    cache.put("c", "xxxx")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "xxxx"
+    assert cache.weight == 8
+    cache.put("huge", "x" * 11)
+    assert cache.get("huge") is None
@@ -0,0 +1,106 @@
+"""Tests for archive export and import."""
+
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from specsync.archive import export_archive, extract_archive
+from specsync.cli import build_parser, main
+from specsync.exceptions import SecurityError
+
+from .test_sync import EXPOSED, make_trees, write
+
+
+def make_specs(config):
+    write(config.workspace_specs_dir / "a.md")
+    write(config.workspace_specs_dir / "api" / "b.md", EXPOSED + "[[a]]\n")
+    write(config.workspace_specs_dir / "private.md", "---\nexpose: false\n---\n")
+
+
+@pytest.mark.parametrize("archive_format", ["tar", "zip"])
+def test_export_round_trips_selected_specs(tmp_path, archive_format):
+    config = make_trees(tmp_path)
+    make_specs(config)
+    stream = io.BytesIO()
+
+    count, warnings = export_archive(config, stream, archive_format)
+
+    assert count == 2
+    assert any("private.md" in warning for warning in warnings)
+    stream.seek(0)
+    assert extract_archive(stream, tmp_path / "out") == 2
+    assert (tmp_path / "out" / "api" / "b.md").read_text(encoding="utf-8") == EXPOSED + "[[a]]\n"
+
+
+@pytest.mark.parametrize("archive_format", ["tar", "zip"])
+def test_extract_keeps_recorded_mtimes(tmp_path, archive_format):
+    config = make_trees(tmp_path)
+    source = write(config.workspace_specs_dir / "a.md")
+    os.utime(source, (1_600_000_000, 1_600_000_000))
+    stream = io.BytesIO()
+    export_archive(config, stream, archive_format)
+    stream.seek(0)
+
+    extract_archive(stream, tmp_path / "out")
+
+    # Zip timestamps have two-second resolution.
+    assert abs((tmp_path / "out" / "a.md").stat().st_mtime - 1_600_000_000) <= 2
+
+
+def test_import_paths_follow_the_archive():
+    args = build_parser().parse_args(["import", "specs.tar", "api/", "rfcs/"])
+
+    assert (args.archive, args.paths) == ("specs.tar", ["api/", "rfcs/"])
+
+
+def test_export_applies_transforms_and_streams_to_pipes(tmp_path):
+    config = make_trees(tmp_path)
+    config.transforms = ("wikilinks",)
+    make_specs(config)
+
+    class Pipe(io.BytesIO):
+        def seekable(self):
+            return False
+
+        def tell(self):
+            raise OSError("not seekable")
+
+    stream = Pipe()
+    export_archive(config, stream, "tar")
+
+    with tarfile.open(fileobj=io.BytesIO(stream.getvalue())) as archive:
+        assert archive.getnames() == ["a.md", "api/b.md"]
+        assert archive.extractfile("api/b.md").read().decode().endswith("[a](../a.md)\n")
+
+
+def test_extract_rejects_members_outside_destination(tmp_path):
+    stream = io.BytesIO()
+    with zipfile.ZipFile(stream, "w") as archive:
+        archive.writestr("../escape.md", "x")
+    stream.seek(0)
+
+    with pytest.raises(SecurityError, match="escape.md"):
+        extract_archive(stream, tmp_path / "out")
+    assert not (tmp_path / "escape.md").exists()
+
+
+def test_import_pulls_from_archive(tmp_path, monkeypatch):
+    config = make_trees(tmp_path)
+    make_specs(config)
+    write(config.repo_specs_dir / "a.md", EXPOSED + "repo edit\n")
+    archive_path = tmp_path / "specs.zip"
+    monkeypatch.chdir(config.repo_root)
+    monkeypatch.setenv("SPECSYNC_WORKSPACE_ROOT", str(config.workspace_root))
+    monkeypatch.setenv("SPECSYNC_PROJECT_NAME", "demo")
+
+    assert main(["export", "--format", "zip", "--output", str(archive_path)]) == 0
+    monkeypatch.delenv("SPECSYNC_WORKSPACE_ROOT")
+
+    assert main(["import", str(archive_path), "--on-conflict", "target"]) == 0
+
+    assert (config.repo_specs_dir / "api" / "b.md").read_text(encoding="utf-8") == EXPOSED + "[[a]]\n"
+    assert (config.repo_specs_dir / "a.md").read_text(encoding="utf-8") == EXPOSED + "repo edit\n"
+    assert not (config.repo_specs_dir / "private.md").exists()
@@ -0,0 +1,106 @@
+"""Tests for attachment sync."""
+
+from specsync.attachments import extract_links, find_attachments
+from specsync.selector import read_document
+from specsync.sync import build_pull_plan, build_push_plan, execute_plan
+
+from .test_sync import EXPOSED, make_trees, states, write
+
+PNG = bytes(range(256)) * 64
+
+
+def write_bytes(path, data=PNG):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def test_extract_links():
+    body = (
+        "![diagram](img/flow.png) [spec](other.md) [site](https://example.com/x.png)\n"
+        '<img src="img/a%20b.svg"> ![[Board.pdf|300]] [anchor](#top) ![t](<img/c.png> "title")\n'
+    )
+
+    links, embeds = extract_links(body)
+
+    assert links == {"img/flow.png", "other.md", "https://example.com/x.png", "img/a%20b.svg", "#top", "img/c.png"}
+    assert embeds == {"Board.pdf"}
+
+
+def test_find_attachments_resolves_each_target_once(tmp_path):
+    root = tmp_path / "specs"
+    write_bytes(root / "img" / "flow.png")
+    write_bytes(root / "team" / "local.png")
+    write_bytes(root / "Board.pdf")
+    write_bytes(root / "private" / "secret.png")
+    write(root / ".specsyncignore", "private/\n")
+    docs = []
+    for relative, body in [
+        ("a.md", "![x](img/flow.png) ![[Board.pdf]] ![y](../outside.png) ![z](private/secret.png)"),
+        ("team/b.md", "![x](../img/flow.png) ![x](local.png#frag) ![m](missing.png)"),
+    ]:
+        path = write(root / relative, EXPOSED + body)
+        docs.append(read_document(path, path.relative_to(root), workspace_path=path, repo_path=path))
+
+    warnings = []
+    found = find_attachments(docs, root, warnings)
+
+    assert sorted(p.as_posix() for p in found) == ["Board.pdf", "img/flow.png", "team/local.png"]
+    assert warnings == [
+        "Skipping attachment outside specs dir: ../outside.png (linked from a.md)",
+        "Attachment not found: team/missing.png (linked from team/b.md)",
+    ]
+
+
+def test_pull_copies_attachments_once(tmp_path):
+    config = make_trees(tmp_path)
+    config.attachments = True
+    config.force = True
+    write(config.workspace_specs_dir / "a.md", EXPOSED + "![x](img/flow.png)\n")
+    write(config.workspace_specs_dir / "b.md", EXPOSED + "![x](img/flow.png) ![y](img/same.png)\n")
+    write_bytes(config.workspace_specs_dir / "img" / "flow.png")
+    write_bytes(config.workspace_specs_dir / "img" / "same.png", b"old")
+    write_bytes(config.repo_specs_dir / "img" / "same.png", b"old")
+
+    plan = build_pull_plan(config)
+
+    assert states(plan) == {"a.md": "create", "b.md": "create", "img/flow.png": "create", "img/same.png": "skip"}
+    stats = execute_plan(plan, config)
+    assert stats.created == 3
+    assert (config.repo_specs_dir / "img" / "flow.png").read_bytes() == PNG
+
+    write_bytes(config.workspace_specs_dir / "img" / "flow.png", b"changed")
+    assert states(build_pull_plan(config))["img/flow.png"] == "conflict"
+
+
+def test_attachments_are_off_by_default(tmp_path):
+    config = make_trees(tmp_path)
+    write(config.workspace_specs_dir / "a.md", EXPOSED + "![x](flow.png)\n")
+    write_bytes(config.workspace_specs_dir / "flow.png")
+
+    assert states(build_pull_plan(config)) == {"a.md": "create"}
+
+
+def test_push_copies_attachment_bytes(tmp_path):
+    config = make_trees(tmp_path)
+    config.attachments = True
+    config.force = True
+    write(config.repo_specs_dir / "a.md", "# No frontmatter\n![x](flow.png)\n")
+    write_bytes(config.repo_specs_dir / "flow.png")
+
+    execute_plan(build_push_plan(config), config)
+
+    assert (config.workspace_specs_dir / "flow.png").read_bytes() == PNG
+
+
+def test_parallel_plan_keeps_one_entry_per_attachment(tmp_path):
+    config = make_trees(tmp_path)
+    config.attachments = True
+    config.jobs = 3
+    for index in range(6):
+        write(config.workspace_specs_dir / f"spec-{index}.md", EXPOSED + "![x](shared.png)\n")
+    write_bytes(config.workspace_specs_dir / "shared.png")
+
+    plan = build_pull_plan(config)
+
+    assert [entry.attachment for entry in plan.entries].count(True) == 1
@@ -0,0 +1,130 @@
+"""Tests for the staged-files check."""
+
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import specsync
+from specsync.check import check_staged
+from specsync.cli import main
+from specsync.sync import build_pull_plan, build_push_plan, execute_plan
+
+from .test_gitindex import git
+from .test_selector import make_config
+from .test_sync import EXPOSED, states, write
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+
+@pytest.fixture()
+def config(tmp_path):
+    repo_root = (tmp_path / "repo").resolve()
+    (repo_root / "specs").mkdir(parents=True)
+    git(repo_root, "init", "-q")
+    config = make_config(repo_root, (tmp_path / "vault").resolve())
+    config.workspace_specs_dir.mkdir(parents=True)
+    write(config.repo_specs_dir / "committed.md")
+    write(config.workspace_specs_dir / "committed.md")
+    git(repo_root, "add", ".")
+    git(repo_root, "commit", "-q", "-m", "init")
+    return config
+
+
+def reasons(issues):
+    return {issue.path.as_posix(): issue.reason for issue in issues}
+
+
+def test_only_staged_specs_are_checked(config):
+    write(config.repo_specs_dir / "same.md")
+    write(config.workspace_specs_dir / "same.md")
+    write(config.repo_specs_dir / "drift.md", EXPOSED + "repo edit\n")
+    write(config.workspace_specs_dir / "drift.md")
+    write(config.repo_specs_dir / "new.md")
+    write(config.repo_specs_dir / "unstaged.md", "changed but not staged\n")
+    git(config.repo_root, "add", "specs/same.md", "specs/drift.md", "specs/new.md")
+
+    checked, issues = check_staged(config)
+
+    assert checked == 3
+    assert reasons(issues) == {"specs/drift.md": "differs from workspace", "specs/new.md": "missing in workspace"}
+
+
+def test_staged_content_is_compared_not_worktree(config):
+    write(config.repo_specs_dir / "a.md")
+    write(config.workspace_specs_dir / "a.md")
+    git(config.repo_root, "add", "specs/a.md")
+    write(config.repo_specs_dir / "a.md", "edited after staging\n")
+
+    assert check_staged(config) == (1, [])
+
+
+def test_staged_deletion_of_selected_workspace_spec(config):
+    git(config.repo_root, "rm", "-q", "specs/committed.md")
+
+    _, issues = check_staged(config)
+
+    assert reasons(issues) == {"specs/committed.md": "deleted in repo but present in workspace"}
+
+
+def test_unselected_workspace_spec_is_reported(config):
+    write(config.repo_specs_dir / "hidden.md")
+    write(config.workspace_specs_dir / "hidden.md", "---\nexpose: false\n---\n")
+    git(config.repo_root, "add", "specs/hidden.md")
+
+    _, issues = check_staged(config)
+
+    assert reasons(issues) == {"specs/hidden.md": "not selected in workspace (expose!=true)"}
+
+
+def test_check_command_exit_codes(config, monkeypatch, capsys):
+    monkeypatch.chdir(config.repo_root)
+    monkeypatch.setenv("SPECSYNC_WORKSPACE_ROOT", str(config.workspace_root))
+    monkeypatch.setenv("SPECSYNC_PROJECT_NAME", "demo")
+
+    assert main(["check"]) == 0
+
+    write(config.repo_specs_dir / "committed.md", EXPOSED + "drift\n")
+    git(config.repo_root, "add", "specs/committed.md")
+
+    assert main(["check"]) == 1
+    err = capsys.readouterr().err
+    assert "specs/committed.md: differs from workspace" in err
+    assert "1 of 1 staged specs out of sync" in err
+
+
+def test_formatting_only_differences_match_pull(config):
+    write(config.repo_specs_dir / "plain.md", "# Plain\n\nBody\n")
+    git(config.repo_root, "add", "specs/plain.md")
+    config.force = True
+    execute_plan(build_push_plan(config), config)
+    (config.repo_specs_dir / "crlf.md").write_bytes(EXPOSED.replace("\n", "\r\n").encode("utf-8"))
+    write(config.workspace_specs_dir / "crlf.md")
+    git(config.repo_root, "add", "specs/crlf.md")
+
+    assert states(build_pull_plan(config)) == {"committed.md": "skip", "crlf.md": "skip", "plain.md": "skip"}
+    assert check_staged(config) == (2, [])
+
+
+def test_transformed_output_is_compared(config):
+    config.transforms = ("wikilinks",)
+    write(config.workspace_specs_dir / "linked.md", EXPOSED + "See [[Committed]].\n")
+    write(config.repo_specs_dir / "linked.md", EXPOSED + "See [Committed](committed.md).\n")
+    git(config.repo_root, "add", "specs/linked.md")
+
+    assert states(build_pull_plan(config)) == {"committed.md": "skip", "linked.md": "skip"}
+    assert check_staged(config) == (1, [])
+
+
+def test_cli_startup_defers_modules_check_does_not_need():
+    # A pre-commit check runs on every commit, so the CLI must not import the other commands' modules.
+    env = {**os.environ, "PYTHONPATH": str(Path(specsync.__file__).parent.parent)}
+    code = "import sys, specsync.cli; print(*sys.modules)"
+    loaded = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+    modules = set(loaded.stdout.split())
+
+    deferred = {"specsync.api", "specsync.archive", "specsync.status", "specsync.storage", "concurrent.futures.process"}
+    assert not deferred & modules
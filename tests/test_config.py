@@ -125,3 +125,23 @@ name = "from-project-table"
     pyproject.write_text("")  # Empty pyproject.toml
     config = load_config(args, command="info")
     assert config.project_name == repo.name
+
+
+def test_positional_paths_become_specs_relative(monkeypatch, repo_layout, tmp_path):
+    workspace = tmp_path / "workspace"
+    (workspace / "specs" / "api").mkdir(parents=True)
+    monkeypatch.chdir(repo_layout)
+    editor_path = str(workspace / "specs" / "api")
+
+    config = load_config(
+        make_args(workspace_root=str(workspace), paths=[editor_path, "./rfcs/0042*.md"]), command="pull"
+    )
+
+    assert config.scope.patterns == ("api", "rfcs/0042*.md")
+    assert "paths=api rfcs/0042*.md" in config.filter_summary
+
+    whole = load_config(make_args(workspace_root=str(workspace), paths=[str(workspace / "specs")]), command="pull")
+    assert whole.scope is None
+
+    with pytest.raises(ConfigError, match="outside"):
+        load_config(make_args(workspace_root=str(workspace), paths=[str(tmp_path)]), command="pull")
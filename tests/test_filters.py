@@ -0,0 +1,114 @@
+"""Tests for the compiled filter rules."""
+
+import pytest
+
+from specsync import selector
+from specsync.exceptions import ConfigError
+from specsync.filters import PathScope, SpecFilter
+from specsync.selector import collect_workspace_documents
+
+from .test_selector import make_config
+
+EXPOSED = "---\nexpose: true\nproject: demo\n---\n"
+
+
+@pytest.mark.parametrize(
+    ("pattern", "path", "expected"),
+    [
+        ("*.md", "a.md", True),
+        ("*.md", "deep/nested/a.md", True),
+        ("drafts/*.md", "drafts/a.md", True),
+        ("drafts/*.md", "drafts/sub/a.md", False),
+        ("drafts/**/*.md", "drafts/sub/a.md", True),
+        ("drafts/**/*.md", "drafts/a.md", True),
+        ("/top.md", "sub/top.md", False),
+        ("rfc-00[0-4]?.md", "rfc-0042.md", True),
+        ("rfc-00[!0-4]?.md", "rfc-0042.md", False),
+    ],
+)
+def test_glob_matching(pattern, path, expected):
+    spec_filter = SpecFilter.from_config({"include": [pattern]})
+    assert spec_filter.match_path(path) is expected
+
+
+def test_exclude_dirs_by_name_and_path():
+    spec_filter = SpecFilter.from_config({"exclude_dirs": ["attachments", "notes/archive/**"]})
+    assert spec_filter.skip_dir("attachments")
+    assert spec_filter.skip_dir("projects/attachments")
+    assert spec_filter.skip_dir("notes/archive")
+    assert not spec_filter.skip_dir("archive")
+    assert not spec_filter.skip_dir("notes")
+
+
+def test_frontmatter_predicates():
+    spec_filter = SpecFilter.from_config({"frontmatter": {"status": ["approved", "review"], "public": True}})
+    assert spec_filter.frontmatter_reason({"status": "review", "public": True}) is None
+    assert spec_filter.frontmatter_reason({"status": "draft", "public": True}) == "status not in filter"
+    assert spec_filter.frontmatter_reason({"status": "approved"}) == "public not in filter"
+
+
+@pytest.mark.parametrize(
+    "table",
+    [{"include": "*.md", "exclude": [1]}, {"max_file_size": -1}, {"max_file_size": "1MB"}, {"frontmatter": ["x"]}],
+)
+def test_invalid_rules_raise(table):
+    with pytest.raises(ConfigError):
+        SpecFilter.from_config(table)
+
+
+def test_collect_prunes_before_reading(tmp_path, monkeypatch):
+    config = make_config(tmp_path / "repo", tmp_path / "vault")
+    specs = config.workspace_specs_dir
+    for rel in ["keep.md", "archive/old.md", "sub/attachments/note.md", "sub/big.md", "sub/scratch.tmp.md"]:
+        (specs / rel).parent.mkdir(parents=True, exist_ok=True)
+        (specs / rel).write_text(EXPOSED, encoding="utf-8")
+    (specs / "sub" / "big.md").write_text(EXPOSED + "x" * 1000, encoding="utf-8")
+    (specs / "draft.md").write_text("---\nexpose: true\nstatus: draft\n---\n", encoding="utf-8")
+    config.spec_filter = SpecFilter.from_config(
+        {
+            "exclude_dirs": ["archive", "attachments"],
+            "exclude": ["*.tmp.md"],
+            "max_file_size": 200,
+            "frontmatter": {"status": [None, "approved"]},
+        }
+    )
+
+    opened = []
+    read_text = selector.read_text
+
+    def tracking_read(path):
+        opened.append(path.relative_to(specs).as_posix())
+        return read_text(path)
+
+    monkeypatch.setattr(selector, "read_text", tracking_read)
+    documents, warnings = collect_workspace_documents(config)
+
+    assert [doc.relative_path.as_posix() for doc in documents] == ["keep.md"]
+    assert sorted(opened) == ["draft.md", "keep.md"]
+    assert any("max_file_size" in msg for msg in warnings)
+    assert any("status not in filter" in msg for msg in warnings)
+
+
+@pytest.mark.parametrize(
+    ("path", "expected"),
+    [
+        ("api/users.md", True),
+        ("api/v2/deep.md", True),
+        ("rfcs/0042-auth.md", True),
+        ("rfcs/0043-auth.md", False),
+        ("apiary/x.md", False),
+        ("other.md", False),
+    ],
+)
+def test_path_scope_matching(path, expected):
+    assert PathScope(("api", "rfcs/0042*.md")).match_path(path) is expected
+
+
+def test_path_scope_prunes_directories():
+    scope = PathScope(("api", "rfcs/0042*.md", "teams/*/notes"))
+
+    dirs = ["api", "api/v2", "rfcs", "rfcs/old", "teams", "teams/a", "teams/a/notes", "teams/a/x", "misc"]
+
+    entered = [directory for directory in dirs if scope.enter_dir(directory)]
+
+    assert entered == ["api", "api/v2", "rfcs", "teams", "teams/a", "teams/a/notes"]
@@ -1,8 +1,10 @@
 """Tests for filesystem utilities."""
 
+import hashlib
 
 import pytest
 
+from specsync import fs
 from specsync.fs import (
     ensure_dir,
     is_within,
@@ -11,8 +13,9 @@ from specsync.fs import (
     append_gitignore,
     write_file_atomic,
     hash_file,
+    digest_file,
 )
-from specsync.exceptions import SecurityError
+from specsync.exceptions import ConfigError, SecurityError
 
 
 class TestPathSecurity:
@@ -144,6 +147,57 @@ class TestFileOperations:
 
         assert hash_file(file1) != hash_file(file2)
 
+    def test_hash_file_algorithms(self, tmp_path):
+        """Test that each supported algorithm matches hashlib."""
+        path = tmp_path / "file.md"
+        path.write_bytes(b"spec content\n")
+
+        assert hash_file(path, "sha256") == hashlib.sha256(b"spec content\n").hexdigest()
+        assert hash_file(path, "blake2b") == hashlib.blake2b(b"spec content\n").hexdigest()
+
+    def test_hash_file_large_file_uses_mmap(self, tmp_path, monkeypatch):
+        """Test that files above the threshold are hashed from a memory map."""
+        monkeypatch.setattr(fs, "MMAP_THRESHOLD", 16)
+        mapped = []
+        real_mmap = fs.mmap.mmap
+
+        def tracking_mmap(*args, **kwargs):
+            mapped.append(args)
+            return real_mmap(*args, **kwargs)
+
+        monkeypatch.setattr(fs.mmap, "mmap", tracking_mmap)
+        path = tmp_path / "big.md"
+        payload = b"x" * 1000
+        path.write_bytes(payload)
+
+        assert hash_file(path, "blake2b") == hashlib.blake2b(payload).hexdigest()
+        assert len(mapped) == 1
+
+    def test_digest_file_is_tagged(self, tmp_path):
+        """Test that digests carry their algorithm and never collide across algorithms."""
+        path = tmp_path / "file.md"
+        path.write_text("content")
+
+        assert digest_file(path) == f"sha256:{hash_file(path)}"
+        assert digest_file(path, "blake2b").startswith("blake2b:")
+        assert digest_file(path) != digest_file(path, "blake2b")
+
+    def test_hash_file_unknown_algorithm(self, tmp_path):
+        """Test that unknown algorithms raise a configuration error."""
+        path = tmp_path / "file.md"
+        path.write_text("content")
+
+        with pytest.raises(ConfigError):
+            hash_file(path, "md4-turbo")
+
+    def test_hash_file_xxh3(self, tmp_path):
+        """Test the optional xxhash algorithm when installed."""
+        xxhash = pytest.importorskip("xxhash")
+        path = tmp_path / "file.md"
+        path.write_bytes(b"content")
+
+        assert hash_file(path, "xxh3") == xxhash.xxh3_128(b"content").hexdigest()
+
 
 class TestGitignore:
     """Test gitignore manipulation."""
@@ -229,4 +283,16 @@ class TestMarkdownFiles:
         assert "file1.md" in paths
         assert "file2.md" in paths
         assert "other.txt" not in paths
-        assert "hidden.md" not in paths  # Hidden directories should be skipped
\ No newline at end of file
+        assert "hidden.md" not in paths  # Hidden directories should be skipped
+
+    def test_iter_markdown_files_sorted(self, tmp_path):
+        """Test that files come out sorted by relative path parts."""
+        root = tmp_path / "root"
+        for rel in ["b.md", "a.md", "a/z.md", "a/b/c.md", "a-b.md"]:
+            (root / rel).parent.mkdir(parents=True, exist_ok=True)
+            (root / rel).write_text("content")
+
+        relative = [f.relative_to(root).parts for f in iter_markdown_files(root)]
+
+        assert relative == sorted(relative)
+        assert len(relative) == 5
@@ -0,0 +1,112 @@
+"""Tests for the git index fast path."""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from specsync import gitindex
+from specsync.gitindex import GitIndex, git_blob_id
+from specsync.sync import build_pull_plan
+
+from .test_selector import make_config
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+
+def git(repo, *args):
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+@pytest.fixture()
+def repo(tmp_path):
+    repo_root = tmp_path / "repo"
+    specs = repo_root / "specs"
+    (specs / "nested").mkdir(parents=True)
+    git(repo_root, "init", "-q")
+    (specs / "same.md").write_text("---\nexpose: true\n---\nsame\n", encoding="utf-8")
+    (specs / "nested" / "with space.md").write_text("---\nexpose: true\n---\nold\n", encoding="utf-8")
+    # Backdate the files so they are not racily clean against the index.
+    for path in specs.rglob("*.md"):
+        os.utime(path, (1_600_000_000, 1_600_000_000))
+    git(repo_root, "add", ".")
+    git(repo_root, "commit", "-q", "-m", "init")
+    return repo_root.resolve()
+
+
+def test_git_blob_id_matches_hash_object(tmp_path):
+    path = tmp_path / "file.md"
+    path.write_bytes(b"hello\r\nworld\n")
+    expected = subprocess.run(
+        ["git", "hash-object", str(path)], check=True, capture_output=True, text=True
+    ).stdout.strip()
+    assert git_blob_id(path) == expected
+
+
+def test_load_parses_entries(repo):
+    index = GitIndex.load(repo, repo / "specs")
+    assert index is not None
+    target = repo / "specs" / "nested" / "with space.md"
+    assert index.entries[target].oid == git_blob_id(target)
+    assert index.entries[target].size == target.stat().st_size
+
+
+def test_load_returns_none_outside_git(tmp_path):
+    (tmp_path / ".git").mkdir()
+    assert GitIndex.load(tmp_path, tmp_path / "specs") is None
+
+
+def test_blob_id_trusts_stat_cache(repo, monkeypatch):
+    index = GitIndex.load(repo, repo / "specs")
+    target = repo / "specs" / "same.md"
+    expected = git_blob_id(target)
+
+    def fail(path):
+        raise AssertionError(f"unexpected read of {path}")
+
+    monkeypatch.setattr(gitindex, "git_blob_id", fail)
+    assert index.blob_id(target) == expected
+    assert index.cache_hits == 1
+
+
+def test_blob_id_rehashes_modified_file(repo):
+    index = GitIndex.load(repo, repo / "specs")
+    target = repo / "specs" / "same.md"
+    target.write_text("---\nexpose: true\n---\nchanged!\n", encoding="utf-8")
+    assert index.blob_id(target) == git_blob_id(target)
+    assert index.cache_hits == 0
+
+
+def test_pull_plan_with_git_index(repo, tmp_path):
+    workspace_specs = tmp_path / "vault" / "specs"
+    (workspace_specs / "nested").mkdir(parents=True)
+    (workspace_specs / "same.md").write_text("---\nexpose: true\n---\nsame\n", encoding="utf-8")
+    (workspace_specs / "nested" / "with space.md").write_text("---\nexpose: true\n---\nnew\n", encoding="utf-8")
+    (workspace_specs / "fresh.md").write_text("---\nexpose: true\n---\nfresh\n", encoding="utf-8")
+
+    config = make_config(repo, tmp_path / "vault")
+    config.git_index = True
+    plan = build_pull_plan(config)
+
+    states = {entry.document.relative_path.as_posix(): entry.state for entry in plan.entries}
+    assert states == {"same.md": "skip", "nested/with space.md": "conflict", "fresh.md": "create"}
+    assert not plan.warnings
+
+
+def test_pull_plan_falls_back_without_git(tmp_path):
+    repo_root = tmp_path / "repo"
+    (repo_root / ".git").mkdir(parents=True)
+    (repo_root / "specs").mkdir()
+    (tmp_path / "vault" / "specs").mkdir(parents=True)
+
+    config = make_config(repo_root, tmp_path / "vault")
+    config.git_index = True
+    plan = build_pull_plan(config)
+    assert any("Git index unavailable" in msg for msg in plan.warnings)
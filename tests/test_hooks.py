@@ -0,0 +1,118 @@
+"""Tests for post_sync hooks."""
+
+import json
+import sys
+
+import pytest
+
+from specsync import hooks
+from specsync.cli import main
+from specsync.exceptions import ConfigError, HookError
+from specsync.hooks import Hook, parse_hooks, run_post_sync
+from specsync.logging import flush
+from specsync.models import ChangeManifest
+from specsync.sync import build_pull_plan, execute_plan
+
+from .test_sync import EXPOSED, make_trees, write
+
+PYTHON = f'"{sys.executable}" -c'
+
+
+def test_parse_hooks_accepts_strings_and_tables():
+    hooks = parse_hooks(["ruff format", {"command": "git add", "input": "env", "on": "pull"}])
+
+    assert hooks == (Hook("ruff format"), Hook("git add", input="env", on=("pull",)))
+    with pytest.raises(ConfigError, match="input"):
+        parse_hooks([{"command": "x", "input": "socket"}])
+    with pytest.raises(ConfigError, match="on"):
+        parse_hooks([{"command": "x", "on": ["status"]}])
+
+
+def test_execute_records_changed_paths(tmp_path):
+    config = make_trees(tmp_path)
+    config.force = True
+    config.prune = True
+    write(config.workspace_specs_dir / "new.md")
+    write(config.workspace_specs_dir / "edit.md", EXPOSED + "edit\n")
+    write(config.repo_specs_dir / "edit.md")
+    write(config.repo_specs_dir / "same.md")
+    write(config.workspace_specs_dir / "same.md")
+    write(config.repo_specs_dir / "gone.md")
+
+    changes = execute_plan(build_pull_plan(config), config).changes
+
+    root = config.repo_specs_dir
+    assert (changes.created, changes.updated, changes.deleted) == ([root / "new.md"], [root / "edit.md"], [root / "gone.md"])
+
+
+@pytest.mark.parametrize(
+    ("hook_input", "script"),
+    [
+        ("file", "import json,os; print(json.load(open(os.environ['SPECSYNC_MANIFEST']))['created'][0])"),
+        ("stdin", "import json,sys; print(json.load(sys.stdin)['created'][0])"),
+        ("env", "import os; print(os.environ['SPECSYNC_CREATED'].splitlines()[0])"),
+    ],
+)
+def test_hooks_receive_the_manifest(tmp_path, capfd, hook_input, script):
+    changes = ChangeManifest(created=[tmp_path / "a.md", tmp_path / "b.md"], deleted=[tmp_path / "c.md"])
+
+    ran = run_post_sync((Hook(f'{PYTHON} "{script}"', input=hook_input),), "pull", changes, cwd=tmp_path)
+
+    assert ran == 1
+    assert capfd.readouterr().out.strip() == str(tmp_path / "a.md")
+
+
+def test_env_hooks_fall_back_to_the_manifest_file_for_long_lists(tmp_path, capfd):
+    changes = ChangeManifest(created=[tmp_path / "specs" / f"spec-{index:04}.md" for index in range(3000)])
+    script = (
+        "import json,os; assert 'SPECSYNC_CREATED' not in os.environ; "
+        "print(len(json.load(open(os.environ['SPECSYNC_MANIFEST']))['created']))"
+    )
+
+    run_post_sync((Hook(f'{PYTHON} "{script}"', input="env"),), "pull", changes, cwd=tmp_path)
+    flush()
+
+    captured = capfd.readouterr()
+    assert captured.out.strip() == "3000"
+    assert "too long for the environment" in captured.err
+
+
+def test_hook_that_cannot_start_raises_hook_error(tmp_path, monkeypatch):
+    def run(*args, **kwargs):
+        raise OSError(7, "Argument list too long")
+
+    monkeypatch.setattr(hooks.subprocess, "run", run)
+
+    with pytest.raises(HookError, match="could not be started"):
+        run_post_sync((Hook("true"),), "pull", ChangeManifest(created=[tmp_path / "a.md"]), cwd=tmp_path)
+
+
+def test_hooks_run_once_only_when_something_changed(tmp_path):
+    marker = tmp_path / "runs"
+    hooks = (Hook(f'{PYTHON} "open(r\'{marker}\', \'a\').write(\'x\')"', on=("push",)),)
+
+    assert run_post_sync(hooks, "push", ChangeManifest(), cwd=tmp_path) == 0
+    assert run_post_sync(hooks, "pull", ChangeManifest(created=[tmp_path]), cwd=tmp_path) == 0
+    assert run_post_sync(hooks, "push", ChangeManifest(created=[tmp_path, tmp_path]), cwd=tmp_path) == 1
+    assert marker.read_text() == "x"
+
+    with pytest.raises(HookError, match="exit code 3"):
+        run_post_sync((Hook(f'{PYTHON} "raise SystemExit(3)"'),), "pull", ChangeManifest(updated=[tmp_path]), cwd=tmp_path)
+
+
+def test_pull_command_runs_configured_hooks(tmp_path, monkeypatch):
+    config = make_trees(tmp_path)
+    manifest = tmp_path / "manifest.json"
+    script = f"import os,shutil; shutil.copy(os.environ['SPECSYNC_MANIFEST'], r'{manifest}')"
+    (config.repo_root / "pyproject.toml").write_text(
+        "[tool.specsync]\npost_sync = [" + json.dumps(f'{PYTHON} "{script}"') + "]\n", encoding="utf-8"
+    )
+    write(config.workspace_specs_dir / "a.md")
+    monkeypatch.chdir(config.repo_root)
+    monkeypatch.setenv("SPECSYNC_WORKSPACE_ROOT", str(config.workspace_root))
+    monkeypatch.setenv("SPECSYNC_PROJECT_NAME", "demo")
+
+    assert main(["pull", "--force"]) == 0
+
+    data = json.loads(manifest.read_text(encoding="utf-8"))
+    assert data == {"command": "pull", "created": [str(config.repo_specs_dir / "a.md")], "updated": [], "deleted": []}
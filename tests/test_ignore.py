@@ -0,0 +1,89 @@
+"""Tests for .specsyncignore handling."""
+
+from specsync import fs
+from specsync.ignore import IgnoreRules, parse_ignore
+from specsync.selector import iter_candidate_paths
+from specsync.sync import build_pull_plan, build_push_plan
+
+from .test_sync import make_trees, states, write
+
+
+def ignored(text, relative, is_dir=False):
+    rules = parse_ignore(text)
+    result = False
+    for rule in rules:
+        if rule.matches(relative, is_dir):
+            result = not rule.negate
+    return result
+
+
+def test_gitignore_pattern_semantics():
+    assert ignored("# comment\n\ndraft-*.md\n", "a/draft-1.md")
+    assert not ignored("# comment\n", "# comment")
+    assert ignored("/top.md\n", "top.md")
+    assert not ignored("/top.md\n", "a/top.md")
+    assert ignored("docs/*.md\n", "docs/x.md")
+    assert not ignored("docs/*.md\n", "docs/sub/x.md")
+    assert ignored("docs/**/x.md\n", "docs/sub/deep/x.md")
+    assert ignored("archive/\n", "a/archive", is_dir=True)
+    assert not ignored("archive/\n", "archive")
+    assert not ignored("*.md\n!keep.md\n", "keep.md")
+    assert ignored("\\!bang.md\n", "!bang.md")
+
+
+def test_nested_ignore_files_take_precedence(tmp_path):
+    write(tmp_path / ".specsyncignore", "*.tmp.md\nnotes/\n")
+    write(tmp_path / "team" / ".specsyncignore", "!keep.tmp.md\n/local.md\n")
+    rules = IgnoreRules(tmp_path)
+
+    assert rules.ignored("scratch.tmp.md", is_dir=False)
+    assert rules.ignored("team/other.tmp.md", is_dir=False)
+    assert not rules.ignored("team/keep.tmp.md", is_dir=False)
+    assert rules.ignored("team/local.md", is_dir=False)
+    assert not rules.ignored("local.md", is_dir=False)
+    assert rules.ignored_path("team/notes/x.md")
+    assert rules.rules_for("team") is rules.rules_for("team")
+
+
+def test_ignored_directories_are_never_listed(tmp_path, monkeypatch):
+    config = make_trees(tmp_path)
+    specs = config.workspace_specs_dir
+    write(specs / ".specsyncignore", "templates/\narchive/\n_generated/\n")
+    write(specs / "keep.md")
+    for name in ("templates", "archive", "_generated"):
+        write(specs / name / "x.md")
+
+    listed = []
+    original = fs._list_directory
+    monkeypatch.setattr(fs, "_list_directory", lambda directory: listed.append(directory) or original(directory))
+
+    paths = [relative.as_posix() for _, relative in iter_candidate_paths(specs, config)]
+
+    assert paths == ["keep.md"]
+    assert listed == [specs]
+
+
+def test_ignore_files_apply_in_both_roots(tmp_path):
+    config = make_trees(tmp_path)
+    config.prune = True
+    write(config.workspace_specs_dir / ".specsyncignore", "drafts/\n")
+    write(config.workspace_specs_dir / "drafts" / "wip.md")
+    write(config.workspace_specs_dir / "a.md")
+    write(config.repo_specs_dir / ".specsyncignore", "generated.md\n")
+    write(config.repo_specs_dir / "generated.md")
+
+    plan = build_pull_plan(config)
+
+    assert states(plan) == {"a.md": "create"}
+
+
+def test_one_sided_ignore_never_prunes_the_other_tree(tmp_path):
+    config = make_trees(tmp_path)
+    config.prune = True
+    write(config.workspace_specs_dir / ".specsyncignore", "archive/\n")
+    write(config.repo_specs_dir / "archive" / "old.md")
+    write(config.repo_specs_dir / ".specsyncignore", "private.md\n")
+    write(config.workspace_specs_dir / "private.md")
+
+    assert states(build_pull_plan(config)) == {}
+    assert states(build_push_plan(config)) == {}
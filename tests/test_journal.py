@@ -0,0 +1,105 @@
+"""Tests for the resumable execution journal."""
+
+import pytest
+
+from specsync import fs, journal, sync
+from specsync.journal import journal_path, load_journal
+from specsync.sync import build_pull_plan, execute_plan
+
+from .test_sync import EXPOSED, make_trees, write
+
+
+class Interrupted(Exception):
+    pass
+
+
+def interrupt_after(monkeypatch, count):
+    real_copy = sync._copy
+    calls = []
+
+    def flaky_copy(*args, **kwargs):
+        if len(calls) == count:
+            raise Interrupted()
+        calls.append(args)
+        real_copy(*args, **kwargs)
+
+    monkeypatch.setattr(sync, "_copy", flaky_copy)
+
+
+def test_interrupted_run_resumes_from_journal(tmp_path, monkeypatch):
+    config = make_trees(tmp_path)
+    config.force = True
+    for index in range(5):
+        write(config.workspace_specs_dir / f"spec{index}.md", EXPOSED + f"{index}\n")
+
+    interrupt_after(monkeypatch, 3)
+    with pytest.raises(Interrupted):
+        execute_plan(build_pull_plan(config), config)
+    path = journal_path(config.state_dir, "pull")
+    assert sorted(load_journal(path, "pull")) == ["spec0.md", "spec1.md", "spec2.md"]
+    monkeypatch.undo()
+
+    def no_hashing(*args):
+        raise AssertionError("journaled entries must not be rehashed")
+
+    monkeypatch.setattr(sync, "_same_content", no_hashing)
+    config.resume = True
+    plan = build_pull_plan(config)
+    assert [(e.document.relative_path.name, e.state) for e in plan.entries] == [
+        ("spec0.md", "skip"),
+        ("spec1.md", "skip"),
+        ("spec2.md", "skip"),
+        ("spec3.md", "create"),
+        ("spec4.md", "create"),
+    ]
+    assert plan.entries[0].reason == "already applied (resumed)"
+
+    stats = execute_plan(plan, config)
+    assert stats.created == 2
+    assert not path.exists()
+
+
+def test_resume_rechecks_files_changed_since_journal(tmp_path, monkeypatch):
+    config = make_trees(tmp_path)
+    config.force = True
+    source = write(config.workspace_specs_dir / "a.md")
+    write(config.workspace_specs_dir / "b.md")
+
+    interrupt_after(monkeypatch, 1)
+    with pytest.raises(Interrupted):
+        execute_plan(build_pull_plan(config), config)
+    monkeypatch.undo()
+
+    source.write_text(EXPOSED + "edited after the interruption\n", encoding="utf-8")
+    config.resume = True
+    plan = build_pull_plan(config)
+    assert [(e.document.relative_path.name, e.state) for e in plan.entries] == [("a.md", "conflict"), ("b.md", "create")]
+
+
+def test_load_journal_ignores_foreign_and_truncated_data(tmp_path):
+    path = tmp_path / "pull.journal"
+    path.write_text(
+        '{"version": 1, "direction": "pull"}\n'
+        '{"path": "a.md", "state": "create", "target_size": 3}\n'
+        '{"path": "b.md", "sta',
+        encoding="utf-8",
+    )
+    assert list(load_journal(path, "pull")) == ["a.md"]
+    assert load_journal(path, "push") == {}
+    assert load_journal(tmp_path / "missing.journal", "pull") == {}
+
+
+def test_journal_records_stat_data_without_reading_targets(tmp_path, monkeypatch):
+    config = make_trees(tmp_path)
+    config.force = True
+    write(config.workspace_specs_dir / "a.md")
+    plan = build_pull_plan(config)
+
+    def no_hashing(*args):
+        raise AssertionError("journaled writes must not be rehashed")
+
+    monkeypatch.setattr(fs, "digest_file", no_hashing)
+    monkeypatch.setattr(journal, "digest_file", no_hashing, raising=False)
+    stats = execute_plan(plan, config)
+
+    assert stats.created == 1
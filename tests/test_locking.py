@@ -0,0 +1,84 @@
+"""Tests for cross-process advisory locks."""
+
+import os
+
+import pytest
+
+from specsync import fs, locking
+from specsync.exceptions import ConflictError, LockError
+from specsync.locking import DirectoryLocks, lock_shard
+from specsync.sync import build_push_plan, execute_plan
+
+from .test_sync import EXPOSED, make_trees, write
+
+pytestmark = pytest.mark.skipif(locking.fcntl is None, reason="fcntl not available")
+
+
+def test_disjoint_directories_lock_independently(tmp_path):
+    assert lock_shard("api") != lock_shard("rfcs")
+    with DirectoryLocks(tmp_path, ["api"], timeout=0):
+        with DirectoryLocks(tmp_path, ["rfcs"], timeout=0) as other:
+            assert other.waited < 0.1
+
+
+def test_contention_times_out_naming_the_holder(tmp_path, capsys):
+    now = [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    with DirectoryLocks(tmp_path, ["api", "rfcs"], timeout=0):
+        waiting = DirectoryLocks(tmp_path, ["rfcs"], timeout=2, clock=lambda: now[0], sleep=sleep)
+        with pytest.raises(LockError, match=rf"after 2s waiting for lock on rfcs \(held by pid {os.getpid()}"):
+            waiting.acquire()
+
+    assert "Waiting for lock on rfcs" in capsys.readouterr().err
+    with waiting:  # Released by the holder, so it is free again.
+        pass
+
+
+def test_push_takes_workspace_locks(tmp_path):
+    config = make_trees(tmp_path)
+    config.force = True
+    config.lock_timeout = 0
+    write(config.repo_specs_dir / "api" / "a.md")
+    lock_dir = config.workspace_specs_dir / ".specsync-locks"
+
+    with DirectoryLocks(lock_dir, ["api"], timeout=0):
+        with pytest.raises(LockError):
+            execute_plan(build_push_plan(config), config)
+    assert not (config.workspace_specs_dir / "api" / "a.md").exists()
+
+    execute_plan(build_push_plan(config), config)
+    assert (config.workspace_specs_dir / "api" / "a.md").exists()
+
+
+def test_write_file_atomic_uses_unique_temp_files(tmp_path, monkeypatch):
+    target = tmp_path / "a.md"
+    seen = []
+    original = os.replace
+    monkeypatch.setattr(os, "replace", lambda source, dest: seen.append(source) or original(source, dest))
+
+    fs.write_file_atomic(target, "one")
+    fs.write_file_atomic(target, "two")
+
+    assert target.read_text(encoding="utf-8") == "two"
+    assert len(set(seen)) == 2
+    assert [path.name for path in tmp_path.iterdir()] == ["a.md"]
+    assert target.stat().st_mode & 0o777 == 0o666 & ~fs._UMASK
+
+
+def test_plan_made_before_another_run_wrote_is_refused(tmp_path):
+    config = make_trees(tmp_path)
+    config.force = True
+    write(config.repo_specs_dir / "api" / "a.md", EXPOSED + "first run\n")
+    write(config.repo_specs_dir / "api" / "b.md")
+    write(config.workspace_specs_dir / "api" / "a.md")
+    first, second = build_push_plan(config), build_push_plan(config)
+
+    execute_plan(first, config)
+    write(config.workspace_specs_dir / "api" / "a.md", EXPOSED + "edited after the first run\n")
+    with pytest.raises(ConflictError, match="2 target files changed since the plan was made"):
+        execute_plan(second, config)
+
+    assert (config.workspace_specs_dir / "api" / "a.md").read_text(encoding="utf-8").endswith("after the first run\n")
@@ -0,0 +1,95 @@
+"""Tests for logging helpers."""
+
+import json
+import time
+
+import pytest
+
+from specsync import logging as specsync_logging
+from specsync.logging import aggregate_warnings, configure, flush, info, warn, warn_all
+
+
+@pytest.fixture(autouse=True)
+def reset_logging():
+    configure()
+    yield
+    flush()
+    configure()
+
+
+def make_warnings():
+    return [f"Filtered out (project mismatch): /vault/specs/other-{index}.md" for index in range(500)] + [
+        "Skipping symlink in workspace: /vault/specs/link.md",
+        "Git index unavailable; falling back to content hashing",
+    ]
+
+
+def test_aggregate_warnings_counts_and_examples():
+    groups = aggregate_warnings(make_warnings())
+
+    assert [(group.category, group.count) for group in groups] == [
+        ("Filtered out (project mismatch)", 500),
+        ("Skipping symlink in workspace", 1),
+        ("Git index unavailable; falling back to content hashing", 1),
+    ]
+    assert groups[0].examples == [f"/vault/specs/other-{index}.md" for index in range(3)]
+    assert groups[2].examples == []
+
+
+def test_warn_all_summarizes_by_default(capsys):
+    warn_all(make_warnings())
+    flush()
+
+    lines = capsys.readouterr().err.splitlines()
+    assert lines == [
+        "[WARN] Filtered out (project mismatch): 500 files (e.g. /vault/specs/other-0.md, "
+        "/vault/specs/other-1.md, /vault/specs/other-2.md; use --verbose for all)",
+        "[WARN] Skipping symlink in workspace: /vault/specs/link.md",
+        "[WARN] Git index unavailable; falling back to content hashing",
+    ]
+
+
+def test_warn_all_verbose_keeps_every_line(capsys):
+    configure(verbose=True)
+    warn_all(make_warnings())
+    flush()
+
+    assert len(capsys.readouterr().err.splitlines()) == 502
+
+
+def test_json_format(capsys):
+    configure(log_format="json")
+    info("Plan ready", create=2)
+    warn_all(make_warnings()[:2])
+    flush()
+
+    captured = capsys.readouterr()
+    assert json.loads(captured.out) == {"level": "info", "message": "Plan ready", "create": 2}
+    record = json.loads(captured.err)
+    assert record["category"] == "Filtered out (project mismatch)"
+    assert record["count"] == 2
+
+
+def test_output_is_buffered_until_flush(capsys, monkeypatch):
+    info("first")
+    assert capsys.readouterr().out == ""
+    flush()
+    assert capsys.readouterr().out == "[INFO] first\n"
+
+    monkeypatch.setattr(specsync_logging, "_FLUSH_THRESHOLD", 10)
+    info("long enough to flush")
+    assert capsys.readouterr().out == "[INFO] long enough to flush\n"
+
+
+def test_warnings_are_written_at_once_and_info_on_a_timer(capsys, monkeypatch):
+    monkeypatch.setattr(specsync_logging, "_FLUSH_INTERVAL", 0.01)
+    info("Plan: 1 create")
+    warn("Attachment not found: a.png")
+    # The warning flushes the pending plan line first, keeping them in order.
+    assert capsys.readouterr() == ("[INFO] Plan: 1 create\n", "[WARN] Attachment not found: a.png\n")
+
+    info("Created: 1")
+    deadline = time.monotonic() + 5
+    while specsync_logging._state.pending_size and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert capsys.readouterr().out == "[INFO] Created: 1\n"
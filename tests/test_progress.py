@@ -0,0 +1,93 @@
+"""Tests for progress reporting."""
+
+import io
+import json
+
+import pytest
+
+from specsync.progress import Progress, configure
+from specsync.sync import build_pull_plan, execute_plan
+
+from .test_sync import make_trees, write
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def reset_progress():
+    configure(None)
+    yield
+    configure(None)
+
+
+def test_live_line_is_rate_limited_and_cleared():
+    stream, clock = io.StringIO(), FakeClock()
+    progress = Progress(stream=stream, live=True, clock=clock)
+
+    progress.start("execute", total=100)
+    clock.now = 0.05
+    progress.advance(nbytes=500_000)
+    assert stream.getvalue() == ""
+
+    clock.now = 1.0
+    progress.advance(files=9, nbytes=500_000)
+    assert stream.getvalue() == "\r\033[Kexecute: 10/100 files, 10.0 files/s, 1.00 MB/s, ETA 9s"
+
+    progress.finish()
+    assert stream.getvalue().endswith("\r\033[K")
+
+
+def test_heartbeat_lines_when_not_a_tty():
+    stream, clock = io.StringIO(), FakeClock()
+    progress = Progress(stream=stream, live=False, clock=clock)
+
+    progress.start("scan")
+    for second in range(1, 26):
+        clock.now = float(second)
+        progress.advance()
+
+    assert stream.getvalue().splitlines() == [
+        "[INFO] scan: 10 files, 1.0 files/s, 0.00 MB/s",
+        "[INFO] scan: 20 files, 1.0 files/s, 0.00 MB/s",
+    ]
+    progress.finish()
+    assert stream.getvalue().count("\r") == 0
+
+
+def test_json_heartbeat():
+    stream, clock = io.StringIO(), FakeClock()
+    progress = Progress(stream=stream, live=True, json_lines=True, clock=clock)
+
+    progress.start("plan", total=40)
+    clock.now = 10.0
+    progress.advance(files=20)
+
+    record = json.loads(stream.getvalue())
+    assert record["phase"] == "plan"
+    assert record["files"] == 20
+    assert record["eta_s"] == 10
+
+
+def test_sync_reports_each_phase(tmp_path):
+    config = make_trees(tmp_path)
+    config.force = True
+    for name in ("a.md", "b.md", "c.md"):
+        write(config.workspace_specs_dir / name)
+
+    phases = []
+
+    class Recorder(Progress):
+        def start(self, name, total=None):
+            phases.append((name, total))
+            super().start(name, total)
+
+    configure(Recorder(stream=io.StringIO(), live=False))
+    execute_plan(build_pull_plan(config), config)
+
+    assert phases == [("scan", None), ("plan", 3), ("execute", 3)]
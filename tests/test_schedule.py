@@ -0,0 +1,64 @@
+"""Tests for execution scheduling."""
+
+from pathlib import Path
+
+from specsync import fs
+from specsync.schedule import schedule_entries
+from specsync.sync import build_pull_plan, execute_plan
+
+from .test_sync import EXPOSED, make_trees, write
+
+
+def test_schedule_groups_writes_before_moves_and_deletes(tmp_path):
+    config = make_trees(tmp_path)
+    config.prune = True
+    for relative in ("b/one.md", "a/two.md", "a/sub/three.md", "a/one.md"):
+        write(config.workspace_specs_dir / relative)
+    write(config.repo_specs_dir / "a" / "old.md")
+
+    schedule = schedule_entries(build_pull_plan(config).entries)
+
+    order = [(entry.state, entry.target_path.relative_to(config.repo_specs_dir).as_posix()) for entry in schedule.entries]
+    assert [state for state, _ in order] == ["create"] * 4 + ["delete"]
+    assert {path for _, path in order[:2]} == {"a/one.md", "a/two.md"}
+    assert order[-1] == ("delete", "a/old.md")
+    assert [path.relative_to(config.repo_specs_dir) for path in schedule.directories] == [
+        Path("a"),
+        Path("a/sub"),
+        Path("b"),
+    ]
+
+
+def test_execute_creates_each_directory_once(tmp_path, monkeypatch):
+    config = make_trees(tmp_path)
+    config.force = True
+    config.prune = True
+    for index in range(5):
+        write(config.workspace_specs_dir / "api" / f"{index}.md")
+    write(config.repo_specs_dir / "api" / "old.md")
+
+    calls = []
+    monkeypatch.setattr(fs, "ensure_dir", lambda path: calls.append(path))
+    stats = execute_plan(build_pull_plan(config), config)
+
+    assert (stats.created, stats.deleted) == (5, 1)
+    assert calls == []
+    assert sorted(path.name for path in (config.repo_specs_dir / "api").iterdir()) == [f"{i}.md" for i in range(5)]
+
+
+def test_moves_survive_parents_pruned_by_earlier_moves(tmp_path):
+    config = make_trees(tmp_path)
+    config.force = True
+    config.detect_moves = True
+    write(config.repo_specs_dir / "docs" / "f.md", EXPOSED + "f\n")
+    write(config.repo_specs_dir / "inbox" / "g.md", EXPOSED + "g\n")
+    write(config.workspace_specs_dir / "archive" / "f.md", EXPOSED + "f\n")
+    write(config.workspace_specs_dir / "docs" / "g.md", EXPOSED + "g\n")
+
+    stats = execute_plan(build_pull_plan(config), config)
+
+    assert stats.moved == 2
+    assert sorted(p.relative_to(config.repo_specs_dir).as_posix() for p in config.repo_specs_dir.rglob("*.md")) == [
+        "archive/f.md",
+        "docs/g.md",
+    ]
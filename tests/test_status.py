@@ -0,0 +1,71 @@
+"""Tests for the read-only status comparison."""
+
+from specsync import selector
+from specsync.cli import main
+from specsync.status import tree_status
+from specsync.sync import build_pull_plan, execute_plan
+
+from .test_sync import EXPOSED, make_trees, states, write
+
+
+def status(config):
+    entries, _ = tree_status(config)
+    return {entry.path.as_posix(): entry.state for entry in entries}
+
+
+def test_status_classifies_both_trees_reading_each_file_once(tmp_path, monkeypatch):
+    config = make_trees(tmp_path)
+    write(config.workspace_specs_dir / "same.md")
+    write(config.repo_specs_dir / "same.md")
+    write(config.workspace_specs_dir / "crlf.md", EXPOSED.replace("\n", "\r\n"))
+    write(config.repo_specs_dir / "crlf.md")
+    write(config.workspace_specs_dir / "api" / "edit.md", EXPOSED + "workspace edit\n")
+    write(config.repo_specs_dir / "api" / "edit.md")
+    write(config.workspace_specs_dir / "new.md")
+    write(config.workspace_specs_dir / "private.md", "---\nexpose: false\n---\n")
+    write(config.repo_specs_dir / "api" / "repo.md")
+
+    reads = []
+    original = selector.read_text
+    monkeypatch.setattr(selector, "read_text", lambda path: reads.append(path) or original(path))
+
+    assert status(config) == {
+        "api/edit.md": "differs",
+        "api/repo.md": "repo-only",
+        "crlf.md": "identical",
+        "new.md": "workspace-only",
+        "same.md": "identical",
+    }
+    assert len(reads) == len(set(reads)) == 9
+
+
+def test_status_compares_transformed_workspace_text(tmp_path):
+    config = make_trees(tmp_path)
+    config.transforms = ("wikilinks",)
+    config.force = True
+    write(config.workspace_specs_dir / "linked.md", EXPOSED + "See [[Other]].\n")
+    write(config.workspace_specs_dir / "api" / "Other.md")
+    execute_plan(build_pull_plan(config), config)
+    assert (config.repo_specs_dir / "linked.md").read_text(encoding="utf-8").endswith("[Other](api/Other.md).\n")
+
+    assert states(build_pull_plan(config)) == {"api/Other.md": "skip", "linked.md": "skip"}
+    assert status(config) == {"api/Other.md": "identical", "linked.md": "identical"}
+
+
+def test_status_command_prints_short_listing(tmp_path, monkeypatch, capsys):
+    config = make_trees(tmp_path)
+    write(config.workspace_specs_dir / "new.md")
+    write(config.repo_specs_dir / "old.md")
+    write(config.workspace_specs_dir / "same.md")
+    write(config.repo_specs_dir / "same.md")
+    monkeypatch.chdir(config.repo_root)
+    monkeypatch.setenv("SPECSYNC_WORKSPACE_ROOT", str(config.workspace_root))
+    monkeypatch.setenv("SPECSYNC_PROJECT_NAME", "demo")
+
+    assert main(["status"]) == 0
+
+    assert capsys.readouterr().out.splitlines() == [
+        "W new.md",
+        "R old.md",
+        "[INFO] 1 identical, 0 differ, 1 workspace-only, 1 repo-only",
+    ]
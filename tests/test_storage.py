@@ -0,0 +1,282 @@
+"""Tests for storage backends, with WebDAV run against a local stand-in server."""
+
+import email.utils
+import io
+import os
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import quote, unquote, urlsplit
+from xml.sax.saxutils import escape
+
+import pytest
+
+from specsync.cli import main
+from specsync.exceptions import StorageError
+from specsync.filters import PathScope
+from specsync.storage import (
+    LocalBackend,
+    WebDAVBackend,
+    ZipBackend,
+    fetch_specs,
+    walk_files,
+)
+
+from .test_sync import EXPOSED, make_trees, write
+
+
+class DAVHandler(BaseHTTPRequestHandler):
+    """Just enough WebDAV (PROPFIND, ranged GET) over a directory."""
+
+    protocol_version = "HTTP/1.1"
+    root: Path
+    log: list
+
+    def log_message(self, *args):
+        pass
+
+    def _path(self, url):
+        return self.root.joinpath(*[part for part in unquote(urlsplit(url).path).split("/") if part])
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_PROPFIND(self):
+        self._body()
+        self.log.append(("PROPFIND", self.path, self.client_address[1]))
+        path = self._path(self.path)
+        if not path.exists():
+            return self._send(404)
+        items = [path]
+        if path.is_dir() and self.headers.get("Depth") == "1":
+            items += sorted(path.iterdir())
+        responses = []
+        for item in items:
+            href = "/" + quote(item.relative_to(self.root).as_posix()) if item != self.root else "/"
+            stat = item.stat()
+            kind = "<d:collection/>" if item.is_dir() else ""
+            responses.append(
+                f"<d:response><d:href>{escape(href)}</d:href><d:propstat><d:prop>"
+                f"<d:resourcetype>{kind}</d:resourcetype><d:getcontentlength>{stat.st_size}</d:getcontentlength>"
+                f"<d:getlastmodified>{email.utils.formatdate(stat.st_mtime, usegmt=True)}</d:getlastmodified>"
+                f'<d:getetag>"{stat.st_mtime_ns:x}"</d:getetag></d:prop></d:propstat></d:response>'
+            )
+        body = f'<?xml version="1.0"?><d:multistatus xmlns:d="DAV:">{"".join(responses)}</d:multistatus>'
+        self._send(207, body.encode("utf-8"), {"Content-Type": "application/xml"})
+
+    def do_GET(self):
+        self.log.append(("GET", self.path, self.client_address[1]))
+        path = self._path(self.path)
+        if not path.is_file():
+            return self._send(404)
+        data = path.read_bytes()
+        ranged = self.headers.get("Range")
+        if ranged:
+            start, _, end = ranged.removeprefix("bytes=").partition("-")
+            data = data[int(start) : int(end) + 1 if end else None]
+            return self._send(206, data)
+        self._send(200, data)
+
+
+@pytest.fixture()
+def dav(tmp_path):
+    root = tmp_path / "dav"
+    root.mkdir()
+    handler = type("Handler", (DAVHandler,), {"root": root, "log": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield root, f"http://127.0.0.1:{server.server_address[1]}/", handler.log
+    server.shutdown()
+    server.server_close()
+
+
+def make_zip(path, members):
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return path
+
+
+def test_backends_agree_on_listing_and_reads(tmp_path, dav):
+    members = {"a.md": b"alpha", "dir/b.md": b"0123456789", "dir/sub/c.txt": b"c"}
+    local_root = tmp_path / "local"
+    dav_root, url, _ = dav
+    for root in (local_root, dav_root):
+        for name, data in members.items():
+            write(root / name).write_bytes(data)
+    backends = [LocalBackend(local_root), ZipBackend(make_zip(tmp_path / "specs.zip", members)), WebDAVBackend(url)]
+
+    for backend in backends:
+        assert [(entry.name, entry.is_dir) for entry in backend.list_dir("")] == [("a.md", False), ("dir", True)]
+        assert [path for path, _ in walk_files(backend)] == ["a.md", "dir/b.md", "dir/sub/c.txt"]
+        assert [entry.size for entry in backend.list_dir("dir") if not entry.is_dir] == [10]
+        assert backend.list_dir("missing") == []
+        assert backend.read_range("dir/b.md", 2, 3) == b"234"
+        assert backend.read_range("a.md") == b"alpha"
+        backend.close()
+
+
+class Recorder(io.BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.sizes = []
+
+    def write(self, data):
+        self.sizes.append(len(data))
+        return super().write(data)
+
+
+def test_backends_copy_files_in_chunks(tmp_path, dav):
+    data = os.urandom(200_000)
+    dav_root, url, _ = dav
+    write(dav_root / "big.md").write_bytes(data)
+    write(tmp_path / "local" / "big.md").write_bytes(data)
+    zipped = make_zip(tmp_path / "specs.zip", {"big.md": data})
+    backends = [LocalBackend(tmp_path / "local"), ZipBackend(zipped), WebDAVBackend(url)]
+
+    for backend in backends:
+        stream = Recorder()
+        backend.copy_to("big.md", stream)
+        assert stream.getvalue() == data
+        assert len(stream.sizes) > 1 and max(stream.sizes) <= 65536
+        backend.close()
+
+
+def test_webdav_reuses_connections_and_lists_once_per_directory(dav):
+    root, url, log = dav
+    for index in range(3):
+        write(root / "specs" / f"{index}.md")
+    backend = WebDAVBackend(url + "specs/")
+
+    for path, _ in walk_files(backend):
+        backend.read_range(path)
+
+    assert [method for method, _, _ in log].count("PROPFIND") == 1
+    assert len({port for _, _, port in log}) == 1
+
+
+def test_fetch_downloads_only_selected_specs(tmp_path, dav):
+    root, url, log = dav
+    config = make_trees(tmp_path)
+    config.scope = PathScope(("api",))
+    write(root / "api" / "a.md")
+    write(root / "api" / "diagram.png", "binary")
+    write(root / "other" / "b.md")
+    write(root / ".specsyncignore", "drafts/\n")
+
+    count = fetch_specs(WebDAVBackend(url), tmp_path / "out", config)
+
+    assert count == 2
+    assert sorted(p.relative_to(tmp_path / "out").as_posix() for p in (tmp_path / "out").rglob("*")) == [
+        ".specsyncignore",
+        "api",
+        "api/a.md",
+    ]
+    fetched = {unquote(path) for method, path, _ in log if method == "GET"}
+    assert fetched == {"/.specsyncignore", "/api/a.md"}
+    assert not any(method == "PROPFIND" and "other" in path for method, path, _ in log)
+
+
+def test_fetch_applies_ignore_files_while_walking(tmp_path, dav):
+    root, url, log = dav
+    config = make_trees(tmp_path)
+    write(root / ".specsyncignore", "drafts/\n")
+    write(root / "drafts" / "d.md")
+    write(root / "api" / ".specsyncignore", "private.md\n")
+    # Sorts before the ignore file, so it is only skipped if the ignore file is read first.
+    write(root / "api" / "-private.md")
+    write(root / "api" / "private.md")
+    write(root / "api" / "a.md")
+    write(root / "legacy" / "old.md")
+    write(config.repo_specs_dir / ".specsyncignore", "legacy/\n-private.md\n")
+
+    count = fetch_specs(WebDAVBackend(url), tmp_path / "out", config)
+
+    assert count == 3
+    fetched = {unquote(path) for method, path, _ in log if method == "GET"}
+    assert fetched == {"/.specsyncignore", "/api/.specsyncignore", "/api/a.md"}
+    listed = {unquote(path) for method, path, _ in log if method == "PROPFIND"}
+    assert listed == {"/", "/api/"}
+
+
+def test_fetch_downloads_linked_attachments_with_listed_mtimes(tmp_path, dav):
+    root, url, log = dav
+    config = make_trees(tmp_path)
+    config.attachments = True
+    write(root / "api" / "a.md", EXPOSED + "![flow](img/flow.png) ![[shared.pdf]] [b](b.md) [gone](gone.png)\n")
+    write(root / "api" / "img" / "flow.png", "png")
+    write(root / "shared.pdf", "pdf")
+    write(root / "unlinked.png", "png")
+    os.utime(root / "api" / "img" / "flow.png", (1_600_000_000, 1_600_000_000))
+
+    count = fetch_specs(WebDAVBackend(url), tmp_path / "out", config)
+
+    assert count == 3
+    out = tmp_path / "out"
+    assert sorted(p.relative_to(out).as_posix() for p in out.rglob("*") if p.is_file()) == [
+        "api/a.md",
+        "api/img/flow.png",
+        "shared.pdf",
+    ]
+    assert (out / "api" / "img" / "flow.png").stat().st_mtime == 1_600_000_000
+    assert not any(method == "GET" and "unlinked" in path for method, path, _ in log)
+
+
+def test_import_zip_export_keeps_attachments_and_mtimes(tmp_path, monkeypatch):
+    config = make_trees(tmp_path)
+    write(config.workspace_specs_dir / "a.md", EXPOSED + "![flow](img/flow.png)\n")
+    write(config.workspace_specs_dir / "img" / "flow.png", "png")
+    for path in (config.workspace_specs_dir / "a.md", config.workspace_specs_dir / "img" / "flow.png"):
+        os.utime(path, (1_600_000_000, 1_600_000_000))
+    archive_path = tmp_path / "specs.zip"
+    monkeypatch.chdir(config.repo_root)
+    monkeypatch.setenv("SPECSYNC_WORKSPACE_ROOT", str(config.workspace_root))
+    monkeypatch.setenv("SPECSYNC_PROJECT_NAME", "demo")
+    assert main(["export", "--format", "zip", "--attachments", "--output", str(archive_path)]) == 0
+    monkeypatch.delenv("SPECSYNC_WORKSPACE_ROOT")
+
+    assert main(["import", str(archive_path), "--attachments", "--force"]) == 0
+
+    assert (config.repo_specs_dir / "img" / "flow.png").read_text(encoding="utf-8") == "png"
+    # Zip timestamps have two-second resolution.
+    assert abs((config.repo_specs_dir / "a.md").stat().st_mtime - 1_600_000_000) <= 2
+
+
+def test_zip_rejects_escaping_members(tmp_path):
+    with pytest.raises(StorageError, match="escapes"):
+        ZipBackend(make_zip(tmp_path / "bad.zip", {"../x.md": b"x"}))
+
+
+def test_import_from_directory(tmp_path, monkeypatch):
+    config = make_trees(tmp_path)
+    source = tmp_path / "snapshot"
+    write(source / "api" / "a.md", EXPOSED + "snapshot\n")
+    monkeypatch.chdir(config.repo_root)
+    monkeypatch.setenv("SPECSYNC_WORKSPACE_ROOT", str(config.workspace_root))
+    monkeypatch.setenv("SPECSYNC_PROJECT_NAME", "demo")
+
+    assert main(["import", str(source), "--force"]) == 0
+
+    assert (config.repo_specs_dir / "api" / "a.md").read_text(encoding="utf-8") == EXPOSED + "snapshot\n"
+
+
+def test_import_from_webdav(tmp_path, dav, monkeypatch):
+    root, url, _ = dav
+    config = make_trees(tmp_path)
+    write(root / "api" / "a.md", EXPOSED + "remote\n")
+    monkeypatch.chdir(config.repo_root)
+    monkeypatch.setenv("SPECSYNC_PROJECT_NAME", "demo")
+
+    assert main(["import", url, "--force"]) == 0
+
+    assert (config.repo_specs_dir / "api" / "a.md").read_text(encoding="utf-8") == EXPOSED + "remote\n"
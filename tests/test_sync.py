@@ -0,0 +1,390 @@
+"""Tests for sync planning and execution."""
+
+import os
+
+import pytest
+
+from specsync import fs, selector, sync
+from specsync.exceptions import ConfigError, ConflictError, FrontmatterError
+from specsync.filters import PathScope, SpecFilter
+from specsync.sync import build_pull_plan, build_push_plan, display_plan, execute_plan
+
+from .test_gitindex import git
+from .test_selector import make_config
+
+EXPOSED = "---\nexpose: true\nproject: demo\n---\n\n# Spec\n"
+
+
+def make_trees(tmp_path):
+    repo_root = tmp_path / "repo"
+    (repo_root / ".git").mkdir(parents=True)
+    (repo_root / "specs").mkdir()
+    (tmp_path / "vault" / "specs").mkdir(parents=True)
+    config = make_config(repo_root, tmp_path / "vault")
+    return config
+
+
+def write(path, text=EXPOSED):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def states(plan):
+    return {entry.document.relative_path.as_posix(): entry.state for entry in plan.entries}
+
+
+def test_pull_plan_merges_both_trees(tmp_path):
+    config = make_trees(tmp_path)
+    write(config.workspace_specs_dir / "a.md")
+    write(config.workspace_specs_dir / "b" / "c.md")
+    write(config.repo_specs_dir / "b" / "c.md", EXPOSED + "changed\n")
+    write(config.workspace_specs_dir / "d.md")
+    write(config.repo_specs_dir / "d.md")
+    write(config.repo_specs_dir / "gone.md")
+
+    plan = build_pull_plan(config)
+
+    assert states(plan) == {"a.md": "create", "b/c.md": "conflict", "d.md": "skip"}
+
+
+def test_pull_prune_plans_deletions(tmp_path, capsys):
+    config = make_trees(tmp_path)
+    config.prune = True
+    write(config.workspace_specs_dir / "keep.md")
+    write(config.repo_specs_dir / "keep.md")
+    write(config.repo_specs_dir / "old" / "gone.md")
+    write(config.repo_specs_dir / "local.md", "# Local draft without frontmatter\n")
+    write(config.repo_specs_dir / "other.md", "---\nexpose: true\nproject: other\n---\n")
+
+    plan = build_pull_plan(config)
+
+    assert states(plan) == {"keep.md": "skip", "old/gone.md": "delete"}
+    display_plan(plan)
+    assert "DELETE | old/gone.md | missing in workspace" in capsys.readouterr().out
+
+
+def test_pull_prune_executes_deletions(tmp_path):
+    config = make_trees(tmp_path)
+    config.prune = True
+    config.force = True
+    gone = write(config.repo_specs_dir / "old" / "gone.md")
+
+    stats = execute_plan(build_pull_plan(config), config)
+
+    assert stats.deleted == 1
+    assert not gone.exists()
+    assert not gone.parent.exists()
+    assert config.repo_specs_dir.exists()
+
+
+def test_push_prune_respects_filters(tmp_path):
+    config = make_trees(tmp_path)
+    config.prune = True
+    write(config.repo_specs_dir / "kept.md")
+    write(config.workspace_specs_dir / "kept.md")
+    write(config.workspace_specs_dir / "removed.md")
+    write(config.workspace_specs_dir / "private.md", "---\nexpose: false\n---\n")
+
+    plan = build_push_plan(config)
+
+    assert states(plan) == {"kept.md": "skip", "removed.md": "delete"}
+
+
+def test_prune_keeps_targets_of_filtered_out_sources(tmp_path):
+    config = make_trees(tmp_path)
+    config.prune = True
+    config.spec_filter = SpecFilter.from_config({"max_file_size": 100, "frontmatter": {"status": "approved"}})
+    approved = "---\nexpose: true\nstatus: approved\n---\n"
+    write(config.workspace_specs_dir / "big.md", approved + "x" * 500)
+    write(config.repo_specs_dir / "big.md", approved)
+    write(config.workspace_specs_dir / "draft.md", "---\nexpose: true\nstatus: draft\n---\n")
+    write(config.repo_specs_dir / "draft.md", approved)
+    write(config.repo_specs_dir / "gone.md", approved)
+
+    assert states(build_pull_plan(config)) == {"gone.md": "delete"}
+
+    write(config.repo_specs_dir / "big.md", approved + "x" * 500)
+    write(config.workspace_specs_dir / "big.md", approved)
+    assert "big.md" not in states(build_push_plan(config))
+
+
+def test_parallel_plan_matches_serial(tmp_path):
+    config = make_trees(tmp_path)
+    config.prune = True
+    for index in range(20):
+        write(config.workspace_specs_dir / f"dir{index % 3}" / f"spec{index}.md")
+        if index % 2:
+            write(config.repo_specs_dir / f"dir{index % 3}" / f"spec{index}.md", EXPOSED + f"{index}\n")
+    write(config.repo_specs_dir / "stale.md")
+
+    serial = build_push_plan(config), build_pull_plan(config)
+    config.jobs = 3
+    parallel = build_push_plan(config), build_pull_plan(config)
+
+    for expected, actual in zip(serial, parallel):
+        assert [(e.document.relative_path, e.state, e.reason) for e in actual.entries] == [
+            (e.document.relative_path, e.state, e.reason) for e in expected.entries
+        ]
+    push_entry = next(e for e in parallel[0].entries if e.state == "conflict")
+    assert push_entry.document.raw_text == push_entry.source_path.read_text(encoding="utf-8")
+
+
+def test_parallel_plan_lists_each_tree_once_in_the_parent(tmp_path, monkeypatch):
+    config = make_trees(tmp_path)
+    config.jobs = 3
+    config.git_index = True
+    for index in range(6):
+        write(config.workspace_specs_dir / f"spec{index}.md")
+    log = tmp_path / "walks.log"
+    real_walk, real_load = sync.iter_candidate_paths, sync.GitIndex.load
+
+    def logged(name, real):
+        def wrapper(*args, **kwargs):
+            with log.open("a") as handle:
+                handle.write(f"{name} {os.getpid()}\n")
+            return real(*args, **kwargs)
+
+        return wrapper
+
+    monkeypatch.setattr(sync, "iter_candidate_paths", logged("walk", real_walk))
+    monkeypatch.setattr(selector, "iter_candidate_paths", logged("walk", real_walk))
+    monkeypatch.setattr(sync.GitIndex, "load", logged("index", real_load))
+    plan = build_pull_plan(config)
+
+    assert sorted(log.read_text().split("\n")[:-1]) == [f"index {os.getpid()}"] + [f"walk {os.getpid()}"] * 2
+    assert all(entry.nbytes == len(EXPOSED) for entry in plan.entries)
+
+
+def test_parallel_plan_reports_frontmatter_errors(tmp_path):
+    config = make_trees(tmp_path)
+    config.jobs = 2
+    write(config.workspace_specs_dir / "broken.md", "---\nexpose: [\n---\n")
+
+    with pytest.raises(FrontmatterError) as exc_info:
+        build_pull_plan(config)
+    assert exc_info.value.path.name == "broken.md"
+
+
+def test_detect_moves_pairs_by_content(tmp_path):
+    config = make_trees(tmp_path)
+    config.detect_moves = True
+    config.prune = True
+    config.force = True
+    write(config.workspace_specs_dir / "new" / "place.md", EXPOSED + "moved body\n")
+    old = write(config.repo_specs_dir / "old" / "place.md", EXPOSED + "moved body\n")
+    write(config.workspace_specs_dir / "fresh.md", EXPOSED + "fresh\n")
+    write(config.repo_specs_dir / "stale.md", EXPOSED + "stale, same size\n")
+
+    plan = build_pull_plan(config)
+
+    assert states(plan) == {"fresh.md": "create", "new/place.md": "move", "stale.md": "delete"}
+    move = next(entry for entry in plan.entries if entry.state == "move")
+    assert move.moved_from == old
+    assert move.reason == "moved from old/place.md"
+
+    stats = execute_plan(plan, config)
+    assert (stats.created, stats.moved, stats.deleted) == (1, 1, 1)
+    assert (config.repo_specs_dir / "new" / "place.md").read_text(encoding="utf-8").endswith("moved body\n")
+    assert not old.parent.exists()
+
+
+def test_detect_moves_without_prune_keeps_other_orphans(tmp_path):
+    config = make_trees(tmp_path)
+    config.detect_moves = True
+    config.jobs = 2
+    write(config.workspace_specs_dir / "b.md", EXPOSED + "same\n")
+    write(config.repo_specs_dir / "a.md", EXPOSED + "same\n")
+    write(config.repo_specs_dir / "unrelated.md", EXPOSED + "other\n")
+
+    plan = build_pull_plan(config)
+
+    assert states(plan) == {"b.md": "move"}
+
+
+def test_push_moves_only_selected_workspace_files(tmp_path):
+    config = make_trees(tmp_path)
+    config.detect_moves = True
+    config.force = True
+    write(config.repo_specs_dir / "renamed.md", EXPOSED + "body\n")
+    old = write(config.workspace_specs_dir / "original.md", EXPOSED + "body\n")
+    write(config.repo_specs_dir / "plain.md", "# No frontmatter\n")
+    private = write(config.workspace_specs_dir / "private.md", "# No frontmatter\n")
+
+    plan = build_push_plan(config)
+    assert states(plan) == {"plain.md": "create", "renamed.md": "move"}
+
+    execute_plan(plan, config)
+    assert not old.exists()
+    assert (config.workspace_specs_dir / "renamed.md").read_text(encoding="utf-8") == EXPOSED + "body\n"
+    assert private.exists()
+
+
+def make_conflicts(tmp_path):
+    config = make_trees(tmp_path)
+    older, newer = 1_600_000_000, 1_700_000_000
+    for name, source_mtime, target_mtime in [("old.md", older, newer), ("new.md", newer, older)]:
+        source = write(config.workspace_specs_dir / name, EXPOSED + "vault\n")
+        target = write(config.repo_specs_dir / name, EXPOSED + "repo\n")
+        os.utime(source, (source_mtime, source_mtime))
+        os.utime(target, (target_mtime, target_mtime))
+    return config
+
+
+@pytest.mark.parametrize(
+    ("policy", "expected", "summary"),
+    [
+        ("source", {"old.md": "vault", "new.md": "vault"}, {"source": 2}),
+        ("target", {"old.md": "repo", "new.md": "repo"}, {"target": 2}),
+        ("newer", {"old.md": "repo", "new.md": "vault"}, {"source": 1, "target": 1}),
+    ],
+)
+def test_conflict_policies_resolve_without_prompting(tmp_path, policy, expected, summary):
+    config = make_conflicts(tmp_path)
+    config.on_conflict = policy
+
+    stats = execute_plan(build_pull_plan(config), config)
+
+    contents = {name: (config.repo_specs_dir / name).read_text(encoding="utf-8").split("\n")[-2] for name in expected}
+    assert contents == expected
+    assert stats.conflicts == summary
+
+
+def test_keep_both_writes_incoming_copy(tmp_path):
+    config = make_conflicts(tmp_path)
+    config.on_conflict = "keep-both"
+
+    stats = execute_plan(build_pull_plan(config), config)
+
+    assert (config.repo_specs_dir / "old.md").read_text(encoding="utf-8").endswith("repo\n")
+    assert (config.repo_specs_dir / "old.conflict-workspace.md").read_text(encoding="utf-8").endswith("vault\n")
+    assert stats.conflicts == {"keep-both": 2}
+
+    config.prune = True
+    assert "old.conflict-workspace.md" not in states(build_pull_plan(config))
+    assert "old.conflict-workspace.md" not in states(build_push_plan(config))
+
+    # A later conflict keeps the earlier copy and picks the next free name.
+    config.prune = False
+    write(config.workspace_specs_dir / "old.md", EXPOSED + "vault v2\n")
+    execute_plan(build_pull_plan(config), config)
+    assert (config.repo_specs_dir / "old.conflict-workspace.md").read_text(encoding="utf-8").endswith("vault\n")
+    assert (config.repo_specs_dir / "old.conflict-workspace-2.md").read_text(encoding="utf-8").endswith("vault v2\n")
+    assert "old.conflict-workspace-2.md" not in states(build_pull_plan(config))
+
+
+def test_keep_both_refuses_a_copy_created_after_planning(tmp_path):
+    config = make_conflicts(tmp_path)
+    config.on_conflict = "keep-both"
+    plan = build_pull_plan(config)
+    write(config.repo_specs_dir / "old.conflict-workspace.md", "written by another run\n")
+
+    with pytest.raises(ConflictError, match="changed since the plan was made"):
+        execute_plan(plan, config)
+    assert (config.repo_specs_dir / "old.conflict-workspace.md").read_text(encoding="utf-8") == "written by another run\n"
+
+
+def test_fail_policy_writes_nothing(tmp_path):
+    config = make_conflicts(tmp_path)
+    config.on_conflict = "fail"
+    write(config.workspace_specs_dir / "fresh.md")
+
+    with pytest.raises(ConflictError, match="2 conflicting files"):
+        execute_plan(build_pull_plan(config), config)
+    assert not (config.repo_specs_dir / "fresh.md").exists()
+
+
+def test_path_scope_limits_scan_plan_and_prune(tmp_path, monkeypatch):
+    config = make_trees(tmp_path)
+    config.prune = True
+    config.scope = PathScope(("api",))
+    write(config.workspace_specs_dir / "api" / "a.md")
+    write(config.workspace_specs_dir / "other" / "b.md")
+    write(config.repo_specs_dir / "api" / "gone.md")
+    write(config.repo_specs_dir / "other" / "gone.md")
+
+    listed = []
+    original = fs._list_directory
+    monkeypatch.setattr(fs, "_list_directory", lambda directory: listed.append(directory) or original(directory))
+
+    plan = build_pull_plan(config)
+
+    assert states(plan) == {"api/a.md": "create", "api/gone.md": "delete"}
+    assert not any(path.name == "other" for path in listed)
+
+
+def test_push_since_ref_plans_only_changed_paths(tmp_path, monkeypatch):
+    config = make_trees(tmp_path)
+    (config.repo_root / ".git").rmdir()
+    git(config.repo_root, "init", "-q")
+    config.prune = True
+    config.since = "HEAD"
+    write(config.repo_specs_dir / "api" / "a.md")
+    write(config.repo_specs_dir / "api" / "gone.md")
+    write(config.repo_specs_dir / "other" / "b.md")
+    write(config.repo_specs_dir / "odd[1].md")
+    git(config.repo_root, "add", ".")
+    git(config.repo_root, "commit", "-q", "-m", "init")
+    for relative in ("api/a.md", "api/gone.md", "other/b.md"):
+        write(config.workspace_specs_dir / relative)
+
+    write(config.repo_specs_dir / "api" / "a.md", EXPOSED + "changed\n")
+    write(config.repo_specs_dir / "odd[1].md", EXPOSED + "changed\n")
+    (config.repo_specs_dir / "api" / "gone.md").unlink()
+
+    listed = []
+    original = fs._list_directory
+    monkeypatch.setattr(fs, "_list_directory", lambda directory: listed.append(directory) or original(directory))
+
+    plan = build_push_plan(config)
+
+    assert states(plan) == {"api/a.md": "conflict", "api/gone.md": "delete", "odd[1].md": "create"}
+    assert not any(path.name == "other" for path in listed)
+
+
+def test_push_since_rejects_unknown_ref(tmp_path):
+    config = make_trees(tmp_path)
+    (config.repo_root / ".git").rmdir()
+    git(config.repo_root, "init", "-q")
+    config.since = "no-such-ref"
+
+    with pytest.raises(ConfigError, match="no-such-ref"):
+        build_push_plan(config)
+
+
+def test_formatting_only_differences_are_skipped(tmp_path):
+    config = make_trees(tmp_path)
+    write(config.workspace_specs_dir / "crlf.md", EXPOSED.replace("\n", "\r\n"))
+    write(config.repo_specs_dir / "crlf.md")
+    write(config.workspace_specs_dir / "order.md", "---\nexpose: true\nproject: demo\ntags: [a]\n---\n\n# Spec\n")
+    write(config.repo_specs_dir / "order.md", "---\ntags:\n- a\nproject: demo\nexpose: true\n---\n# Spec\n")
+
+    plan = build_pull_plan(config)
+
+    assert states(plan) == {"crlf.md": "skip", "order.md": "skip"}
+    assert {entry.reason for entry in plan.entries} == {"equivalent (formatting only)"}
+
+
+def test_push_does_not_churn_injected_metadata(tmp_path):
+    config = make_trees(tmp_path)
+    config.force = True
+    write(config.repo_specs_dir / "plain.md", "# Plain\n")
+
+    execute_plan(build_push_plan(config), config)
+    assert states(build_push_plan(config)) == {"plain.md": "skip"}
+    assert states(build_pull_plan(config)) == {"plain.md": "skip"}
+
+
+@pytest.mark.parametrize(("policy", "status"), [("target", "draft"), ("source", "done")])
+def test_metadata_only_change_follows_conflict_policy(tmp_path, policy, status):
+    config = make_trees(tmp_path)
+    config.on_conflict = policy
+    write(config.workspace_specs_dir / "a.md", "---\nexpose: true\nstatus: done\n---\n\n# Spec\n")
+    write(config.repo_specs_dir / "a.md", "---\nexpose: true\nstatus: draft\n---\n\n# Spec\n")
+
+    plan = build_pull_plan(config)
+    assert [(entry.state, entry.reason) for entry in plan.entries] == [("conflict", "metadata only")]
+
+    execute_plan(plan, config)
+
+    assert f"status: {status}" in (config.repo_specs_dir / "a.md").read_text(encoding="utf-8")
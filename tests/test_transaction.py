@@ -0,0 +1,85 @@
+"""Tests for staged, all-or-nothing apply."""
+
+import pytest
+
+from specsync.exceptions import InteractiveError
+from specsync.sync import build_pull_plan, execute_plan
+from specsync.transaction import Transaction
+
+from .test_sync import EXPOSED, make_trees, write
+
+
+def snapshot(root):
+    return {path.relative_to(root).as_posix(): path.read_text() for path in sorted(root.rglob("*")) if path.is_file()}
+
+
+def test_commit_applies_all_operations(tmp_path):
+    root = tmp_path / "root"
+    source = write(tmp_path / "source.md", "copied")
+    write(root / "replace.md", "old")
+    write(root / "gone" / "delete.md", "bye")
+    write(root / "from" / "move.md", "moving")
+
+    with Transaction(root) as transaction:
+        transaction.stage_copy(source, root / "new" / "copy.md")
+        transaction.stage_text(root / "replace.md", "new")
+        transaction.stage_delete(root / "gone" / "delete.md")
+        transaction.stage_move(root / "from" / "move.md", root / "to" / "move.md")
+        transaction.commit()
+
+    assert snapshot(root) == {"new/copy.md": "copied", "replace.md": "new", "to/move.md": "moving"}
+    assert sorted(path.name for path in root.iterdir()) == ["new", "replace.md", "to"]
+
+
+def test_failed_commit_rolls_back(tmp_path):
+    root = tmp_path / "root"
+    write(root / "replace.md", "old")
+    write(root / "delete.md", "keep me")
+    write(root / "move.md", "stay")
+    write(root / "blocker", "a file where a directory is needed")
+    before = snapshot(root)
+
+    with Transaction(root) as transaction:
+        transaction.stage_text(root / "replace.md", "new")
+        transaction.stage_text(root / "created.md", "new file")
+        transaction.stage_delete(root / "delete.md")
+        transaction.stage_move(root / "move.md", root / "moved" / "move.md")
+        transaction.stage_text(root / "blocker" / "fails.md", "cannot be written")
+        with pytest.raises(OSError):
+            transaction.commit()
+
+    assert snapshot(root) == before
+    assert sorted(path.name for path in root.iterdir()) == ["blocker", "delete.md", "move.md", "replace.md"]
+
+
+def test_atomic_execute_writes_nothing_when_prompt_aborts(tmp_path, monkeypatch):
+    config = make_trees(tmp_path)
+    config.atomic = True
+    write(config.workspace_specs_dir / "a-new.md")
+    write(config.workspace_specs_dir / "b-changed.md", EXPOSED + "workspace\n")
+    write(config.repo_specs_dir / "b-changed.md", EXPOSED + "repo\n")
+    before = snapshot(config.repo_specs_dir)
+
+    class QuittingPrompt:
+        def confirm(self, source, target):
+            raise InteractiveError("User quit the operation")
+
+    with pytest.raises(InteractiveError):
+        execute_plan(build_pull_plan(config), config, prompt_engine=QuittingPrompt())
+
+    assert snapshot(config.repo_specs_dir) == before
+    assert [path.name for path in config.repo_specs_dir.iterdir()] == ["b-changed.md"]
+
+
+def test_atomic_execute_commits(tmp_path):
+    config = make_trees(tmp_path)
+    config.atomic = True
+    config.force = True
+    write(config.workspace_specs_dir / "a.md")
+    write(config.workspace_specs_dir / "b.md", EXPOSED + "workspace\n")
+    write(config.repo_specs_dir / "b.md", EXPOSED + "repo\n")
+
+    stats = execute_plan(build_pull_plan(config), config)
+
+    assert (stats.created, stats.updated) == (1, 1)
+    assert snapshot(config.repo_specs_dir) == snapshot(config.workspace_specs_dir)
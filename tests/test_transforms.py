@@ -0,0 +1,103 @@
+"""Tests for the pull transform pipeline."""
+
+import json
+from pathlib import PurePosixPath
+
+import pytest
+
+from specsync.exceptions import ConfigError
+from specsync.sync import build_pull_plan, execute_plan
+from specsync.transforms import NoteIndex, Transformer
+
+from .test_sync import EXPOSED, make_trees, states, write
+
+ALL = ("wikilinks", "embeds", "callouts")
+NOTES = NoteIndex(PurePosixPath(path) for path in ("My Page.md", "Other.md", "Release v1.2.md", "after.md"))
+
+
+def test_transforms_rewrite_vault_syntax():
+    text = (
+        "See [[My Page]], [[Other#Some Heading|alias]] and [[#Local]].\n"
+        "![[diagram.png|300]] ![[Release v1.2]]\n"
+        "> [!info]- Heads up\n"
+        "> body\n"
+    )
+
+    assert Transformer(ALL).apply(text, notes=NOTES) == (
+        "See [My Page](My%20Page.md), [alias](Other.md#some-heading) and [Local](#local).\n"
+        "![diagram.png](diagram.png) [Release v1.2](Release%20v1.2.md)\n"
+        "> [!NOTE]\n"
+        "> **Heads up**\n"
+        "> body\n"
+    )
+
+
+def test_wikilinks_resolve_by_note_name_across_folders():
+    notes = NoteIndex(PurePosixPath(path) for path in ("api/Errors.md", "rfcs/0042 Retry.md", "a/Dup.md", "b/dup.md"))
+    text = "[[errors]] [[0042 Retry#Design]] ![[api/Errors]] [[Dup]] [[b/Dup]] [[Missing]]\n"
+
+    assert Transformer(ALL).apply(text, PurePosixPath("guides/howto/note.md"), notes) == (
+        "[errors](../../api/Errors.md) [0042 Retry#Design](../../rfcs/0042%20Retry.md#design) "
+        "[api/Errors](../../api/Errors.md) [[Dup]] [b/Dup](../../b/dup.md) [[Missing]]\n"
+    )
+
+
+def test_frontmatter_and_code_are_left_alone():
+    text = "---\ntitle: '[[x]]'\n---\n`[[inline]]`\n```\n[[fenced]]\n> [!tip]\n```\n[[after]]\n"
+
+    assert Transformer(ALL).apply(text, notes=NOTES) == (
+        "---\ntitle: '[[x]]'\n---\n`[[inline]]`\n```\n[[fenced]]\n> [!tip]\n```\n[after](after.md)\n"
+    )
+
+
+def test_only_enabled_transforms_run():
+    text = "[[Page]] ![[image.png]] > [!tip]\n> [!tip]\n"
+
+    assert Transformer(("callouts",)).apply(text) == "[[Page]] ![[image.png]] > [!tip]\n> [!TIP]\n"
+
+
+def test_unknown_transform_is_rejected():
+    with pytest.raises(ConfigError, match="emoji"):
+        Transformer(("emoji",))
+
+
+def test_pull_compares_against_transformed_output(tmp_path, monkeypatch):
+    config = make_trees(tmp_path)
+    config.transforms = ("wikilinks",)
+    config.force = True
+    write(config.workspace_specs_dir / "a.md", EXPOSED + "[[Other]]\n")
+    write(config.workspace_specs_dir / "docs" / "Other.md")
+
+    execute_plan(build_pull_plan(config), config)
+    assert (config.repo_specs_dir / "a.md").read_text(encoding="utf-8") == EXPOSED + "[Other](docs/Other.md)\n"
+
+    calls = []
+    original = Transformer.run
+    monkeypatch.setattr(Transformer, "run", lambda self, text, *args: calls.append(text) or original(self, text, *args))
+
+    assert states(build_pull_plan(config)) == {"a.md": "skip", "docs/Other.md": "skip"}
+    assert states(build_pull_plan(config)) == {"a.md": "skip", "docs/Other.md": "skip"}
+    assert len(calls) == 2  # Later plans reuse the persisted output digests.
+
+    # Moving the linked note changes the output without touching a.md.
+    (config.workspace_specs_dir / "docs" / "Other.md").rename(config.workspace_specs_dir / "Other.md")
+    assert states(build_pull_plan(config))["a.md"] == "conflict"
+
+
+def test_parallel_pull_writes_transformed_output(tmp_path):
+    config = make_trees(tmp_path)
+    config.transforms = ("wikilinks",)
+    config.force = True
+    config.jobs = 2
+    for index in range(4):
+        write(config.workspace_specs_dir / f"{index}.md", EXPOSED + "[[Other]]\n")
+    write(config.workspace_specs_dir / "docs" / "Other.md")
+
+    execute_plan(build_pull_plan(config), config)
+
+    for index in range(4):
+        assert (config.repo_specs_dir / f"{index}.md").read_text(encoding="utf-8").endswith("[Other](docs/Other.md)\n")
+    # Workers return the digests they computed and the parent saves them once.
+    assert set(states(build_pull_plan(config)).values()) == {"skip"}
+    cache = json.loads((config.state_dir / "transform-cache.json").read_text(encoding="utf-8"))
+    assert len(cache) == 5